@@ -1,13 +1,16 @@
 import os
+import json
+import asyncio
 import discord
 import logging
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 from fops_bot.models import get_session, Subscription
-from cogs.subscribe_resources.base_poller import BasePollerCog
+from cogs.subscribe_resources.base_poller import BasePollerCog, POLLER_FETCH_LIMIT
 from utilities.post_utils import Post, Posts
-from fops_bot.scripts.Booru_Scripts import booru_utils
+from utilities.booru_client import BooruClient
+from utilities.feed_cache import content_hash, feed_cache
 
 BOORU_URL = os.getenv("BOORU_URL", "https://booru.snowsune.net")
 BOORU_API_KEY = os.getenv("BOORU_KEY")
@@ -60,41 +63,87 @@ class BooruPosts(Posts):
             raise ValueError("All posts must be BooruPost instances")
 
 
+def parse_posts(body: bytes) -> BooruPosts:
+    """Raw /posts.json body -> BooruPosts (runs in a thread)"""
+    try:
+        posts = json.loads(body)
+    except ValueError:
+        return BooruPosts([])
+
+    # Handle wrapped responses
+    if isinstance(posts, dict):
+        posts = posts.get("posts", [])
+    if not isinstance(posts, list):
+        return BooruPosts([])
+
+    booru_posts = []
+    for post_data in posts:
+        if isinstance(post_data, dict) and post_data.get("id"):
+            post_id = str(post_data["id"])
+            booru_posts.append(BooruPost.from_api_post(post_data, post_id))
+    return BooruPosts(booru_posts)
+
+
 class BooruPollerCog(BasePollerCog):
     """Booru poller implementation"""
 
     def __init__(self, bot):
         super().__init__(bot, "BixiBooru")
-
-    async def fetch_latest_posts(self, search_criteria: str) -> Posts:
+        self.client = BooruClient(BOORU_URL, BOORU_USERNAME, BOORU_API_KEY)
+
+    async def cog_unload(self):
+        await super().cog_unload()
+        await self.client.close()
+
+    async def fetch_latest_posts(
+        self,
+        search_criteria: str,
+        since_id: Optional[int] = None,
+        limit: int = POLLER_FETCH_LIMIT,
+    ) -> Posts:
         """Fetch latest posts from Booru for the given search criteria"""
         self.logger.debug(f"Fetching posts for tag '{search_criteria}'.")
 
+        query = f"{search_criteria} since:{since_id} limit:{limit}"
         try:
-            posts = booru_utils.fetch_images_with_tag(
+            status, body, headers = await self.client.fetch_posts(
                 search_criteria,
-                BOORU_URL,
-                BOORU_API_KEY,
-                BOORU_USERNAME,
-                limit=5,
+                limit=limit,
+                since_id=since_id,
+                headers=feed_cache.conditional_headers(self.service_type, query),
             )
         except Exception as e:
             self.logger.warning(f"Booru API error for {search_criteria}: {e}")
             return BooruPosts([])
 
-        if not posts:
-            self.logger.warning(f"No posts for {search_criteria}.")
+        if status == 304:
+            cached = feed_cache.get(self.service_type, query)
+            return cached.posts if cached else BooruPosts([])
+        if status != 200:
+            self.logger.warning(f"Booru API returned {status} for {search_criteria}")
             return BooruPosts([])
 
-        # Convert API posts to BooruPosts collection
-        booru_posts = []
-        for post_data in posts:
-            post_id = str(post_data.get("id"))
-            if post_id:
-                booru_post = BooruPost.from_api_post(post_data, post_id)
-                booru_posts.append(booru_post)
-
-        booru_posts_collection = BooruPosts(booru_posts)
+        digest = content_hash(body)
+        cached = feed_cache.unchanged(self.service_type, query, digest)
+        if cached is not None:
+            return cached
+
+        # json + building the posts off the loop, big pages are slow to chew
+        booru_posts_collection = await asyncio.to_thread(parse_posts, body)
+        if not booru_posts_collection:
+            # Normal when nothing new is past the cursor, base_poller warns
+            # about the odd case (nothing at all) itself
+            self.logger.debug(f"No posts for {search_criteria}.")
+            return booru_posts_collection
+
+        feed_cache.store(
+            self.service_type,
+            query,
+            digest,
+            booru_posts_collection,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
         self.logger.debug(
             f"Latest post IDs for '{search_criteria}': {booru_posts_collection.ids}"
         )
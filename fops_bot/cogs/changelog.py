@@ -6,6 +6,7 @@ import discord
 from discord.ext import commands
 
 from utilities.database import retrieve_key_number, store_key_number
+from utilities.rest_scheduler import Lane, rest_scheduler
 
 
 def get_current_changelog(file_path) -> (int, str):
@@ -117,7 +118,7 @@ class Changelog(commands.Cog, name="ChangeLogCog"):
                 continue
 
             try:
-                await owner.send(changelog_message)
+                await rest_scheduler.send(Lane.BULK, owner, changelog_message)
                 owner_ids_messaged.add(owner.id)
                 sent_count += 1
                 self.logger.info(f"Sent changelog to {owner.name} ({guild.name})")
@@ -1,13 +1,15 @@
 import os
 import discord
 import logging
+import asyncio
 import requests
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 from fops_bot.models import get_session, Subscription
-from cogs.subscribe_resources.base_poller import BasePollerCog
+from cogs.subscribe_resources.base_poller import BasePollerCog, POLLER_FETCH_LIMIT
 from utilities.post_utils import Post, Posts
+from utilities.feed_cache import content_hash, feed_cache
 
 # e621 API configuration
 E621_URL = "https://e621.net"
@@ -64,45 +66,80 @@ class E621PollerCog(BasePollerCog):
     def __init__(self, bot):
         super().__init__(bot, "e621")
 
-    async def fetch_latest_posts(self, search_criteria: str) -> Posts:
+    async def fetch_latest_posts(
+        self,
+        search_criteria: str,
+        since_id: Optional[int] = None,
+        limit: int = POLLER_FETCH_LIMIT,
+    ) -> Posts:
         """Fetch latest posts from e621 for the given search criteria"""
+        tags = search_criteria
+        if since_id is not None:
+            # Oldest posts after our cursor first, so catching up is exact
+            tags = f"{search_criteria} id:>{since_id} order:id"
+
         try:
-            params = {"tags": search_criteria, "limit": 5}
-            if E621_USERNAME and E621_API_KEY:
-                params.update({"login": E621_USERNAME, "api_key": E621_API_KEY})
+            return await asyncio.to_thread(self._fetch_posts, tags, limit)
+        except Exception:
+            return E621Posts([])
 
-            response = requests.get(
-                f"{E621_URL}/posts.json",
-                params=params,
-                headers={"User-Agent": E621_USER_AGENT},
-            )
+    def _fetch_posts(self, tags: str, limit: int = POLLER_FETCH_LIMIT) -> Posts:
+        params = {"tags": tags, "limit": limit}
+        # Same tags with a different page size is a different listing
+        query = f"{tags} limit:{limit}"
+        if E621_USERNAME and E621_API_KEY:
+            params.update({"login": E621_USERNAME, "api_key": E621_API_KEY})
 
-            if response.status_code != 200:
-                return E621Posts([])
+        headers = {"User-Agent": E621_USER_AGENT}
+        headers.update(feed_cache.conditional_headers(self.service_type, query))
 
-            posts_data = response.json()
+        response = requests.get(
+            f"{E621_URL}/posts.json", params=params, headers=headers, timeout=30
+        )
 
-            # Handle wrapped responses
-            if isinstance(posts_data, dict):
-                if "error" in posts_data or "message" in posts_data:
-                    return E621Posts([])
-                posts_data = posts_data.get("posts", [])
+        if response.status_code == 304:
+            cached = feed_cache.get(self.service_type, query)
+            self.logger.debug(f"e621 listing for '{tags}' not modified")
+            return cached.posts if cached else E621Posts([])
 
-            if not isinstance(posts_data, list):
-                return E621Posts([])
+        if response.status_code != 200:
+            return E621Posts([])
 
-            e621_posts = []
-            for post_data in posts_data:
-                if isinstance(post_data, dict) and post_data.get("id"):
-                    e621_posts.append(
-                        E621Post.from_api_post(post_data, str(post_data["id"]))
-                    )
+        # Same bytes as last time, same posts
+        digest = content_hash(response.content)
+        cached = feed_cache.unchanged(self.service_type, query, digest)
+        if cached is not None:
+            return cached
 
-            return E621Posts(e621_posts)
+        posts_data = response.json()
 
-        except Exception:
+        # Handle wrapped responses
+        if isinstance(posts_data, dict):
+            if "error" in posts_data or "message" in posts_data:
+                return E621Posts([])
+            posts_data = posts_data.get("posts", [])
+
+        if not isinstance(posts_data, list):
             return E621Posts([])
 
+        e621_posts = []
+        for post_data in posts_data:
+            if isinstance(post_data, dict) and post_data.get("id"):
+                e621_posts.append(
+                    E621Post.from_api_post(post_data, str(post_data["id"]))
+                )
+
+        posts = E621Posts(e621_posts)
+        feed_cache.store(
+            self.service_type,
+            query,
+            digest,
+            posts,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return posts
+
     async def notify_owner_of_failures(self, search_criteria: str, error: Exception):
         """Notify the owner when e621 poller encounters 5 consecutive failures"""
         self.logger.error(f"e621 poller failure for {search_criteria}: {error}")
@@ -6,6 +6,7 @@ from discord import app_commands
 from discord.ext import commands
 
 from cogs.guild_cog import get_guild
+from utilities.rest_scheduler import Lane, rest_scheduler
 from utilities.guild_log import (
     info as guild_log_info,
     warning as guild_log_warning,
@@ -134,7 +135,7 @@ class ErrorHandlerCog(commands.Cog):
             f"```py\n{error_traceback}\n```"
         )
         try:
-            await channel.send(error_message)
+            await rest_scheduler.send(Lane.BULK, channel, error_message)
         except discord.HTTPException as e:
             guild_log_error(
                 self.logger,
@@ -5,12 +5,15 @@ import logging
 import time
 import asyncio
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
-from fops_bot.models import get_session, Subscription, KeyValueStore
+from fops_bot.models import get_session, Subscription
+from utilities.database import store_key
 from requests.cookies import RequestsCookieJar
-from cogs.subscribe_resources.base_poller import BasePollerCog
+from cogs.subscribe_resources.base_poller import BasePollerCog, POLLER_FETCH_LIMIT
 from utilities.post_utils import Post, Posts
+from utilities.feed_cache import content_hash, feed_cache
+from utilities.rest_scheduler import Lane, rest_scheduler
 
 FA_COOKIE_A = os.getenv("FA_COOKIE_A")
 FA_COOKIE_B = os.getenv("FA_COOKIE_B")
@@ -68,7 +71,12 @@ class FA_PollerCog(BasePollerCog):
     def __init__(self, bot):
         super().__init__(bot, "FurAffinity")
 
-    async def fetch_latest_posts(self, search_criteria: str) -> Posts:
+    async def fetch_latest_posts(
+        self,
+        search_criteria: str,
+        since_id: Optional[int] = None,
+        limit: int = POLLER_FETCH_LIMIT,
+    ) -> Posts:
         """Fetch latest posts from FurAffinity for the given search criteria"""
         cookies = RequestsCookieJar()
         cookies.set("a", FA_COOKIE_A or "")
@@ -88,7 +96,23 @@ class FA_PollerCog(BasePollerCog):
                 self.logger.warning(f"No gallery for {search_criteria}.")
                 return FAPosts([])
 
-            latest_post_ids = [str(post.id) for post in gallery[:5]]
+            if since_id is None:
+                latest_post_ids = [str(post.id) for post in gallery[:limit]]
+            else:
+                # FA cant filter by id, but the gallery page is newest first so
+                # we just take the oldest `limit` past our cursor (and skip
+                # fetching full submissions we've already posted)
+                newer = [post.id for post in gallery if int(post.id) > since_id]
+                latest_post_ids = [str(post_id) for post_id in newer[-limit:]]
+
+            # FA has no ETags, but if the ids we would fetch are the same as
+            # last time so are the submissions, skip fetching them again
+            query = f"{search_criteria} since:{since_id}"
+            digest = content_hash(",".join(latest_post_ids))
+            cached = feed_cache.unchanged(self.service_type, query, digest)
+            if cached is not None:
+                self.logger.debug(f"Gallery for '{search_criteria}' unchanged")
+                return cached
 
             fa_posts = []
             for post_id in latest_post_ids:
@@ -103,6 +127,9 @@ class FA_PollerCog(BasePollerCog):
                     continue
 
             fa_posts_collection = FAPosts(fa_posts)
+            if len(fa_posts) == len(latest_post_ids):
+                # Only remember complete sets, a failed submission should be retried
+                feed_cache.store(self.service_type, query, digest, fa_posts_collection)
             self.logger.debug(
                 f"Latest post IDs for '{search_criteria}': {fa_posts_collection.ids}"
             )
@@ -111,21 +138,11 @@ class FA_PollerCog(BasePollerCog):
         posts = await asyncio.to_thread(fetch_posts)
 
         # Update the last poll timestamp after a successful fetch attempt
-        now = int(time.time())
-        await asyncio.to_thread(self._update_last_poll_timestamp, now)
+        # (batched, its just for /version)
+        store_key("fa_last_poll", int(time.time()), defer=True)
 
         return posts
 
-    def _update_last_poll_timestamp(self, timestamp: int) -> None:
-        with get_session() as session:
-            kv = session.get(KeyValueStore, "fa_last_poll")
-            if kv:
-                kv.value = str(timestamp)
-            else:
-                kv = KeyValueStore(key="fa_last_poll", value=str(timestamp))
-                session.add(kv)
-            session.commit()
-
     async def notify_owner_of_failures(self, search_criteria: str, error: Exception):
         """Notify me when FA poller encounters 5 consecutive failures"""
         if not OWNER_UID or self.owner_notified:
@@ -134,11 +151,13 @@ class FA_PollerCog(BasePollerCog):
         try:
             owner = self.bot.get_user(OWNER_UID) or await self.bot.fetch_user(OWNER_UID)
             if owner:
-                await owner.send(
+                await rest_scheduler.send(
+                    Lane.BULK,
+                    owner,
                     f"⚠️ **FA Poller Alert** ⚠️\n"
                     f"The FA poller has encountered {self.consecutive_failures} consecutive failures. "
                     f"This may indicate that the FA cookies have expired and need to be refreshed.\n\n"
-                    f"Please check the bot logs and update the FA_COOKIE_A and FA_COOKIE_B environment variables."
+                    f"Please check the bot logs and update the FA_COOKIE_A and FA_COOKIE_B environment variables.",
                 )
                 self.owner_notified = True
                 self.logger.warning(
@@ -17,7 +17,8 @@ from discord import app_commands
 from discord.ext import commands, tasks
 from datetime import datetime, timedelta, timezone
 
-from utilities.database import store_number, retrieve_number
+from utilities.database import increment_number, retrieve_number
+from utilities.rest_scheduler import Lane, rest_scheduler
 
 
 class FanclubCog(commands.Cog, name="FanclubCog"):
@@ -31,13 +32,11 @@ class FanclubCog(commands.Cog, name="FanclubCog"):
         Tell me how many times a guild has been booped
         """
         bc_key = f"boopCount_{guild}"
-        bc = retrieve_number(bc_key)
 
         if addOne:
-            store_number(bc_key, bc + 1)
-            bc = retrieve_number(bc_key)
+            return increment_number(bc_key)
 
-        return bc
+        return retrieve_number(bc_key)
 
     @commands.Cog.listener("on_message")
     async def boopListener(self, message: discord.Message):
@@ -53,7 +52,11 @@ class FanclubCog(commands.Cog, name="FanclubCog"):
                 return
 
             logging.debug(f"Boop detected in {message}, guild was {message.guild}")
-            await message.reply(f"{self.getStat(message.guild.id, True)} boops!")
+            await rest_scheduler.reply(
+                Lane.INTERACTION,
+                message,
+                f"{self.getStat(message.guild.id, True)} boops!",
+            )
 
 
 async def setup(bot):
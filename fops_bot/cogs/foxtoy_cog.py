@@ -13,6 +13,7 @@ from datetime import datetime, timedelta, timezone
 from discord.ext import commands, tasks
 from utilities.database import store_key, retrieve_key
 from utilities.common import seconds_until
+from utilities.rest_scheduler import Lane, rest_scheduler
 from utilities.database import (
     retrieve_key_number,
     store_key_number,
@@ -128,8 +129,10 @@ class FoxtoyCog(commands.Cog, name="FoxtoyCog"):
         store_key_number("last_fox_toy_change", int(time.time()))
 
         # Announce the change
-        await channel.send(
-            f"Okay vixens! You have a new <@&{ROLE}> to play with! Say hello to {new_holder.mention}!"
+        await rest_scheduler.send(
+            Lane.BULK,
+            channel,
+            f"Okay vixens! You have a new <@&{ROLE}> to play with! Say hello to {new_holder.mention}!",
         )
 
     @commands.Cog.listener()
@@ -6,19 +6,24 @@ This cog handles guild tracking and synchronization with the database.
 """
 
 import os
+import asyncio
 import discord
 import logging
+from datetime import datetime, timezone
 from discord.ext import commands
-from fops_bot.models import get_session, Guild
+from sqlalchemy import select
+from fops_bot.models import get_session, dialect_insert, Guild
+from utilities.guild_cache import guild_cache, GuildSettings
+from utilities.rest_scheduler import Lane, rest_scheduler
 
 
 logger = logging.getLogger(__name__)
 OWNER_UID = int(os.getenv("OWNER_UID", "0"))
 
 
-def get_guild(ctx_or_guild_id) -> Guild | None:
+def get_guild(ctx_or_guild_id) -> GuildSettings | None:
     """
-    Returns a guild DB object (with settings!)
+    Returns a (cached, read-only) snapshot of the guild's settings!
 
     Args:
         ctx_or_guild_id: Either a guild_id (int) or a context object with .guild.id
@@ -49,8 +54,24 @@ def get_guild(ctx_or_guild_id) -> Guild | None:
         logger.warning(f"Invalid input to get_guild: {type(ctx_or_guild_id)}")
         return None
 
-    with get_session() as session:
-        return session.get(Guild, guild_id)
+    return guild_cache.get(guild_id)
+
+
+def _new_guild_row(guild_id: int, guild_name: str) -> dict:
+    """Column values for a freshly seen guild (all features at their defaults)."""
+    return dict(
+        guild_id=guild_id,
+        name=guild_name,
+        joined_at=datetime.now(timezone.utc),
+        frozen=False,
+        allow_nsfw=False,
+        enable_dlp=True,
+        twitter_obfuscate=False,
+        twitter_wrapper="fxtwitter.com",
+        admin_channel_id=None,
+        ignored_channels=[],
+        recent_logs=[],
+    )
 
 
 def ensure_guild_exists(guild_id: int, guild_name: str = "") -> Guild:
@@ -63,22 +84,12 @@ def ensure_guild_exists(guild_id: int, guild_name: str = "") -> Guild:
             logger.warning(
                 f"Guild {guild_id} ({guild_name}) not found in database, creating..."
             )
-            guild = Guild(
-                guild_id=guild_id,
-                name=guild_name,
-                frozen=False,
-                allow_nsfw=False,
-                enable_dlp=True,
-                twitter_obfuscate=False,
-                twitter_wrapper="fxtwitter.com",
-                admin_channel_id=None,
-                ignored_channels=[],
-                recent_logs=[],
-            )
+            guild = Guild(**_new_guild_row(guild_id, guild_name))
             session.add(guild)
             session.commit()
             session.refresh(guild)
             logger.info(f"Guild {guild_id} ({guild_name}) created in database.")
+        guild_cache.put(guild_id, GuildSettings.from_model(guild))
         return guild
 
 
@@ -89,9 +100,44 @@ def update_guild_name(guild_id: int, guild_name: str) -> None:
         if guild and guild.name != guild_name:
             guild.name = guild_name
             session.commit()
+            guild_cache.put(guild_id, GuildSettings.from_model(guild))
             logger.info(f"Updated guild name for {guild_id} to {guild_name}")
 
 
+def sync_guilds(
+    guilds: list[tuple[int, str]], batch_size: int = 500
+) -> tuple[int, int]:
+    """
+    Bulk version of ensure_guild_exists + update_guild_name for startup.
+
+    Diffs (guild_id, name) pairs from the gateway against the DB in one query,
+    then upserts only the new and renamed guilds. Blocking, run it in a thread!
+
+    Returns:
+        (created, renamed) counts
+    """
+    wanted = dict(guilds)
+    with get_session() as session:
+        known = dict(session.execute(select(Guild.guild_id, Guild.name)).all())
+
+        created = [gid for gid in wanted if gid not in known]
+        renamed = [gid for gid in wanted if gid in known and known[gid] != wanted[gid]]
+        rows = [_new_guild_row(gid, wanted[gid]) for gid in created + renamed]
+
+        # Batched so we stay under SQLite's bound parameter limit
+        for i in range(0, len(rows), batch_size):
+            stmt = dialect_insert(session, Guild).values(rows[i : i + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Guild.guild_id], set_={"name": stmt.excluded.name}
+            )
+            session.execute(stmt)
+        session.commit()
+
+    for gid in created + renamed:
+        guild_cache.invalidate(gid)
+    return len(created), len(renamed)
+
+
 class GuildSettingsCog(commands.Cog):
     """Manages guild tracking and synchronization."""
 
@@ -99,15 +145,24 @@ class GuildSettingsCog(commands.Cog):
         self.bot = bot
         self.logger = logging.getLogger(__name__)
 
+    async def cog_load(self):
+        # Dashboard edits invalidate the settings cache over redis
+        await asyncio.to_thread(guild_cache.start_listener)
+
+    async def cog_unload(self):
+        guild_cache.stop_listener()
+
     @commands.Cog.listener()
     async def on_ready(self):
         """Sync all current guilds to the database on startup."""
         self.logger.info("Syncing guilds to database...")
-        synced_count = 0
-        for guild in self.bot.guilds:
-            ensure_guild_exists(guild.id, guild.name)
-            synced_count += 1
-        self.logger.info(f"Synced {synced_count} guilds to database.")
+        created, renamed = await asyncio.to_thread(
+            sync_guilds, [(guild.id, guild.name) for guild in self.bot.guilds]
+        )
+        self.logger.info(
+            f"Synced {len(self.bot.guilds)} guilds to database "
+            f"({created} new, {renamed} renamed)."
+        )
 
         # Track guild count in InfluxDB
         from utilities.influx_metrics import send_metric
@@ -137,7 +192,7 @@ class GuildSettingsCog(commands.Cog):
                     f"If you need help, tips or have feedback! Contact vixi@snowsune.net or PM me on discord!\n\n"
                     f"*This message was sent because you own a server where Fops Bot was just added~*"
                 )
-                await guild.owner.send(welcome_message)
+                await rest_scheduler.send(Lane.BULK, guild.owner, welcome_message)
                 self.logger.info(
                     f"Sent welcome DM to {guild.owner.name} for {guild.name}"
                 )
@@ -158,7 +213,7 @@ class GuildSettingsCog(commands.Cog):
                     f"**Members:** {guild.member_count}\n"
                     f"**Created:** <t:{int(guild.created_at.timestamp())}:R>"
                 )
-                await owner_user.send(owner_notification)
+                await rest_scheduler.send(Lane.BULK, owner_user, owner_notification)
                 self.logger.info(f"Notified vixi about new guild: {guild.name}")
             except Exception as e:
                 self.logger.error(f"Error notifying viix: {e}")
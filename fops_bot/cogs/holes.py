@@ -2,7 +2,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from typing import Optional
-from fops_bot.models import get_session, Hole, HoleUserColor
+from fops_bot.models import get_session, get_read_session, Hole, HoleUserColor
+from utilities.rest_scheduler import Lane, rest_scheduler
 import random
 import re
 
@@ -279,52 +280,53 @@ class HolesCog(commands.Cog, name="HolesCog"):
 
         # --- GUILD TO HOLE RECIPIENT ---
         if message.guild:
-            with get_session() as session:
+            with get_read_session() as session:
                 hole = (
                     session.query(Hole)
                     .filter_by(channel_id=message.channel.id, guild_id=message.guild.id)
                     .first()
                 )
 
-                if not hole:
-                    # This isn't a hole guild/channel pairing
-                    return
+            if not hole:
+                # This isn't a hole guild/channel pairing
+                return
 
-                # Don't forward messages starting with '('
-                if bool(hole.anonymize) and message.content.strip().startswith("("):
-                    return
+            # Don't forward messages starting with '('
+            if bool(hole.anonymize) and message.content.strip().startswith("("):
+                return
 
-                bot = self.bot
-                sent = False
+            bot = self.bot
+            sent = False
 
-                # Use get_name for display
+            # Use get_name for display (may assign a color, so use the primary)
+            with get_session() as session:
                 display = self.get_name(
                     bool(hole.anonymize), message.author, message.guild.id, session
                 )
-                content = message.content
-                if bool(hole.anonymize):
-                    forward_text = f"{display}\n>>> {content}"
-                else:
-                    forward_text = f"{display}: {content}"
-                if bool(hole.is_pm):
-                    user = bot.get_user(
-                        hole.forwarded_channel_id
-                    ) or await bot.fetch_user(hole.forwarded_channel_id)
-                    if user:
-                        await user.send(forward_text)
-                        sent = True
-                else:
-                    channel = bot.get_channel(
-                        hole.forwarded_channel_id
-                    ) or await bot.fetch_channel(hole.forwarded_channel_id)
-                    if channel:
-                        await channel.send(forward_text)
-                        sent = True
-                if sent:
-                    try:
-                        await message.add_reaction("\U0001f4e7")  # 📧
-                    except Exception:
-                        pass
+            content = message.content
+            if bool(hole.anonymize):
+                forward_text = f"{display}\n>>> {content}"
+            else:
+                forward_text = f"{display}: {content}"
+            if bool(hole.is_pm):
+                user = bot.get_user(hole.forwarded_channel_id) or await bot.fetch_user(
+                    hole.forwarded_channel_id
+                )
+                if user:
+                    await rest_scheduler.send(Lane.HOLES, user, forward_text)
+                    sent = True
+            else:
+                channel = bot.get_channel(
+                    hole.forwarded_channel_id
+                ) or await bot.fetch_channel(hole.forwarded_channel_id)
+                if channel:
+                    await rest_scheduler.send(Lane.HOLES, channel, forward_text)
+                    sent = True
+            if sent:
+                try:
+                    await message.add_reaction("\U0001f4e7")  # 📧
+                except Exception:
+                    pass
 
         # --- DM TO HOLE CHANNEL ---
         elif isinstance(message.channel, discord.DMChannel):
@@ -332,29 +334,31 @@ class HolesCog(commands.Cog, name="HolesCog"):
                 "("
             ) or message.content.strip().startswith("/"):
                 return
-            with get_session() as session:
+            with get_read_session() as session:
                 hole = (
                     session.query(Hole)
                     .filter_by(forwarded_channel_id=message.author.id, is_pm=True)
                     .first()
                 )
-                if not hole:
-                    return
-                bot = self.bot
-                channel = bot.get_channel(hole.channel_id) or await bot.fetch_channel(
-                    hole.channel_id
+            if not hole:
+                return
+            bot = self.bot
+            channel = bot.get_channel(hole.channel_id) or await bot.fetch_channel(
+                hole.channel_id
+            )
+            sent = False
+            if channel:
+                await rest_scheduler.send(
+                    Lane.HOLES,
+                    channel,
+                    f"{message.author.display_name}\n>>> {message.content}",
                 )
-                sent = False
-                if channel:
-                    await channel.send(
-                        f"{message.author.display_name}\n>>> {message.content}"
-                    )
-                    sent = True
-                if sent:
-                    try:
-                        await message.add_reaction("\U0001f4e7")  # 📧
-                    except Exception:
-                        pass
+                sent = True
+            if sent:
+                try:
+                    await message.add_reaction("\U0001f4e7")  # 📧
+                except Exception:
+                    pass
 
 
 async def setup(bot):
@@ -11,6 +11,7 @@ from utilities.image_utils import (
     save_image_to_bytes,
     IMAGE_TASKS,
 )
+from utilities.rest_scheduler import Lane, rest_scheduler
 
 from typing import Optional
 
@@ -56,8 +57,11 @@ class TaskSelectView(discord.ui.View):
                 interaction, task_name, self.message, thinking_msg
             )
         else:
-            await interaction.followup.send(
-                "Error: ImageCog not found.", ephemeral=True
+            await rest_scheduler.send(
+                Lane.INTERACTION,
+                interaction.followup,
+                "Error: ImageCog not found.",
+                ephemeral=True,
             )
 
 
@@ -97,12 +101,21 @@ class ImageCog(commands.Cog, name="ImageCog"):
         ]
 
         if not tasks:
-            await interaction.followup.send("No image tasks available.", ephemeral=True)
+            await rest_scheduler.send(
+                Lane.INTERACTION,
+                interaction.followup,
+                "No image tasks available.",
+                ephemeral=True,
+            )
             return
 
         view = TaskSelectView(tasks, requires_attachment=True, message=message)
-        followup_msg = await interaction.followup.send(
-            "Select an image tool:", view=view, ephemeral=True
+        followup_msg = await rest_scheduler.send(
+            Lane.INTERACTION,
+            interaction.followup,
+            "Select an image tool:",
+            view=view,
+            ephemeral=True,
         )
         view.followup_message = followup_msg
 
@@ -120,12 +133,21 @@ class ImageCog(commands.Cog, name="ImageCog"):
         ]
 
         if not tasks:
-            await interaction.followup.send("No text tasks available.", ephemeral=True)
+            await rest_scheduler.send(
+                Lane.INTERACTION,
+                interaction.followup,
+                "No text tasks available.",
+                ephemeral=True,
+            )
             return
 
         view = TaskSelectView(tasks, requires_attachment=False, message=message)
-        followup_msg = await interaction.followup.send(
-            "Select a text tool:", view=view, ephemeral=True
+        followup_msg = await rest_scheduler.send(
+            Lane.INTERACTION,
+            interaction.followup,
+            "Select a text tool:",
+            view=view,
+            ephemeral=True,
         )
         view.followup_message = followup_msg
 
@@ -140,8 +162,11 @@ class ImageCog(commands.Cog, name="ImageCog"):
         task_metadata = IMAGE_TASKS.get(task_name)
         if not task_metadata:
             if interaction.response.is_done():
-                await interaction.followup.send(
-                    f"Task '{task_name}' is not registered.", ephemeral=True
+                await rest_scheduler.send(
+                    Lane.INTERACTION,
+                    interaction.followup,
+                    f"Task '{task_name}' is not registered.",
+                    ephemeral=True,
                 )
             else:
                 await interaction.response.send_message(
@@ -158,15 +183,21 @@ class ImageCog(commands.Cog, name="ImageCog"):
         try:
             if requires_attachment:
                 if not message or not message.attachments:
-                    await interaction.followup.send(
-                        "This task requires an image attachment!", ephemeral=True
+                    await rest_scheduler.send(
+                        Lane.INTERACTION,
+                        interaction.followup,
+                        "This task requires an image attachment!",
+                        ephemeral=True,
                     )
                     return
 
                 attachment = message.attachments[0]
                 if not attachment.content_type.startswith("image/"):
-                    await interaction.followup.send(
-                        "The attachment is not an image!", ephemeral=True
+                    await rest_scheduler.send(
+                        Lane.INTERACTION,
+                        interaction.followup,
+                        "The attachment is not an image!",
+                        ephemeral=True,
                     )
                     return
 
@@ -179,8 +210,11 @@ class ImageCog(commands.Cog, name="ImageCog"):
                 )
             else:
                 if not message or not message.content:
-                    await interaction.followup.send(
-                        "This task requires a text message!", ephemeral=True
+                    await rest_scheduler.send(
+                        Lane.INTERACTION,
+                        interaction.followup,
+                        "This task requires a text message!",
+                        ephemeral=True,
                     )
                     return
 
@@ -193,14 +227,18 @@ class ImageCog(commands.Cog, name="ImageCog"):
             # Reply to the original message that was right-clicked
             # The 'message' parameter is the message from the context menu interaction
             if message:
-                await message.reply(
+                await rest_scheduler.reply(
+                    Lane.INTERACTION,
+                    message,
                     content=f"-# Triggered by {interaction.user.mention}",
                     file=discord.File(io.BytesIO(output_bytes), f"{task_name}.png"),
                 )
             else:
                 self.logger.error(f"No message provided for interaction")
-                await interaction.followup.send(
-                    file=discord.File(io.BytesIO(output_bytes), f"{task_name}.png")
+                await rest_scheduler.send(
+                    Lane.INTERACTION,
+                    interaction.followup,
+                    file=discord.File(io.BytesIO(output_bytes), f"{task_name}.png"),
                 )
 
             # Delete the "thinking..." message if it exists
@@ -212,8 +250,11 @@ class ImageCog(commands.Cog, name="ImageCog"):
         except Exception as e:
             self.logger.error(f"Error processing task '{task_name}': {e}")
 
-            await interaction.followup.send(
-                "Failed to process the task.", ephemeral=True
+            await rest_scheduler.send(
+                Lane.INTERACTION,
+                interaction.followup,
+                "Failed to process the task.",
+                ephemeral=True,
             )
 
 
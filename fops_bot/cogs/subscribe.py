@@ -7,7 +7,7 @@ from discord import app_commands
 from typing import Optional, List
 from requests.cookies import RequestsCookieJar
 from datetime import datetime, timezone
-from fops_bot.models import get_session, Subscription
+from fops_bot.models import get_read_session, Subscription
 
 # Load FurAffinity cookies from environment variables
 FA_COOKIE_A = os.getenv("FA_COOKIE_A")
@@ -16,7 +16,7 @@ FA_COOKIE_B = os.getenv("FA_COOKIE_B")
 
 def get_all_in_guild(guild_id: int) -> List[Subscription]:
     """Return all Subscription entries for a given guild."""
-    with get_session() as session:
+    with get_read_session() as session:
         return list(session.query(Subscription).filter_by(guild_id=guild_id).all())
 
 
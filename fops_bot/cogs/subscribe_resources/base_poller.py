@@ -1,4 +1,6 @@
 import os
+import json
+import random
 import discord
 import logging
 import time
@@ -7,10 +9,14 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
 from discord.ext import commands, tasks
-from fops_bot.models import get_session, Subscription
+from fops_bot.models import get_session, get_read_session, Subscription
 from cogs.subscribe_resources.filters import parse_filters, format_spoiler_post
 from cogs.guild_cog import get_guild
 from utilities.post_utils import Post, Posts
+from cogs.subscribe_resources.fair_share import FairShare, owner_of
+from utilities.redis_client import redis_client
+from utilities.database import peek_key, store_key
+from utilities.rest_scheduler import Lane, rest_scheduler
 
 from utilities.influx_metrics import send_metric
 from utilities.guild_log import (
@@ -22,6 +28,52 @@ from utilities.guild_log import (
 OWNER_UID = int(os.getenv("OWNER_UID", "0"))
 SPOILER_TAGS = set(os.getenv("SPOILER_TAGS", "gore bestiality noncon").split())
 
+DISCORD_MESSAGE_LIMIT = 2000
+
+# Posts asked for per fetch, digest groups ask for more since they batch them
+POLLER_FETCH_LIMIT = 5
+DIGEST_FETCH_LIMIT = int(os.getenv("DIGEST_FETCH_LIMIT", "50"))
+# A digest goes out once this many posts piled up, or this long after the last one
+DIGEST_MIN_POSTS = int(os.getenv("DIGEST_MIN_POSTS", "10"))
+DIGEST_WINDOW_SECONDS = int(os.getenv("DIGEST_WINDOW_SECONDS", "3600"))
+# Failed digests in a row before we give up on those posts (it pins the group)
+DIGEST_MAX_FAILURES = 3
+
+# What _deliver did
+SENT, GONE, FAILED = "sent", "gone", "failed"
+FEED_SUBTITLE = "\n-# Visit [snowsune.net/fops](https://snowsune.net/fops/redirect/) to manage this feed."
+
+# Search groups are claimed through a redis lease so any number of poller
+# processes can share the work without posting the same thing twice
+POLLER_LEASE_SECONDS = int(os.getenv("POLLER_LEASE_SECONDS", "300"))
+POLLER_CLAIM_ATTEMPTS = int(os.getenv("POLLER_CLAIM_ATTEMPTS", "5"))
+# With more than one poller running, no redis means no polling (set this!)
+POLLER_REQUIRE_LEASES = str(os.getenv("POLLER_REQUIRE_LEASES", "0")).lower() in (
+    "true",
+    "1",
+    "t",
+    "yes",
+)
+
+
+# Checkpoints are per process, replicas (and the bot) would clobber each other.
+# Has to survive a redeploy, so set it per service in compose, not the hostname
+POLLER_INSTANCE = os.getenv("POLLER_INSTANCE", "main")
+
+# How long shutdown waits for a poll cycle that is mid-delivery
+POLLER_DRAIN_SECONDS = int(os.getenv("POLLER_DRAIN_SECONDS", "20"))
+# Overdue pollers start somewhere in this window, not all at once
+POLLER_STARTUP_JITTER = int(os.getenv("POLLER_STARTUP_JITTER", "60"))
+
+
+@dataclass
+class GroupLease:
+    """A claimed search group, `lost` flips if we couldnt renew it in time"""
+
+    name: str
+    token: str
+    lost: bool = False
+
 
 class BasePollerCog(commands.Cog):
     """
@@ -38,6 +90,11 @@ class BasePollerCog(commands.Cog):
         self.consecutive_failures = 0
         self.owner_notified = False
         self._current_cycle_task: Optional[asyncio.Task] = None
+        self.fair_share = FairShare()
+        self.next_due: Optional[float] = None
+        self._digest_failures: Dict[int, int] = {}
+        # sub id -> newest post id actually sent this cycle, for a mid-cycle cancel
+        self._progress: Dict[int, int] = {}
 
     async def cog_load(self):
         """Start the polling task when the cog loads"""
@@ -51,10 +108,90 @@ class BasePollerCog(commands.Cog):
             self._current_cycle_task.cancel()
             self._current_cycle_task = None
 
-    async def fetch_latest_posts(self, search_criteria: str) -> Posts:
+    async def drain(self, timeout: float = POLLER_DRAIN_SECONDS):
+        """
+        Stop scheduling, let a running cycle finish (up to `timeout`) and
+        checkpoint our state so a restart picks up where we left off.
+        """
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
+
+        task = self._current_cycle_task
+        if task and not task.done():
+            self.logger.info(
+                f"Waiting up to {timeout}s for the {self.service_type} poll cycle to finish"
+            )
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if not done:
+                self.logger.warning(
+                    f"{self.service_type} poll cycle didnt finish in time, cancelling it"
+                )
+                task.cancel()
+
+        try:
+            await asyncio.to_thread(self.save_state)
+        except Exception as e:
+            self.logger.warning(f"Could not checkpoint {self.service_type} poller: {e}")
+
+    @property
+    def _state_key(self) -> str:
+        return f"poller_state:{self.service_type}:{POLLER_INSTANCE}"
+
+    def save_state(self):
+        state = {
+            "saved_at": time.time(),
+            "next_due": self.next_due,
+            "consecutive_failures": self.consecutive_failures,
+            "owner_notified": self.owner_notified,
+            "fair_share": self.fair_share.export(),
+        }
+        store_key(self._state_key, json.dumps(state))
+
+    def load_state(self) -> Optional[dict]:
+        """Restore what save_state wrote, returns it (or None)"""
+        raw = peek_key(self._state_key)
+        if not raw:
+            return None
+        state = json.loads(raw)
+
+        self.consecutive_failures = int(state.get("consecutive_failures", 0))
+        self.owner_notified = bool(state.get("owner_notified", False))
+        self.fair_share.restore(state.get("fair_share", []))
+        self.logger.info(f"Restored {self.service_type} poller state")
+        return state
+
+    async def _warm_start(self):
+        """Wait until we were due before the restart, or a random bit if overdue"""
+        delay = random.uniform(0, POLLER_STARTUP_JITTER)
+        try:
+            state = await asyncio.to_thread(self.load_state)
+        except Exception as e:
+            self.logger.warning(f"Could not restore {self.service_type} poller: {e}")
+            state = None
+
+        next_due = (state or {}).get("next_due")
+        if next_due and next_due > time.time():
+            delay = next_due - time.time()
+
+        self.logger.debug(f"{self.service_type} poller starting in {delay:.0f}s")
+        await asyncio.sleep(delay)
+
+    async def fetch_latest_posts(
+        self,
+        search_criteria: str,
+        since_id: Optional[int] = None,
+        limit: int = POLLER_FETCH_LIMIT,
+    ) -> Posts:
         """
         Abstract method that each platform must implement.
         Should return a Posts collection of the latest posts for the given search criteria.
+
+        If since_id is given, only posts with an id greater than it are wanted, and
+        it should return the *oldest* of those first in line (so a subscription
+        that fell behind catches up exactly instead of skipping posts). Platforms
+        that cant filter server-side can ignore it, the base class re-checks.
+        At most `limit` posts.
         """
         raise NotImplementedError("Subclasses must implement fetch_latest_posts")
 
@@ -74,37 +211,28 @@ class BasePollerCog(commands.Cog):
 
         Returns:
             tuple: (posts_to_process, action_type, reason)
-            action_type: 'post', 'skip', 'catchup', 'error'
+            action_type: 'post', 'skip'
             posts_to_process: list of Post objects to process in order (oldest first)
         """
 
         if sub.last_reported_id is None:
             # New subscription - post the latest post
-            return [posts[0]], "post", "new_subscription"
-
-        try:
-            last_reported_idx = posts.ids.index(str(sub.last_reported_id))
-            if last_reported_idx == 0:
-                # We're already at the latest post
-                return [], "skip", "no_new_posts"
-
-            # Get all posts that are newer than what we've reported
-            # Process them in order from oldest to newest
-            posts_to_process = posts.posts[:last_reported_idx]
-
-            # Vixi reverses to print the list in the right order lol
-            posts_to_process = list(reversed(posts_to_process))
-            return (
-                posts_to_process,
-                "post",
-                f"new_posts_available: {len(posts_to_process)} posts",
-            )
-
-        except ValueError:
-            # Last reported ID not found in latest posts
-            # This could mean the most recent post was deleted or we're way behind
-            # Just move to the latest post and log a warning
-            return [posts[0]], "catchup", "post_deleted_or_missing"
+            latest = max(posts.posts, key=lambda post: post.numeric_id)
+            return [latest], "post", "new_subscription"
+
+        # Ids only go up, so anything bigger than our cursor is new (even if
+        # the last post we reported was deleted since)
+        newer = posts.get_posts_newer_than(int(sub.last_reported_id))
+        if not newer:
+            return [], "skip", "no_new_posts"
+
+        # Vixi reverses to print the list in the right order lol
+        posts_to_process = list(reversed(newer))
+        return (
+            posts_to_process,
+            "post",
+            f"new_posts_available: {len(posts_to_process)} posts",
+        )
 
     async def fetch_channel_safely(
         self, channel_id: str, subscription_id
@@ -141,15 +269,8 @@ class BasePollerCog(commands.Cog):
             error_msg = f"UNEXPECTED ERROR fetching channel {channel_id} for subscription {subscription_id}: {e}"
             return None, "unexpected", error_msg
 
-    async def process_single_post(self, sub: Subscription, post: Post) -> bool:
-        """
-        Process a single post for a subscription.
-
-        Returns:
-            bool: True if post was successfully processed, False otherwise
-        """
-
-        # Apply filters
+    def _passes_filters(self, sub: Subscription, post: Post) -> bool:
+        """Check the subscriptions tag filters against a post"""
         tags = set(post.tags)
         positive_filters, negative_filters = parse_filters(sub.filters)
 
@@ -168,27 +289,18 @@ class BasePollerCog(commands.Cog):
                 f"Skipping {post.id} due to excluded tags (found {matched} in {tags})",
             )
             return False
+        return True
 
-        # Prepare message
+    def _format_post(self, sub: Subscription, post: Post, channel) -> Optional[str]:
+        """Link (with spoiler/CW if needed) for a post, None if it cant go here"""
         url = post.url
-        channel = None
-
-        # Handle PM vs channel posting
-        is_pm = getattr(sub, "is_pm", False)
-        if not is_pm:
-            channel, error_type, error_msg = await self.fetch_channel_safely(
-                str(sub.channel_id), sub.id
-            )
-            if error_type:
-                guild_log_error(self.logger, sub.guild_id, error_msg)
-                return False
 
-            # Use NSFW site if channel is NSFW and post supports it
-            if channel and hasattr(channel, "is_nsfw") and channel.is_nsfw():
-                url = post.get_display_url(use_nsfw_site=True)
+        # Use NSFW site if channel is NSFW and post supports it
+        if channel and hasattr(channel, "is_nsfw") and channel.is_nsfw():
+            url = post.get_display_url(use_nsfw_site=True)
 
         message_content, should_post = format_spoiler_post(
-            post.id, tags, url, None if is_pm else channel
+            post.id, set(post.tags), url, channel
         )
         if not should_post:
             guild_log_info(
@@ -196,73 +308,222 @@ class BasePollerCog(commands.Cog):
                 sub.guild_id,
                 f"Skipping {post.id} due to spoiler tags",
             )
+            return None
+        return message_content
+
+    def _is_frozen(self, sub: Subscription) -> bool:
+        if getattr(sub, "is_pm", False) or not sub.guild_id:
             return False
+        guild_settings = get_guild(sub.guild_id)
+        return bool(guild_settings and guild_settings.is_frozen())
 
-        subtitle = "\n-# Visit [snowsune.net/fops](https://snowsune.net/fops/redirect/) to manage this feed."
-        msg = f"{message_content}{subtitle}"
+    async def _deliver(self, sub: Subscription, channel, msg: str, what: str) -> str:
+        """
+        Send one message to the subscription's channel (or PM).
 
-        # Check if guild is pawsed!
-        if not is_pm and sub.guild_id:
-            guild_settings = get_guild(sub.guild_id)
-            if guild_settings and guild_settings.is_frozen():
-                msg = f"Guild {sub.guild_id} is FROZEN - skipping post {post.id} to channel {sub.channel_id}"
-                guild_log_warning(self.logger, sub.guild_id, msg)
-                # Return True to mark as "processed" so IDs get updated
-                # This prevents spam when the guild is unfrozen
-                return True
-
-        # Attempt to post
+        Returns SENT, GONE (the channel/user is gone or we cant post there,
+        retrying wont help) or FAILED.
+        """
         try:
-            if is_pm:
+            if getattr(sub, "is_pm", False):
                 user = await self.bot.fetch_user(sub.user_id)
-                await user.send(msg)
+                await rest_scheduler.send(Lane.FEEDS, user, msg)
                 guild_log_info(
                     self.logger,
                     sub.guild_id,
-                    f"Posted {post.id} to user {sub.user_id} ({sub.service_type} for {sub.search_criteria})",
+                    f"Posted {what} to user {sub.user_id} ({sub.service_type} for {sub.search_criteria})",
                 )
-                return True
+                return SENT
             else:
                 if channel:
-                    await channel.send(msg)
+                    await rest_scheduler.send(Lane.FEEDS, channel, msg)
                     guild_log_info(
                         self.logger,
                         sub.guild_id,
-                        f"Posted {post.id} to channel {sub.channel_id} ({sub.service_type} for {sub.search_criteria})",
+                        f"Posted {what} to channel {sub.channel_id} ({sub.service_type} for {sub.search_criteria})",
                     )
-                    return True
+                    return SENT
                 else:
                     guild_log_error(
                         self.logger,
                         sub.guild_id,
                         f"Channel {sub.channel_id} not accessible",
                     )
-                    return False
+                    return GONE
         except discord.Forbidden as e:
             guild_log_error(
                 self.logger,
                 sub.guild_id,
                 f"Permission denied posting to {sub.channel_id}: {e}",
             )
-            return False
+            return GONE
         except discord.NotFound as e:
             guild_log_error(
                 self.logger,
                 sub.guild_id,
                 f"Channel/user not found for {sub.channel_id}: {e}",
             )
-            return False
+            return GONE
         except Exception as e:
             guild_log_error(
                 self.logger,
                 sub.guild_id,
-                f"Error posting {post.id}: {e}",
+                f"Error posting {what}: {e}",
             )
+            return FAILED
+
+    async def process_single_post(self, sub: Subscription, post: Post) -> bool:
+        """
+        Process a single post for a subscription.
+
+        Returns:
+            bool: True if post was successfully processed, False otherwise
+        """
+
+        if not self._passes_filters(sub, post):
             return False
 
+        channel = None
+
+        # Handle PM vs channel posting
+        is_pm = getattr(sub, "is_pm", False)
+        if not is_pm:
+            channel, error_type, error_msg = await self.fetch_channel_safely(
+                str(sub.channel_id), sub.id
+            )
+            if error_type:
+                guild_log_error(self.logger, sub.guild_id, error_msg)
+                return False
+
+        message_content = self._format_post(sub, post, channel)
+        if message_content is None:
+            return False
+
+        msg = f"{message_content}{FEED_SUBTITLE}"
+
+        # Check if guild is pawsed!
+        if self._is_frozen(sub):
+            msg = f"Guild {sub.guild_id} is FROZEN - skipping post {post.id} to channel {sub.channel_id}"
+            guild_log_warning(self.logger, sub.guild_id, msg)
+            # Return True to mark as "processed" so IDs get updated
+            # This prevents spam when the guild is unfrozen
+            return True
+
+        return await self._deliver(sub, channel, msg, str(post.id)) == SENT
+
+    async def process_digest(
+        self, sub: Subscription, posts: List[Post]
+    ) -> Tuple[Optional[Post], int]:
+        """
+        Digest mode, send all of `posts` (oldest first) as few messages as we can.
+
+        Returns:
+            tuple: (post to move the cursor to or None, messages sent)
+        """
+
+        channel = None
+        if not getattr(sub, "is_pm", False):
+            channel, error_type, error_msg = await self.fetch_channel_safely(
+                str(sub.channel_id), sub.id
+            )
+            if error_type:
+                guild_log_error(self.logger, sub.guild_id, error_msg)
+                if error_type in ("forbidden", "not_found"):
+                    # Not coming back by itself, dont hold the group up for it
+                    return posts[-1], 0
+                return self._digest_failed(sub, posts)
+
+        if self._is_frozen(sub):
+            guild_log_warning(
+                self.logger,
+                sub.guild_id,
+                f"Guild {sub.guild_id} is FROZEN - skipping digest of {len(posts)} posts to channel {sub.channel_id}",
+            )
+            # Same as single posts, dont save them all up for the unfreeze
+            return posts[-1], 0
+
+        entries = []
+        for post in posts:
+            if not self._passes_filters(sub, post):
+                continue
+            line = self._format_post(sub, post, channel)
+            if line is not None:
+                entries.append((post, line))
+
+        if not entries:
+            # Everything filtered, nothing to say but still seen
+            return posts[-1], 0
+
+        header = f"**{len(entries)} new for {sub.search_criteria}**\n"
+        chunks = []
+        for post, line in entries:
+            if chunks and (
+                len(chunks[-1][1]) + len(line) + 1 + len(FEED_SUBTITLE)
+                <= DISCORD_MESSAGE_LIMIT
+            ):
+                chunks[-1] = (post, f"{chunks[-1][1]}\n{line}")
+            else:
+                chunks.append((post, f"{header if not chunks else ''}{line}"))
+
+        # Cursor only moves past what actually went out
+        last_sent = None
+        sent = 0
+        for post, body in chunks:
+            result = await self._deliver(
+                sub, channel, f"{body}{FEED_SUBTITLE}", f"digest up to {post.id}"
+            )
+            if result == GONE:
+                # Same as the single post path, skip past what cant be sent
+                self._digest_failures.pop(sub.id, None)
+                return posts[-1], sent
+            if result != SENT:
+                break
+            last_sent = post
+            sent += 1
+            self._progress[sub.id] = post.numeric_id
+
+        if last_sent is None:
+            return self._digest_failed(sub, posts)
+        self._digest_failures.pop(sub.id, None)
+        if last_sent is entries[-1][0]:
+            # Trailing filtered posts are done too
+            return posts[-1], sent
+        return last_sent, sent
+
+    def _digest_failed(
+        self, sub: Subscription, posts: List[Post]
+    ) -> Tuple[Optional[Post], int]:
+        """
+        Nothing went out. Keep the cursor for a retry next cycle, but every
+        sub in the group is fetched from the lowest cursor, so after a few
+        tries skip the posts rather than pin everyone else on them.
+        """
+        failures = self._digest_failures.get(sub.id, 0) + 1
+        if failures < DIGEST_MAX_FAILURES:
+            self._digest_failures[sub.id] = failures
+            return None, 0
+
+        self._digest_failures.pop(sub.id, None)
+        guild_log_warning(
+            self.logger,
+            sub.guild_id,
+            f"Digest for sub {sub.id} failed {failures} times, skipping {len(posts)} posts",
+        )
+        return posts[-1], 0
+
     async def poll_loop(self):
         """Main polling loop that runs continuously"""
+        await self._warm_start()
+
         while True:
+            if rest_scheduler.congested(Lane.FEEDS):
+                # Discord sends are backed up, new posts would just queue behind them
+                self.logger.debug(
+                    f"REST queue is backed up ({rest_scheduler.depth()}), holding off {self.service_type} poll"
+                )
+                await asyncio.sleep(30)
+                continue
+
             interval_minutes = await asyncio.to_thread(self.calculate_poll_interval)
             self.logger.debug(
                 f"Polling {self.service_type} every {interval_minutes} minutes"
@@ -273,6 +534,7 @@ class BasePollerCog(commands.Cog):
             self.logger.debug(
                 f"{self.service_type} poller cycle complete. Waiting {interval_minutes} minutes to run again."
             )
+            self.next_due = time.time() + interval_minutes * 60
             await asyncio.sleep(interval_minutes * 60)
 
     def _schedule_poll_cycle(self):
@@ -311,13 +573,13 @@ class BasePollerCog(commands.Cog):
     def calculate_poll_interval(self) -> int:
         """Calculate the polling interval based on number of subscriptions"""
         try:
-            with get_session() as session:
-                subs = (
-                    session.query(Subscription)
+            # Only the count, the cursors on a replica row could be stale
+            with get_read_session() as session:
+                num_subs = (
+                    session.query(Subscription.id)
                     .filter_by(service_type=self.service_type)
-                    .all()
+                    .count()
                 )
-                num_subs = len(subs)
                 if num_subs > 0:
                     return max(1, 60 // num_subs)
                 else:
@@ -335,27 +597,71 @@ class BasePollerCog(commands.Cog):
         search_criteria: str
         service_type: str
         filters: Optional[str]
-        last_reported_id: Optional[str]
+        last_reported_id: Optional[int]
         last_ran: Optional[int]
         is_pm: bool
+        digest: bool = False
+        last_digest_at: Optional[int] = None
 
     async def poll_task_once(self):
         """Single polling cycle - implemented by subclasses"""
         self.logger.debug(f"Running {self.service_type} poller")
 
-        load_result = await asyncio.to_thread(self._load_oldest_subscription_group)
-        if not load_result:
+        claim = await self._claim_subscription_group()
+        if not claim:
             self.logger.debug(f"No {self.service_type} subscriptions to process.")
             return
 
-        search_criteria, oldest_group = load_result
+        search_criteria, oldest_group, lease = claim
+        self.fair_share.charge_group(oldest_group)
+        keepalive = asyncio.create_task(self._keep_lease(lease)) if lease else None
+        try:
+            await self._poll_group(search_criteria, oldest_group, lease)
+        finally:
+            if keepalive:
+                keepalive.cancel()
+            if lease:
+                await self._release_lease(lease)
+
+    def _nsfw_allowed(self, sub: "BasePollerCog.SubscriptionSnapshot") -> bool:
+        """PMs always are, guild subs only if the guild turned NSFW on"""
+        if sub.guild_id is None or getattr(sub, "is_pm", False):
+            return True
+        guild_settings = get_guild(sub.guild_id)
+        return bool(guild_settings and guild_settings.nsfw())
+
+    async def _poll_group(
+        self,
+        search_criteria: str,
+        oldest_group: List["BasePollerCog.SubscriptionSnapshot"],
+        lease: Optional[GroupLease],
+    ):
         self.logger.debug(
             f"Selected group '{search_criteria}' with {len(oldest_group)} subscriptions."
         )
 
+        # Subs in guilds with NSFW off dont get anything this cycle, they just
+        # ride along at the newest post so they cant hold the window back
+        blocked = {sub.id for sub in oldest_group if not self._nsfw_allowed(sub)}
+        live = [sub for sub in oldest_group if sub.id not in blocked]
+
+        # Use the furthest-behind subscription as the cursor, so the fetch only
+        # returns what at least one of them hasnt seen yet. Brand new subs need
+        # the actual latest post, so no cursor if there are any of those.
+        cursors = [sub.last_reported_id for sub in live]
+        since_id = min(cursors) if cursors and None not in cursors else None
+        # Digests batch up, so theres no point fetching five at a time for them
+        limit = (
+            DIGEST_FETCH_LIMIT
+            if any(sub.digest for sub in live)
+            else POLLER_FETCH_LIMIT
+        )
+
         # Fetch latest posts for this search criteria
         try:
-            posts = await self.fetch_latest_posts(search_criteria)
+            posts = await self.fetch_latest_posts(
+                search_criteria, since_id=since_id, limit=limit
+            )
             if self.consecutive_failures > 0:
                 self.logger.info(
                     f"{self.service_type} API call successful, resetting failure counter from {self.consecutive_failures}"
@@ -368,7 +674,12 @@ class BasePollerCog(commands.Cog):
             return
 
         if not posts:
-            self.logger.warning(f"No posts found for {search_criteria}.")
+            if since_id is None:
+                self.logger.warning(f"No posts found for {search_criteria}.")
+            else:
+                self.logger.debug(
+                    f"No posts newer than {since_id} for {search_criteria}."
+                )
             now = int(time.time())
             await asyncio.to_thread(
                 self._persist_subscription_updates,
@@ -380,114 +691,188 @@ class BasePollerCog(commands.Cog):
             return
 
         now = int(time.time())
+        newest_id = max(post.numeric_id for post in posts.posts)
         self.logger.debug(f"Latest post IDs for '{search_criteria}': {posts.ids}")
 
-        guild_cache: Dict[int, Optional[object]] = {}
         updates = []
+        delivered: Dict[Tuple[str, int], int] = {}
+        self._progress = {}
 
-        for sub in oldest_group:
-            self.logger.debug(
-                f"Processing Subscription {sub.id} ({sub.search_criteria}) (user {sub.user_id}, channel {sub.channel_id})"
-            )
+        try:
+            # Whoever is owed the most gets their posts out first
+            for sub in sorted(
+                oldest_group, key=lambda s: self.fair_share.tag(owner_of(s))
+            ):
+                self.logger.debug(
+                    f"Processing Subscription {sub.id} ({sub.search_criteria}) (user {sub.user_id}, channel {sub.channel_id})"
+                )
+
+                owner = owner_of(sub)
+                send_metric(
+                    "feed_lag_seconds",
+                    sub.guild_id or 0,
+                    now - (sub.last_ran or now),
+                    service=self.service_type,
+                    owner=f"{owner[0]}:{owner[1]}",
+                )
 
-            is_pm = getattr(sub, "is_pm", False)
-            if sub.guild_id is not None and not is_pm:
-                if sub.guild_id not in guild_cache:
-                    guild_cache[sub.guild_id] = get_guild(sub.guild_id)
-                guild_settings = guild_cache[sub.guild_id]
-                if not guild_settings or not guild_settings.nsfw():
+                if sub.id in blocked:
                     guild_log_info(
                         self.logger,
                         sub.guild_id,
                         f"Skipping Subscription {sub.id} ({sub.search_criteria}) because NSFW is disabled",
                     )
-                    updates.append((sub.id, {"last_ran": now}))
+                    fields = {"last_ran": now}
+                    if (sub.last_reported_id or 0) < newest_id:
+                        fields["last_reported_id"] = newest_id
+                    updates.append((sub.id, fields))
                     continue
 
-            posts_to_process, action, reason = self.determine_posts_to_process(
-                sub, posts
-            )
-
-            if action == "skip":
-                self.logger.debug(
-                    f"Subscription {sub.id} ({sub.search_criteria}): {reason}"
-                )
-                updates.append((sub.id, {"last_ran": now}))
-                continue
-            elif action == "catchup":
-                guild_log_warning(
-                    self.logger,
-                    sub.guild_id,
-                    f"Subscription {sub.id} ({sub.search_criteria}): {reason}",
-                )
-                updates.append(
-                    (
-                        sub.id,
-                        {"last_reported_id": posts_to_process[0].id, "last_ran": now},
-                    )
-                )
-                continue
-            elif action == "post":
-                guild_log_info(
-                    self.logger,
-                    sub.guild_id,
-                    f"Subscription {sub.id} ({sub.search_criteria}): {reason} - processing {len(posts_to_process)} posts",
+                posts_to_process, action, reason = self.determine_posts_to_process(
+                    sub, posts
                 )
 
-                last_successful_post = None
-                for post in posts_to_process:
+                if action == "post" and sub.digest:
+                    # Let a few pile up, unless the fetch came back full
+                    due = (
+                        sub.last_digest_at is None
+                        or now - sub.last_digest_at >= DIGEST_WINDOW_SECONDS
+                    )
+                    if not (
+                        due
+                        or len(posts) >= limit
+                        or len(posts_to_process) >= DIGEST_MIN_POSTS
+                    ):
+                        action = "skip"
+                        reason = f"digest holding {len(posts_to_process)} posts"
+
+                if action == "post" and not sub.digest:
+                    # Fetched a big page for the digests in this group, the
+                    # rest stays past the cursor for next cycle
+                    posts_to_process = posts_to_process[:POLLER_FETCH_LIMIT]
+
+                    # Anything over the owners quota stays past the cursor for
+                    # the next cycle
+                    quota = self.fair_share.post_quota(owner)
+                    if quota:
+                        remaining = max(0, quota - delivered.get(owner, 0))
+                        if remaining < len(posts_to_process):
+                            posts_to_process = posts_to_process[:remaining]
+                            reason += f" (quota, sending {remaining})"
+                            if not posts_to_process:
+                                action = "skip"
+
+                if action == "skip":
+                    self.logger.debug(
+                        f"Subscription {sub.id} ({sub.search_criteria}): {reason}"
+                    )
+                    updates.append((sub.id, {"last_ran": now}))
+                    continue
+                elif action == "post":
                     guild_log_info(
                         self.logger,
                         sub.guild_id,
-                        f"Processing post {post.id} for sub {sub.id}",
+                        f"Subscription {sub.id} ({sub.search_criteria}): {reason} - processing {len(posts_to_process)} posts",
                     )
 
-                    post_success = await self.process_single_post(sub, post)
+                    if sub.digest:
+                        cursor_post, sent = await self.process_digest(
+                            sub, posts_to_process
+                        )
+                        self.fair_share.charge(owner, sent)
+                        if sent:
+                            send_metric(
+                                "auto_post",
+                                sub.guild_id or 0,
+                                len(posts_to_process),
+                                sub_id=str(sub.id),
+                                digest="true",
+                            )
+                        fields = {"last_ran": now}
+                        if cursor_post:
+                            fields["last_reported_id"] = cursor_post.numeric_id
+                        if sent:
+                            fields["last_digest_at"] = now
+                        updates.append((sub.id, fields))
+                        continue
+
+                    last_successful_post = None
+                    for post in posts_to_process:
+                        if lease and lease.lost:
+                            # Someone else may own this group now, stop here and
+                            # just save what we got through
+                            break
 
-                    if post_success:
-                        last_successful_post = post
                         guild_log_info(
                             self.logger,
                             sub.guild_id,
-                            f"Successfully processed {post.id} for sub {sub.id}",
+                            f"Processing post {post.id} for sub {sub.id}",
                         )
-                        send_metric(
-                            "auto_post",
-                            sub.guild_id or 0,
-                            sub_id=str(sub.id),
-                            post_id=str(post.id),
-                        )
-                    else:
-                        guild_log_warning(
-                            self.logger,
-                            sub.guild_id,
-                            f"Failed to post {post.id} for sub {sub.id}",
-                        )
-
-                if not posts_to_process:
-                    updates.append((sub.id, {"last_ran": now}))
-                    continue
 
-                if last_successful_post:
-                    updates.append(
-                        (
-                            sub.id,
-                            {
-                                "last_reported_id": last_successful_post.id,
-                                "last_ran": now,
-                            },
+                        post_success = await self.process_single_post(sub, post)
+                        delivered[owner] = delivered.get(owner, 0) + 1
+
+                        if post_success:
+                            self.fair_share.charge(owner)
+                            last_successful_post = post
+                            self._progress[sub.id] = post.numeric_id
+                            guild_log_info(
+                                self.logger,
+                                sub.guild_id,
+                                f"Successfully processed {post.id} for sub {sub.id}",
+                            )
+                            send_metric(
+                                "auto_post",
+                                sub.guild_id or 0,
+                                sub_id=str(sub.id),
+                                post_id=str(post.id),
+                            )
+                        else:
+                            guild_log_warning(
+                                self.logger,
+                                sub.guild_id,
+                                f"Failed to post {post.id} for sub {sub.id}",
+                            )
+
+                    if not posts_to_process or (
+                        lease and lease.lost and not last_successful_post
+                    ):
+                        updates.append((sub.id, {"last_ran": now}))
+                        continue
+
+                    if last_successful_post:
+                        updates.append(
+                            (
+                                sub.id,
+                                {
+                                    "last_reported_id": last_successful_post.numeric_id,
+                                    "last_ran": now,
+                                },
+                            )
                         )
-                    )
-                else:
-                    updates.append(
-                        (
-                            sub.id,
-                            {
-                                "last_reported_id": posts_to_process[-1].id,
-                                "last_ran": now,
-                            },
+                    else:
+                        updates.append(
+                            (
+                                sub.id,
+                                {
+                                    "last_reported_id": posts_to_process[-1].numeric_id,
+                                    "last_ran": now,
+                                },
+                            )
                         )
-                    )
+        except asyncio.CancelledError:
+            # Drain timed out mid-delivery, save what already went out so it
+            # isnt posted again after the restart (including the sub we were
+            # part way through)
+            finished = {sub_id for sub_id, _ in updates}
+            updates += [
+                (sub_id, {"last_reported_id": cursor, "last_ran": now})
+                for sub_id, cursor in self._progress.items()
+                if sub_id not in finished
+            ]
+            if updates:
+                await asyncio.to_thread(self._persist_subscription_updates, updates)
+            raise
 
         if updates:
             await asyncio.to_thread(self._persist_subscription_updates, updates)
@@ -495,18 +880,95 @@ class BasePollerCog(commands.Cog):
                 f"Committed updates for {len(updates)} subscriptions in group '{search_criteria}'."
             )
 
-    def _load_oldest_subscription_group(self):
-        from collections import defaultdict
+    async def _claim_subscription_group(
+        self,
+    ) -> Optional[
+        Tuple[str, List["BasePollerCog.SubscriptionSnapshot"], Optional[GroupLease]]
+    ]:
+        """
+        Pick the most overdue search group nobody else is working on.
 
-        with get_session() as session:
-            subs = (
-                session.query(Subscription)
-                .filter_by(service_type=self.service_type)
-                .all()
+        Returns (search_criteria, group, lease), lease is None if we are
+        running without redis.
+        """
+
+        groups = await asyncio.to_thread(self._load_subscription_groups)
+        groups = self.fair_share.order_groups(groups, int(time.time()))
+        for search_criteria, group in groups[:POLLER_CLAIM_ATTEMPTS]:
+            name = f"poller:{self.service_type}:{search_criteria}"
+            lease = None
+            try:
+                token = await asyncio.to_thread(
+                    redis_client.acquire_lease, name, POLLER_LEASE_SECONDS
+                )
+            except Exception as e:
+                if POLLER_REQUIRE_LEASES:
+                    self.logger.warning(
+                        f"Could not claim {self.service_type} group, skipping cycle: {e}"
+                    )
+                    return None
+                self.logger.debug(f"Redis unavailable, polling without a lease: {e}")
+            else:
+                if token is None:
+                    self.logger.debug(f"Group '{search_criteria}' is claimed elsewhere")
+                    continue
+                lease = GroupLease(name, token)
+
+            # Our list came from the replica (maybe seconds behind) and is from
+            # before the claim, the cursors may have moved since. Always deliver
+            # off a fresh read from the primary, and bail if it was polled in
+            # the meantime.
+            fresh = await asyncio.to_thread(
+                self._load_subscription_groups, search_criteria, True
             )
+            if fresh and _group_last_ran(fresh[0][1]) <= _group_last_ran(group):
+                return search_criteria, fresh[0][1], lease
 
-            if not subs:
-                return None
+            if lease:
+                await self._release_lease(lease)
+
+        return None
+
+    async def _keep_lease(self, lease: GroupLease):
+        """Renew the lease while a (possibly long) delivery is running"""
+        while True:
+            await asyncio.sleep(POLLER_LEASE_SECONDS / 3)
+            try:
+                renewed = await asyncio.to_thread(
+                    redis_client.renew_lease,
+                    lease.name,
+                    lease.token,
+                    POLLER_LEASE_SECONDS,
+                )
+            except Exception as e:
+                self.logger.warning(f"Could not renew lease {lease.name}: {e}")
+                continue
+            if not renewed:
+                self.logger.warning(f"Lost lease {lease.name}, stopping delivery")
+                lease.lost = True
+                return
+
+    async def _release_lease(self, lease: GroupLease):
+        try:
+            await asyncio.to_thread(redis_client.release_lease, lease.name, lease.token)
+        except Exception as e:
+            # It expires on its own anyway
+            self.logger.debug(f"Could not release lease {lease.name}: {e}")
+
+    def _load_subscription_groups(
+        self, search_criteria: Optional[str] = None, primary: bool = False
+    ) -> List[Tuple[str, List["BasePollerCog.SubscriptionSnapshot"]]]:
+        """All (search_criteria, subscriptions) groups, most overdue first"""
+        from collections import defaultdict
+
+        open_session = get_session if primary else get_read_session
+        with open_session() as session:
+            query = session.query(Subscription).filter_by(
+                service_type=self.service_type
+            )
+            if search_criteria is not None:
+                query = query.filter_by(search_criteria=search_criteria)
+            subs = query.all()
 
             groups = defaultdict(list)
             for sub in subs:
@@ -518,23 +980,15 @@ class BasePollerCog(commands.Cog):
                     search_criteria=sub.search_criteria,
                     service_type=sub.service_type,
                     filters=sub.filters,
-                    last_reported_id=(
-                        str(sub.last_reported_id)
-                        if sub.last_reported_id is not None
-                        else None
-                    ),
+                    last_reported_id=sub.last_reported_id,
                     last_ran=sub.last_ran,
                     is_pm=getattr(sub, "is_pm", False),
+                    digest=bool(getattr(sub, "digest", False)),
+                    last_digest_at=sub.last_digest_at,
                 )
                 groups[sub.search_criteria].append(snapshot)
 
-            def group_last_ran(group):
-                times = [s.last_ran or 0 for s in group]
-                return min(times) if times else 0
-
-            oldest_group = min(groups.values(), key=group_last_ran)
-            search_criteria = oldest_group[0].search_criteria
-            return search_criteria, oldest_group
+        return sorted(groups.items(), key=lambda item: _group_last_ran(item[1]))
 
     def _persist_subscription_updates(
         self, updates: List[Tuple[int, Dict[str, object]]]
@@ -575,3 +1029,15 @@ class BasePollerCog(commands.Cog):
         self.logger.debug(
             f"Marked {len(oldest_group)} subscriptions as checked after error."
         )
+
+
+def _group_last_ran(group) -> int:
+    times = [s.last_ran or 0 for s in group]
+    return min(times) if times else 0
+
+
+async def drain_pollers(bot, timeout: float = POLLER_DRAIN_SECONDS):
+    """Drain every poller cog on `bot` at once (shutdown helper)"""
+    pollers = [cog for cog in bot.cogs.values() if isinstance(cog, BasePollerCog)]
+    if pollers:
+        await asyncio.gather(*(cog.drain(timeout) for cog in pollers))
@@ -0,0 +1,131 @@
+import os
+import math
+import logging
+from typing import Dict, Hashable, Iterable, Tuple
+
+"""
+Weighted fair sharing of the feed pollers between guilds (and PM users).
+
+Every subscription has an owner, its guild or the user for PM feeds. Each
+owner has a virtual clock that moves forward whenever we spend something on
+them (a poll of one of their groups, a post delivered), slower the higher
+their weight. The poller picks the group whose owner is furthest behind, so a
+guild with hundreds of busy feeds cant starve everyone else.
+
+Weights are set with FEED_GUILD_WEIGHTS / FEED_USER_WEIGHTS, ex
+"123456789:2,987654321:0.5" (anyone not listed gets 1).
+"""
+
+logger = logging.getLogger(__name__)
+
+# Posts delivered per owner per cycle at weight 1 (the rest wait a cycle)
+FEED_POSTS_PER_CYCLE = int(os.getenv("FEED_POSTS_PER_CYCLE", "10"))
+# Groups polled more recently than this go to the back of the line
+FEED_MIN_REPOLL_SECONDS = int(os.getenv("FEED_MIN_REPOLL_SECONDS", "300"))
+
+Owner = Tuple[str, int]
+
+
+def parse_weights(value: str) -> Dict[int, float]:
+    """ "id:weight,id:weight" -> {id: weight}, skipping anything malformed"""
+    weights = {}
+    for part in (value or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        try:
+            owner_id, weight = part.split(":")
+            weights[int(owner_id)] = max(float(weight), 0.01)
+        except ValueError:
+            logger.warning(f"Ignoring bad feed weight {part!r}")
+    return weights
+
+
+def owner_of(sub) -> Owner:
+    """Who a subscription counts against"""
+    if getattr(sub, "is_pm", False) or sub.guild_id is None:
+        return ("user", sub.user_id or 0)
+    return ("guild", sub.guild_id)
+
+
+FEED_GUILD_WEIGHTS = parse_weights(os.getenv("FEED_GUILD_WEIGHTS", ""))
+FEED_USER_WEIGHTS = parse_weights(os.getenv("FEED_USER_WEIGHTS", ""))
+
+
+class FairShare:
+    """One per poller, the clocks only cover that services subscriptions"""
+
+    def __init__(
+        self,
+        guild_weights: Dict[int, float] = None,
+        user_weights: Dict[int, float] = None,
+    ):
+        self.guild_weights = (
+            FEED_GUILD_WEIGHTS if guild_weights is None else guild_weights
+        )
+        self.user_weights = FEED_USER_WEIGHTS if user_weights is None else user_weights
+        self._clock: Dict[Hashable, float] = {}
+
+    def weight(self, owner: Owner) -> float:
+        kind, owner_id = owner
+        weights = self.user_weights if kind == "user" else self.guild_weights
+        return weights.get(owner_id, 1.0)
+
+    def tag(self, owner: Owner) -> float:
+        """Virtual time for this owner, lower means they are owed more"""
+        if owner not in self._clock:
+            # Newcomers start level with the furthest behind, not at zero,
+            # otherwise they would get every cycle until they caught up
+            self._clock[owner] = min(self._clock.values(), default=0.0)
+        return self._clock[owner]
+
+    def charge(self, owner: Owner, cost: float = 1.0) -> None:
+        self._clock[owner] = self.tag(owner) + cost / self.weight(owner)
+
+    def export(self) -> list:
+        return [
+            [kind, owner_id, clock] for (kind, owner_id), clock in self._clock.items()
+        ]
+
+    def restore(self, items: list) -> None:
+        for kind, owner_id, clock in items:
+            self._clock[(kind, int(owner_id))] = float(clock)
+
+    def post_quota(self, owner: Owner) -> int:
+        """How many posts this owner gets per cycle (0 means no limit)"""
+        if FEED_POSTS_PER_CYCLE <= 0:
+            return 0
+        return max(1, math.ceil(FEED_POSTS_PER_CYCLE * self.weight(owner)))
+
+    def group_tag(self, group: Iterable) -> float:
+        """A group is as urgent as the most owed owner in it"""
+        return min((self.tag(owner_of(sub)) for sub in group), default=0.0)
+
+    def charge_group(self, group: Iterable) -> None:
+        """Split the cost of one poll between everyone sharing the group"""
+        owners = {owner_of(sub) for sub in group}
+        for owner in owners:
+            self.charge(owner, 1.0 / len(owners))
+
+    def order_groups(self, groups, now: int):
+        """
+        Sort [(search_criteria, group)] by who is owed the most.
+
+        Groups polled in the last FEED_MIN_REPOLL_SECONDS go last, so a tiny
+        guild doesnt get the same feed hammered every cycle.
+        """
+
+        def key(item):
+            group = item[1]
+            last_ran = min((sub.last_ran or 0 for sub in group), default=0)
+            recent = now - last_ran < FEED_MIN_REPOLL_SECONDS
+            return (recent, self.group_tag(group), last_ran)
+
+        ordered = sorted(groups, key=key)
+
+        # Forget owners that dont have any subscriptions anymore
+        live = {owner_of(sub) for _, group in groups for sub in group}
+        for owner in list(self._clock):
+            if owner not in live:
+                del self._clock[owner]
+
+        return ordered
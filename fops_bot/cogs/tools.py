@@ -8,15 +8,16 @@ from datetime import datetime
 
 from utilities.influx_metrics import send_metric
 from utilities.redis_client import redis_client
+from utilities.rest_scheduler import Lane, rest_scheduler
 
 from utilities.common import seconds_until
 from utilities.database import (
-    store_key_number,
-    retrieve_key_number,
+    increment_number,
+    retrieve_key,
     get_db_info,
 )
 from cogs.changelog import get_current_changelog
-from fops_bot.models import get_session, KeyValueStore
+from fops_bot.models import pool_stats
 
 
 class ToolCog(commands.Cog, name="ToolsCog"):
@@ -32,6 +33,8 @@ class ToolCog(commands.Cog, name="ToolsCog"):
         # Start tasks
         self.update_status.start()
         self.reset_counter_task.start()
+        if not self.report_db_pools.is_running():
+            self.report_db_pools.start()
 
     @tasks.loop(minutes=1)  # Run every minute
     async def update_status(self):
@@ -67,6 +70,19 @@ class ToolCog(commands.Cog, name="ToolsCog"):
         # Set the bot's activity status
         await self.bot.change_presence(activity=discord.Game(name=new_status))
 
+    @tasks.loop(minutes=1)
+    async def report_db_pools(self):
+        """
+        Ship connection pool usage per route (primary/replica) to InfluxDB
+        """
+
+        for route, stats in pool_stats().items():
+            send_metric("db_pool_checked_out", 0, stats["checked_out"], route=route)
+            send_metric("db_pool_overflow", 0, stats["overflow"], route=route)
+            send_metric("db_sessions", 0, stats["sessions"], route=route)
+            if stats.get("lag_seconds") is not None:
+                send_metric("db_replica_lag_ms", 0, int(stats["lag_seconds"] * 1000))
+
     @commands.Cog.listener()
     async def on_app_command_completion(self, ctx, cmd):
         """
@@ -124,6 +140,11 @@ class ToolCog(commands.Cog, name="ToolsCog"):
                 jobs_count = health_data.get("jobs", 0)
                 if jobs_count > 0:
                     yt_dlp_version += f" ({jobs_count} jobs)"
+                if health_data.get("download_p95") is not None:
+                    yt_dlp_version += (
+                        f", downloads {health_data['download_p50']:.0f}s"
+                        f"/{health_data['download_p95']:.0f}s p50/p95"
+                    )
             else:
                 yt_dlp_version = "Service unavailable (no health data)"
         except Exception as e:
@@ -162,29 +183,21 @@ class ToolCog(commands.Cog, name="ToolsCog"):
         except Exception as e:
             changelog_title = f"Error: {e}"
 
-        # DB status and version count (sanitize vc)
+        # DB status and version count
         try:
-            if True:
-                try:
-                    vc = retrieve_key_number("version_count", 0)
-                    if not isinstance(vc, int) or vc is None:
-                        vc = 0
-                    self.logger.info(f"Retrieved vc as {vc}")
-                    dbstatus = "Ready"
-                except Exception as e:
-                    self.logger.error(f"Error retrieving key, error was {e}")
-                    dbstatus = "Not Ready (connected but cant retrieve now)"
-
-                store_key_number("version_count", (vc or 0) + 1)
-            else:
-                dbstatus = "Not Ready"
+            vc = increment_number("version_count")
+            self.logger.info(f"Bumped vc to {vc}")
+            dbstatus = "Ready"
         except Exception as e:
-            self.logger.error(f"Couldn't check db at all, error was {e}")
+            self.logger.error(f"Error incrementing key, error was {e}")
+            dbstatus = "Not Ready (connected but cant retrieve now)"
 
-        with get_session() as session:
-            kv = session.get(KeyValueStore, "fa_last_poll")
-            if kv and kv.value:
-                fa_last_poll_str = f"Last FA Poll was <t:{kv.value}:R>."
+        try:
+            fa_last_poll = retrieve_key("fa_last_poll", "")
+            if fa_last_poll:
+                fa_last_poll_str = f"Last FA Poll was <t:{fa_last_poll}:R>."
+        except Exception as e:
+            self.logger.error(f"Couldn't read fa_last_poll, error was {e}")
 
         msg = (
             f"**Version:** `{self.bot.version}`\n"
@@ -197,7 +210,7 @@ class ToolCog(commands.Cog, name="ToolsCog"):
         if fa_last_poll_str:
             msg += f"\n{fa_last_poll_str}"
         # Follow up with the collected data
-        await ctx.followup.send(msg)
+        await rest_scheduler.send(Lane.INTERACTION, ctx.followup, msg)
 
 
 async def setup(bot):
@@ -4,6 +4,7 @@ from discord import app_commands
 from discord.ext import commands
 import asyncio
 import logging
+from utilities.rest_scheduler import Lane, rest_scheduler
 
 OWNER_UID = int(os.getenv("OWNER_UID", "0"))
 
@@ -28,16 +29,21 @@ class VixiThinks(commands.Cog):
 
         owner = self.bot.get_user(OWNER_UID) or await self.bot.fetch_user(OWNER_UID)
         if not owner:
-            await interaction.followup.send(
-                "Ah! Couldn't connect to the vixisphere >:3", ephemeral=True
+            await rest_scheduler.send(
+                Lane.INTERACTION,
+                interaction.followup,
+                "Ah! Couldn't connect to the vixisphere >:3",
+                ephemeral=True,
             )
             return
 
         # DM the owner with the original message content
-        forwarded = await owner.send(
+        forwarded = await rest_scheduler.send(
+            Lane.BULK,
+            owner,
             f"**Forwarded from <#{interaction.channel.id}> by {interaction.user.mention}**\n"
             f"{message.content}\n\n"
-            f"*(Don't forget to reply to this message!)*"
+            f"*(Don't forget to reply to this message!)*",
         )
 
         # Save mapping from the DM message to the original channel/message
@@ -59,9 +65,17 @@ class VixiThinks(commands.Cog):
                     channel = await self.bot.fetch_channel(channel_id)
                 try:
                     original_msg = await channel.fetch_message(original_message_id)
-                    await original_msg.reply(f"**Vixi Thinks:** {message.content}")
+                    await rest_scheduler.reply(
+                        Lane.INTERACTION,
+                        original_msg,
+                        f"**Vixi Thinks:** {message.content}",
+                    )
                 except discord.HTTPException:
-                    await message.channel.send("Failed to reply to original message.")
+                    await rest_scheduler.send(
+                        Lane.INTERACTION,
+                        message.channel,
+                        "Failed to reply to original message.",
+                    )
 
                 # Clean up
                 del self.thinking_messages[message.reference.message_id]
@@ -12,26 +12,67 @@ from urllib.parse import urlparse, urlunparse
 
 from cogs.guild_cog import get_guild
 from utilities.influx_metrics import send_metric
+from utilities.rest_scheduler import Lane, rest_scheduler
 from utilities.guild_log import (
     info as guild_log_info,
     warning as guild_log_warning,
     error as guild_log_error,
 )
-from rq import Queue
+from rq import Callback, Queue
 from rq.job import Job
 from redis import Redis
+from rq.exceptions import NoSuchJobError
+from utilities.ytdlp_events import (
+    YTDLP_FAILURE_TTL,
+    YTDLP_RESULT_TTL,
+    get_pool,
+    job_waiter,
+    on_job_failure,
+)
+from utilities.ytdlp_cache import (
+    cache_key,
+    canonicalize_url,
+    claim_inflight,
+    release_inflight,
+    replace_inflight,
+    result_cache,
+)
+from utilities.ytdlp_queues import (
+    YTDLP_QUEUE,
+    JobThrottled,
+    admit,
+    queue_for,
+    release,
+)
+from utilities.ytdlp_health import WorkersUnavailable, unavailable
+from utilities.redis_client import redis_client
+from utilities.yt_dlp_logic import DISCORD_FILE_SIZE_LIMIT
 
+# One admin heads up per guild per this long while the workers are down
+WORKER_ALERT_SECONDS = int(os.getenv("YTDLP_WORKER_ALERT_SECONDS", "1800"))
 
 # RQ Queue setup
-def get_rq_queue():
-    """Get RQ queue for yt-dlp jobs"""
-    redis_host = os.environ.get("REDIS_HOST", "redis")
-    redis_port = int(os.environ.get("REDIS_PORT", "6379"))
-    redis_db = int(os.environ.get("REDIS_DB", "0"))
-    redis_conn = Redis(
-        host=redis_host, port=redis_port, db=redis_db, decode_responses=False
-    )
-    return Queue("ytdlp", connection=redis_conn)
+_rq_queues = {}
+
+
+def get_rq_queue(name=YTDLP_QUEUE):
+    """Get RQ queue for yt-dlp jobs (one per lane, on a pooled connection)"""
+    if name not in _rq_queues:
+        _rq_queues[name] = Queue(name, connection=Redis(connection_pool=get_pool()))
+    return _rq_queues[name]
+
+
+# Worker heartbeat, cached a little so a burst of links is one redis read
+_worker_health = (0.0, None)
+
+
+async def get_worker_health():
+    global _worker_health
+    fetched_at, health = _worker_health
+    if time.monotonic() - fetched_at > 5:
+        health = await asyncio.to_thread(redis_client.get_service_health, "ytdlp")
+        _worker_health = (time.monotonic(), health)
+    return health
 
 
 def convert_twitter_link_to_alt(
@@ -71,129 +112,163 @@ def message_contains(message: discord.Message, valid_domains: dict) -> Optional[
     return None
 
 
-async def submit_yt_dlp_job(url):
+async def submit_yt_dlp_job(url, guild_id=None, user_id=None):
     """
     Submits a job to the yt-dlp service via RQ.
 
+    If the same video is already being fetched, attaches to that job instead
+    of starting another one. New jobs count against the guild's and user's
+    allowance and go in a queue by how heavy the link probably is.
+
     Args:
         url (str): The URL of the video to download.
+        guild_id (int): Guild the link was posted in.
+        user_id (int): Who posted it.
 
     Returns:
-        Job: The RQ job object if successful, None otherwise.
+        (Job, bool): The RQ job (None on failure) and whether it was an
+        existing job we attached to.
+
+    Raises:
+        JobThrottled: The guild or user is over their allowance.
+        WorkersUnavailable: No worker is up (or they're all swamped).
     """
+    queue = get_rq_queue(queue_for(url))
+    job_id = str(uuid.uuid4())
+    key = cache_key(url, DISCORD_FILE_SIZE_LIMIT)
+
     try:
-        queue = get_rq_queue()
-        job = queue.enqueue(
+        owner = await asyncio.to_thread(claim_inflight, key, job_id)
+        if owner:
+            try:
+                job = await asyncio.to_thread(
+                    Job.fetch, owner, connection=queue.connection
+                )
+                return job, True
+            except NoSuchJobError:
+                # Marker outlived its job, take it over
+                await asyncio.to_thread(replace_inflight, key, job_id)
+
+        # No point queueing if nobody is there to take it
+        reason = unavailable(await get_worker_health())
+        if reason:
+            raise WorkersUnavailable(reason)
+
+        await asyncio.to_thread(admit, guild_id, user_id, job_id)
+
+        job = await asyncio.to_thread(
+            queue.enqueue,
             "utilities.yt_dlp_logic.process_video",
-            url,
-            job_id=str(uuid.uuid4()),
+            canonicalize_url(url),
+            job_id=job_id,
             job_timeout=600,  # Job timeout in seconds
+            # Nobody reads a job after its result key is gone
+            result_ttl=YTDLP_RESULT_TTL,
+            failure_ttl=YTDLP_FAILURE_TTL,
+            on_failure=Callback(on_job_failure),
+            # The worker gives the running slot back, it needs to know whose
+            meta={"guild_id": guild_id, "user_id": user_id},
         )
-        return job
+        return job, False
+    except (JobThrottled, WorkersUnavailable):
+        await asyncio.to_thread(release_inflight, key, job_id)
+        raise
     except Exception as e:
         logging.error(f"Failed to enqueue job: {e}")
-        return None
+        await asyncio.to_thread(release_inflight, key, job_id)
+        await asyncio.to_thread(release, guild_id, user_id, job_id)
+        return None, False
 
 
-async def wait_for_job_completion(job, timeout=300):
+def _job_state(job):
+    job.refresh()
+    return job.get_status(), job.result
+
+
+async def wait_for_job_completion(job, timeout=300) -> Optional[dict]:
     """
-    Waits for job completion using RQ.
+    Waits for the worker to announce the job is over.
 
     Args:
         job: The RQ job object.
         timeout (int): The timeout in seconds.
 
     Returns:
-        bool: True if the job completed successfully, False otherwise.
+        dict: The job's status dict ("status" is "done" or "failed"), or
+        None if it timed out.
     """
     if not job:
-        return False
+        return {"status": "failed", "error": "no job"}
 
-    loop = asyncio.get_event_loop()
+    try:
+        status_data = await job_waiter.wait(job.id, timeout)
+    except Exception as e:
+        logging.warning(f"Lost the yt-dlp event stream waiting on {job.id}: {e}")
+        status_data = None
 
-    def _wait_for_result():
+    if status_data is None:
+        # Either it really timed out or we missed the event, ask RQ directly
         try:
-            start_time = time.time()
-            # Poll for job completion with timeout
-            while time.time() - start_time < timeout:
-                # Refresh job from Redis to get latest status
-                job.refresh()
-                status = job.get_status()
-                if status == "finished":
-                    result = job.result
-                    if (
-                        result
-                        and isinstance(result, dict)
-                        and result.get("status") == "done"
-                    ):
-                        logging.info(f"Job {job.id} completed successfully")
-                        return True
-                    else:
-                        logging.warning(
-                            f"Job {job.id} failed or returned no result: {result}"
-                        )
-                        return False
-                elif status == "failed":
-                    logging.warning(f"Job {job.id} failed")
-                    return False
-                elif status in ("queued", "started"):
-                    time.sleep(0.5)  # Poll every 0.5 seconds
-                    continue
-                else:
-                    time.sleep(0.5)
-
-            # Timeout reached
-            logging.warning(f"Job {job.id} timed out after {timeout}s")
-            return False
+            status, result = await asyncio.to_thread(_job_state, job)
         except Exception as e:
-            logging.error(f"Error waiting for job {job.id}: {e}")
-            import traceback
-
-            logging.error(traceback.format_exc())
-            return False
+            logging.error(f"Error checking job {job.id}: {e}")
+            return None
+        if status == "finished" and isinstance(result, dict):
+            status_data = result
+        elif status == "failed":
+            status_data = {"status": "failed", "error": "job failed"}
+        else:
+            logging.warning(f"Job {job.id} timed out after {timeout}s")
+            return None
 
-    return await loop.run_in_executor(None, _wait_for_result)
+    if status_data.get("status") == "done":
+        logging.info(f"Job {job.id} completed successfully")
+    else:
+        logging.warning(f"Job {job.id} failed: {status_data.get('error')}")
+    return status_data
 
 
-async def download_yt_dlp_result(job, temp_file_path):
+async def download_yt_dlp_result(job, temp_file_path, status_data=None):
     """Copy result file from yt-dlp service to temp location"""
-    if not job:
+    if not job and status_data is None:
         logging.warning("No job provided")
         return None
+    label = job.id if job else "cache"
 
-    # Refresh job to get latest result
-    try:
-        job.refresh()
-    except Exception as e:
-        logging.warning(f"Failed to refresh job {job.id}: {e}")
+    if status_data is None:
+        # Refresh job to get latest result
+        try:
+            job.refresh()
+        except Exception as e:
+            logging.warning(f"Failed to refresh job {job.id}: {e}")
+        status_data = job.result
 
-    if not job.result:
-        logging.warning(f"Job {job.id}: No result data")
+    if not status_data:
+        logging.warning(f"Job {label}: No result data")
         return None
 
-    status_data = job.result
     if not isinstance(status_data, dict):
-        logging.warning(f"Job {job.id}: Result is not a dict: {type(status_data)}")
+        logging.warning(f"Job {label}: Result is not a dict: {type(status_data)}")
         return None
     status = status_data.get("status")
     if status != "done":
-        logging.warning(f"Job {job.id}: Status is '{status}', expected 'done'")
+        logging.warning(f"Job {label}: Status is '{status}', expected 'done'")
         return None
 
     result_path = status_data.get("result_path")
     if not result_path:
-        logging.warning(f"Job {job.id}: No result_path in result data")
+        logging.warning(f"Job {label}: No result_path in result data")
         return None
 
     if not os.path.exists(result_path):
-        logging.warning(f"Job {job.id}: Result file does not exist at {result_path}")
+        logging.warning(f"Job {label}: Result file does not exist at {result_path}")
         result_dir = os.path.dirname(result_path)
         if os.path.exists(result_dir):
             logging.info(
-                f"Job {job.id}: Directory exists, listing contents: {os.listdir(result_dir)}"
+                f"Job {label}: Directory exists, listing contents: {os.listdir(result_dir)}"
             )
         else:
-            logging.warning(f"Job {job.id}: Directory does not exist: {result_dir}")
+            logging.warning(f"Job {label}: Directory does not exist: {result_dir}")
         return None
 
     # Copy file to temp location
@@ -202,11 +277,11 @@ async def download_yt_dlp_result(job, temp_file_path):
     try:
         shutil.copy2(result_path, temp_file_path)
         logging.info(
-            f"Job {job.id}: Successfully copied {result_path} to {temp_file_path}"
+            f"Job {label}: Successfully copied {result_path} to {temp_file_path}"
         )
         return temp_file_path
     except Exception as e:
-        logging.error(f"Job {job.id}: Failed to copy file: {e}")
+        logging.error(f"Job {label}: Failed to copy file: {e}")
         return None
 
 
@@ -214,6 +289,8 @@ class YTDLP(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = logging.getLogger(__name__)
+        # guild id -> when we last told their admins the workers are down
+        self._worker_alerts = {}
         self.valid_domains = {
             "instagram.com": "Instagram",
             "instagramez.com": "Instagram",
@@ -231,6 +308,9 @@ class YTDLP(commands.Cog):
             "pinterest.com": "Pinterest",
         }
 
+    async def cog_unload(self):
+        await job_waiter.close()
+
     async def send_error_to_admin(self, message: discord.Message, error_msg: str):
         """Send error message to guild's admin channel if configured."""
         if not message.guild:
@@ -249,8 +329,10 @@ class YTDLP(commands.Cog):
             if channel:
                 # Create a jump link to the original message
                 message_link = f"https://discord.com/channels/{message.guild.id}/{message.channel.id}/{message.id}"
-                await channel.send(
-                    f"⚠️ **yt-dlp Error**\n{error_msg}\n[Jump to message]({message_link})"
+                await rest_scheduler.send(
+                    Lane.BULK,
+                    channel,
+                    f"⚠️ **yt-dlp Error**\n{error_msg}\n[Jump to message]({message_link})",
                 )
         except Exception as e:
             guild_log_error(
@@ -259,6 +341,22 @@ class YTDLP(commands.Cog):
                 f"Failed to send error to admin channel: {e}",
             )
 
+    async def alert_workers_unavailable(self, message: discord.Message, reason: str):
+        """Tell the admin channel, but not for every link while it lasts"""
+        now = time.time()
+        last = self._worker_alerts.get(message.guild.id, 0)
+        if now - last < WORKER_ALERT_SECONDS:
+            return
+        self._worker_alerts[message.guild.id] = now
+
+        if reason == "no_workers":
+            detail = "No yt-dlp workers are running, videos wont be fetched until one is back."
+        else:
+            detail = (
+                "The yt-dlp workers are too backed up to take more videos right now."
+            )
+        await self.send_error_to_admin(message, f"{detail} (`{reason}`)")
+
     @commands.Cog.listener("on_message")
     async def mediaListener(self, message: discord.Message):
         # Don't listen to bots
@@ -304,29 +402,99 @@ class YTDLP(commands.Cog):
         # Try to download the video
         temp_file = None
         job = None
+        attached = False
         result = None
         try:
-            job = await submit_yt_dlp_job(url)
-            if not job:
-                guild_log_warning(
-                    self.logger, guild_id, f"Failed to submit job for {url}"
-                )
-                await self.send_error_to_admin(message, "Failed to submit download job")
-                return
+            # Posted recently somewhere? Then it's already sitting on the volume
+            cached = await asyncio.to_thread(
+                result_cache.get, cache_key(url, DISCORD_FILE_SIZE_LIMIT)
+            )
+            if cached:
+                send_metric("ytdlp_cache_hit", message.guild.id, message.guild.name)
+                status_data = {"status": "done", "result_path": cached}
+            else:
+                try:
+                    job, attached = await submit_yt_dlp_job(
+                        url, guild_id, message.author.id
+                    )
+                except JobThrottled as e:
+                    guild_log_info(
+                        self.logger,
+                        guild_id,
+                        f"Skipping {url}, yt-dlp allowance used up ({e.reason})",
+                    )
+                    send_metric(
+                        "ytdlp_job_throttled", message.guild.id, reason=e.reason
+                    )
+                    # Still do the twitter link swap below, just no video
+                    status_data = {"status": "throttled"}
+                except WorkersUnavailable as e:
+                    # Not the guild's fault, the worker fleet is down or swamped
+                    guild_log_warning(
+                        self.logger,
+                        guild_id,
+                        f"Skipping {url}, no yt-dlp worker available ({e.reason})",
+                    )
+                    send_metric(
+                        "ytdlp_workers_unavailable", message.guild.id, reason=e.reason
+                    )
+                    await self.alert_workers_unavailable(message, e.reason)
+                    status_data = {"status": "unavailable"}
+                else:
+                    if not job:
+                        guild_log_warning(
+                            self.logger, guild_id, f"Failed to submit job for {url}"
+                        )
+                        await self.send_error_to_admin(
+                            message, "Failed to submit download job"
+                        )
+                        return
 
-            # Track job submission in InfluxDB
-            send_metric("ytdlp_job_submitted", message.guild.id, message.guild.name)
+                    # Track job submission in InfluxDB
+                    send_metric(
+                        "ytdlp_job_coalesced" if attached else "ytdlp_job_submitted",
+                        message.guild.id,
+                        message.guild.name,
+                    )
 
-            ok = await wait_for_job_completion(job)
+                    status_data = await wait_for_job_completion(job)
 
-            if ok is True:
+                    # How long it sat in the queue before a worker took it
+                    if (
+                        not attached
+                        and status_data
+                        and status_data.get("queued_seconds") is not None
+                    ):
+                        send_metric(
+                            "ytdlp_queue_wait",
+                            message.guild.id,
+                            status_data["queued_seconds"],
+                            queue=status_data.get("queue"),
+                        )
+
+            if status_data and status_data.get("status") == "done":
                 # Download to a temp file for Discord upload
                 with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
                     temp_file = tmp.name
 
-                result = await download_yt_dlp_result(job, temp_file)
+                result = await download_yt_dlp_result(job, temp_file, status_data)
+
+                # How close the encoder got to its byte budget
+                if status_data.get("achieved_size") and status_data.get("target_size"):
+                    send_metric(
+                        "ytdlp_encode_ratio",
+                        message.guild.id,
+                        status_data["achieved_size"] / status_data["target_size"],
+                        attempts=status_data.get("encode_attempts", 1),
+                    )
+
+            elif status_data and status_data.get("status") in (
+                "throttled",
+                "unavailable",
+            ):
+                pass  # Already logged
 
-            elif ok is False:
+            elif status_data is not None:
                 guild_log_warning(self.logger, guild_id, f"Download failed for {url}")
                 send_metric("ytdlp_job_failed", message.guild.id, message.guild.name)
 
@@ -357,7 +525,12 @@ class YTDLP(commands.Cog):
                         content = f"{content}"
 
                     # The actual posting
-                    await message.reply(content=content, file=discord.File(result))
+                    await rest_scheduler.reply(
+                        Lane.INTERACTION,
+                        message,
+                        content=content,
+                        file=discord.File(result),
+                    )
 
                     guild_log_info(
                         self.logger, guild_id, f"Successfully posted video for {url}"
@@ -397,6 +570,8 @@ class YTDLP(commands.Cog):
         finally:
             if temp_file and os.path.exists(temp_file):
                 os.remove(temp_file)
+            # Not releasing the slot here, the job can keep running well past
+            # our wait and the worker hands it back when it's actually done
 
         # Twitter obfuscation: only if no video was posted
         if (
@@ -414,7 +589,9 @@ class YTDLP(commands.Cog):
                 if formatted_text:
                     intro_line += f"\n>>> {formatted_text}"
 
-                await message.channel.send(f"{alt_link}\n{intro_line}")
+                await rest_scheduler.send(
+                    Lane.INTERACTION, message.channel, f"{alt_link}\n{intro_line}"
+                )
                 await message.delete()
             except (discord.errors.Forbidden, discord.errors.NotFound):
                 pass
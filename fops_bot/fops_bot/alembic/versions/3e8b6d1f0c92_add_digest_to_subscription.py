@@ -0,0 +1,45 @@
+"""add digest to subscription
+
+Revision ID: 3e8b6d1f0c92
+Revises: 9a4c2e7f5b18
+Create Date: 2026-10-19 10:15:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3e8b6d1f0c92"
+down_revision: Union[str, None] = "9a4c2e7f5b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    is_sqlite = bind.dialect.name == "sqlite"
+
+    if is_sqlite:
+        # SQLite doesn't support ALTER COLUMN, so add it NOT NULL from the start
+        op.add_column(
+            "subscriptions",
+            sa.Column(
+                "digest", sa.Boolean(), nullable=False, server_default=sa.false()
+            ),
+        )
+    else:
+        op.add_column(
+            "subscriptions",
+            sa.Column("digest", sa.Boolean(), nullable=True, server_default=sa.false()),
+        )
+        op.alter_column("subscriptions", "digest", nullable=False)
+        op.alter_column("subscriptions", "digest", server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("subscriptions", "digest")
@@ -0,0 +1,31 @@
+"""add last_digest_at to subscription
+
+Revision ID: 5d1f7a3c9e24
+Revises: 3e8b6d1f0c92
+Create Date: 2026-10-19 18:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5d1f7a3c9e24"
+down_revision: Union[str, None] = "3e8b6d1f0c92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "subscriptions",
+        sa.Column("last_digest_at", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("subscriptions", "last_digest_at")
@@ -0,0 +1,66 @@
+"""Add append-only guild_logs table
+
+Revision ID: 7d2e9f4b1c3a
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-18 10:12:00.000000
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2e9f4b1c3a"
+down_revision: Union[str, None] = "1a2b3c4d5e6f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    guild_logs = op.create_table(
+        "guild_logs",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            autoincrement=True,
+            nullable=False,
+        ),
+        sa.Column("guild_id", sa.BigInteger(), nullable=False),
+        sa.Column("ts", sa.DateTime(), nullable=False),
+        sa.Column("level", sa.String(length=16), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_guild_logs_guild_id_id", "guild_logs", ["guild_id", "id"])
+
+    # Carry over whatever is in the old recent_logs arrays
+    bind = op.get_bind()
+    rows = []
+    for guild_id, recent_logs in bind.execute(
+        sa.text("SELECT guild_id, recent_logs FROM guilds")
+    ):
+        if isinstance(recent_logs, str):
+            recent_logs = json.loads(recent_logs or "[]")
+        for entry in recent_logs or []:
+            try:
+                ts = datetime.fromisoformat(entry["ts"]).replace(tzinfo=None)
+            except (KeyError, TypeError, ValueError):
+                ts = datetime.now(timezone.utc).replace(tzinfo=None)
+            rows.append(
+                {
+                    "guild_id": guild_id,
+                    "ts": ts,
+                    "level": str(entry.get("level", "INFO"))[:16],
+                    "message": str(entry.get("message", "")),
+                }
+            )
+    if rows:
+        op.bulk_insert(guild_logs, rows)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_guild_logs_guild_id_id", table_name="guild_logs")
+    op.drop_table("guild_logs")
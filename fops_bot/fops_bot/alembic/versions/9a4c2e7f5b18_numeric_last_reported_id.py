@@ -0,0 +1,74 @@
+"""Make subscriptions.last_reported_id a BigInteger
+
+Revision ID: 9a4c2e7f5b18
+Revises: 7d2e9f4b1c3a
+Create Date: 2026-10-18 11:40:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4c2e7f5b18"
+down_revision: Union[str, None] = "7d2e9f4b1c3a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "subscriptions", sa.Column("last_reported_num", sa.BigInteger(), nullable=True)
+    )
+
+    # Backfill, e6/FA/booru ids are all plain integers. Anything that isnt
+    # is left NULL and gets treated like a brand new subscription.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            "SELECT id, last_reported_id FROM subscriptions "
+            "WHERE last_reported_id IS NOT NULL"
+        )
+    ).all()
+    for sub_id, last_reported_id in rows:
+        try:
+            last_reported_num = int(str(last_reported_id).strip())
+        except ValueError:
+            continue
+        bind.execute(
+            sa.text("UPDATE subscriptions SET last_reported_num = :num WHERE id = :id"),
+            {"num": last_reported_num, "id": sub_id},
+        )
+
+    # batch mode so SQLite gets a table rebuild and Postgres plain ALTERs
+    with op.batch_alter_table("subscriptions") as batch_op:
+        batch_op.drop_column("last_reported_id")
+        batch_op.alter_column(
+            "last_reported_num",
+            new_column_name="last_reported_id",
+            existing_type=sa.BigInteger(),
+            existing_nullable=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("subscriptions") as batch_op:
+        batch_op.alter_column(
+            "last_reported_id",
+            new_column_name="last_reported_num",
+            existing_type=sa.BigInteger(),
+            existing_nullable=True,
+        )
+    op.add_column(
+        "subscriptions", sa.Column("last_reported_id", sa.String(), nullable=True)
+    )
+
+    op.execute(
+        "UPDATE subscriptions SET last_reported_id = CAST(last_reported_num AS VARCHAR)"
+    )
+
+    with op.batch_alter_table("subscriptions") as batch_op:
+        batch_op.drop_column("last_reported_num")
@@ -63,6 +63,8 @@ class FopsBot:
 
         # Some local memory flags
         self.dbReady = False
+        self.closing = False
+        self._shutdown_task = None
 
         # Create our discord bot
         self.version = str(os.environ.get("GIT_COMMIT"))  # Currently running version
@@ -112,7 +114,16 @@ class FopsBot:
         cogs_pkg = importlib.import_module(package)
         cogs_dir = cogs_pkg.__path__[0]
 
+        # Feed pollers can run in their own process (see fops_bot/poller.py)
+        from fops_bot.poller import POLLER_COGS, external_pollers
+
+        skip = set(POLLER_COGS) if external_pollers() else set()
+        if skip:
+            logging.info("EXTERNAL_POLLERS is set, not loading the feed pollers")
+
         for _, modname, ispkg in pkgutil.iter_modules([cogs_dir]):
+            if f"{package}.{modname}" in skip:
+                continue
             if not ispkg and not modname.startswith("_"):
                 try:
                     await self.bot.load_extension(f"cogs.{modname}")
@@ -157,20 +168,37 @@ class FopsBot:
 
             close_client()
 
+        # Graceful shutdown, drain the pollers before we go
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._request_shutdown)
+
         # Run the discord bot using our token.
         await self.bot.start(str(os.environ.get("BOT_TOKEN")))
 
-    def run(self):
-        # Set up signal handlers for graceful shutdown
-        def signal_handler(signum, frame):
-            from utilities.influx_metrics import close_client
+    def _request_shutdown(self):
+        # Hang on to the task, the loop only keeps a weak reference to it
+        if self._shutdown_task is None:
+            self._shutdown_task = asyncio.create_task(self.shutdown())
 
-            close_client()
-            sys.exit(0)
+    async def shutdown(self):
+        if self.closing:
+            return
+        self.closing = True
+        logging.info("Shutting down, letting the pollers finish up")
+
+        from cogs.subscribe_resources.base_poller import drain_pollers
+        from utilities.influx_metrics import close_client
+
+        try:
+            await drain_pollers(self.bot)
+        except Exception as e:
+            logging.error(f"Error draining pollers: {e}")
 
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        close_client()
+        await self.bot.close()
 
+    def run(self):
         asyncio.run(self.start_bot())
 
 
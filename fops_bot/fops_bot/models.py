@@ -1,5 +1,7 @@
 import os
+import time
 import logging
+import threading
 from sqlalchemy import (
     Column,
     Integer,
@@ -9,16 +11,18 @@ from sqlalchemy import (
     DateTime,
     Text,
     ForeignKey,
+    Index,
     create_engine,
     JSON,
     true,
+    event,
+    text,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from datetime import timezone
 
-
 Base = declarative_base()
 
 
@@ -53,7 +57,9 @@ class Guild(Base):
         default="fxtwitter.com",
         nullable=False,
     )  # Preferred Twitter mirror domain
-    recent_logs = Column(JSON, default=list, nullable=False)
+    recent_logs = Column(
+        JSON, default=list, nullable=False
+    )  # Legacy! New entries go to the guild_logs table
 
     # Channel configurations
     admin_channel_id = Column(BigInteger, nullable=True)
@@ -80,27 +86,6 @@ class Guild(Base):
         """Return the preferred Twitter wrapper domain."""
         return self.twitter_wrapper or "fxtwitter.com"
 
-    def append_log_entry(self, level: str, message: str, limit: int = 10) -> None:
-        """
-        Appends a log entry to the little store attached for each guild.
-
-        This is just ment to give server owners a quick little view
-        of what the bot is up to/any errors or warnings! So only the last
-        10 are stored."""
-
-        entries = list(self.recent_logs or [])
-        entries.append(
-            {
-                "ts": datetime.now(timezone.utc).isoformat(),
-                "level": level,
-                "message": message,
-            }
-        )
-
-        if len(entries) > limit:
-            entries = entries[-limit:]
-        self.recent_logs = entries
-
     def admin_channel(self) -> int | None:
         """Get the admin channel ID."""
         return self.admin_channel_id
@@ -120,6 +105,30 @@ class Guild(Base):
         return list(self.ignored_channels) if self.ignored_channels else []
 
 
+class GuildLog(Base):
+    """
+    Append-only log entries for each guild.
+
+    This is just ment to give server owners a quick little view
+    of what the bot is up to/any errors or warnings! Rows are written in
+    batches by utilities.guild_log and trimmed to the last few per guild.
+    """
+
+    __tablename__ = "guild_logs"
+
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    guild_id = Column(BigInteger, nullable=False)
+    ts = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    level = Column(String(16), nullable=False)
+    message = Column(Text, nullable=False)
+
+    __table_args__ = (Index("ix_guild_logs_guild_id_id", "guild_id", "id"),)
+
+
 class KeyValueStore(Base):
     __tablename__ = "key_value_store"
 
@@ -147,12 +156,20 @@ class Subscription(Base):
     guild_id = Column(BigInteger, nullable=True)  # Discord guild ID (nullable for PM)
     channel_id = Column(BigInteger, nullable=False)  # Discord channel ID
     search_criteria = Column(String, nullable=False)  # Username or search string
-    last_reported_id = Column(String, nullable=True)  # Last reported post/submission ID
+    last_reported_id = Column(
+        BigInteger, nullable=True
+    )  # Last reported post/submission ID (ids only ever go up, so its our cursor)
     filters = Column(String, nullable=True)  # Tag filters or exclusion criteria
     is_pm = Column(Boolean, nullable=False, default=False)  # Whether to deliver via PM
     last_ran = Column(
         BigInteger, nullable=True, default=None
     )  # Last time this subscription was checked (epoch seconds)
+    digest = Column(
+        Boolean, nullable=False, default=False
+    )  # Batch each cycles new posts into as few messages as possible
+    last_digest_at = Column(
+        BigInteger, nullable=True, default=None
+    )  # When the last digest went out (epoch seconds), digests wait a window between
 
 
 class Hole(Base):
@@ -189,6 +206,7 @@ class HoleUserColor(Base):
 # to exhaust connection slots on shared PostgreSQL servers.
 _engine = None
 _SessionFactory = None
+_PrimaryReadSessionFactory = None
 
 
 def get_database_url():
@@ -211,15 +229,66 @@ def get_database_url():
     return db_url
 
 
+# SQLite local-mode tuning, see create_sqlite_engine
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+SQLITE_CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", "65536"))
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+
+
+def _sqlite_on_connect(dbapi_conn, connection_record):
+    """Pragmas applied to every new SQLite connection."""
+    cursor = dbapi_conn.cursor()
+    # WAL lets readers carry on while a writer commits
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is still crash-safe under WAL, just not power-loss durable per commit
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _sqlite_on_begin(conn):
+    if conn.get_execution_options().get("sqlite_deferred"):
+        # Read sessions, WAL gives them a snapshot without any lock
+        conn.exec_driver_sql("BEGIN")
+        return
+    # Take the write lock up front, otherwise two deferred transactions that
+    # both read then write deadlock and one gets "database is locked" instantly
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def create_sqlite_engine(db_url: str):
+    """
+    SQLite engine tuned for the bot (pollers + listeners writing from
+    asyncio.to_thread workers at the same time).
+    """
+    engine = create_engine(
+        db_url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+            # We issue BEGIN ourselves (see _sqlite_on_begin)
+            "isolation_level": None,
+        },
+        pool_size=SQLITE_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+    )
+    event.listen(engine, "connect", _sqlite_on_connect)
+    event.listen(engine, "begin", _sqlite_on_begin)
+    return engine
+
+
 def get_engine():
     """Get the single shared SQLAlchemy engine (lazy-initialized)."""
     global _engine
     if _engine is None:
         db_url = get_database_url()
         if db_url.startswith("sqlite:///"):
-            _engine = create_engine(
-                db_url, connect_args={"check_same_thread": False}
-            )
+            _engine = create_sqlite_engine(db_url)
         else:
             # PostgreSQL: limit pool size to avoid exhausting shared server connections.
             # Default would be pool_size=5, max_overflow=10 (15 conns per engine!).
@@ -239,3 +308,159 @@ def get_session():
     if _SessionFactory is None:
         _SessionFactory = sessionmaker(bind=get_engine(), expire_on_commit=False)
     return _SessionFactory()
+
+
+def _get_primary_read_session():
+    """Primary session that on SQLite doesnt take the write lock."""
+    global _PrimaryReadSessionFactory
+    if _PrimaryReadSessionFactory is None:
+        _PrimaryReadSessionFactory = sessionmaker(
+            bind=get_engine().execution_options(sqlite_deferred=True),
+            expire_on_commit=False,
+        )
+    return _PrimaryReadSessionFactory()
+
+
+# Optional read replica. Read-only paths (guild settings, subscription scans,
+# hole lookups) use get_read_session(), which falls back to the primary if
+# the replica is unset, unreachable, or lagging more than REPLICA_MAX_LAG_SECONDS.
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "15"))
+
+_read_engine = None
+_ReadSessionFactory = None
+_replica_ok = False
+_replica_checked_at = 0.0
+_replica_lag: float | None = None
+_replica_check_lock = threading.Lock()
+_route_sessions = {"primary": 0, "replica": 0}
+
+
+def get_read_engine():
+    """Engine for DATABASE_REPLICA_URL, or None if no replica is configured."""
+    global _read_engine
+    if _read_engine is None:
+        replica_url = os.getenv("DATABASE_REPLICA_URL")
+        if not replica_url or replica_url.startswith("sqlite"):
+            return None
+        # Same budget as the primary, these are dashboard-shared servers too
+        _read_engine = create_engine(
+            replica_url,
+            pool_size=2,
+            max_overflow=3,
+            pool_pre_ping=True,
+            connect_args={"connect_timeout": 3},
+        )
+    return _read_engine
+
+
+def _check_replica() -> bool:
+    """
+    Is the replica reachable and caught up? Never blocks, this gets called
+    from the event loop. The answer is refreshed in a background thread every
+    REPLICA_LAG_CHECK_SECONDS, until the first check says yes we use the primary.
+    """
+    global _replica_checked_at
+
+    if get_read_engine() is None:
+        return False
+
+    now = time.monotonic()
+    if now - _replica_checked_at >= REPLICA_LAG_CHECK_SECONDS:
+        if _replica_check_lock.acquire(blocking=False):
+            _replica_checked_at = now
+            threading.Thread(
+                target=_refresh_replica_status, name="replica-lag-check", daemon=True
+            ).start()
+    return _replica_ok
+
+
+def _refresh_replica_status() -> None:
+    try:
+        _measure_replica()
+    finally:
+        _replica_check_lock.release()
+
+
+def _measure_replica() -> bool:
+    """Ask the replica how far behind it is (blocking, up to connect_timeout)"""
+    global _replica_ok, _replica_lag
+
+    engine = get_read_engine()
+    try:
+        with engine.connect() as conn:
+            # An idle primary makes replay_timestamp look old, so treat
+            # "replayed everything we received" as zero lag
+            lag = conn.execute(
+                text(
+                    "SELECT CASE "
+                    "WHEN NOT pg_is_in_recovery() THEN 0 "
+                    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+                    "END"
+                )
+            ).scalar()
+        _replica_lag = float(lag or 0)
+    except Exception as e:
+        logging.warning(f"Read replica check failed, using primary: {e}")
+        _replica_lag = None
+        _replica_ok = False
+        return False
+
+    healthy = _replica_lag <= REPLICA_MAX_LAG_SECONDS
+    if healthy != _replica_ok:
+        logging.info(
+            f"Read replica {'back in use' if healthy else 'lagging, using primary'} "
+            f"(lag {_replica_lag:.1f}s)"
+        )
+    _replica_ok = healthy
+    return healthy
+
+
+def get_read_session():
+    """
+    Session for read-only work. Uses the replica when it's healthy, otherwise
+    the primary. Never write through this!
+    """
+    global _ReadSessionFactory
+    if not _check_replica():
+        _route_sessions["primary"] += 1
+        return _get_primary_read_session()
+
+    if _ReadSessionFactory is None:
+        _ReadSessionFactory = sessionmaker(
+            bind=get_read_engine(), expire_on_commit=False
+        )
+    _route_sessions["replica"] += 1
+    return _ReadSessionFactory()
+
+
+def pool_stats() -> dict:
+    """Per-route connection pool numbers (for metrics)."""
+    stats = {}
+    for route, engine in (("primary", _engine), ("replica", _read_engine)):
+        if engine is None:
+            continue
+        pool = engine.pool
+        stats[route] = {
+            "size": pool.size() if hasattr(pool, "size") else 0,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else 0,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else 0,
+            "sessions": _route_sessions[route],
+        }
+    if _read_engine is not None:
+        stats["replica"]["lag_seconds"] = _replica_lag
+        stats["replica"]["in_use"] = _replica_ok
+    return stats
+
+
+def dialect_insert(session, model):
+    """
+    INSERT for `model` that supports .on_conflict_do_update() (upserts) on
+    whichever database the session is bound to (Postgres or SQLite).
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
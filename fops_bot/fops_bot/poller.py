@@ -0,0 +1,120 @@
+# FOSNHU
+# 2021, Fops Bot
+# MIT License
+
+"""
+Feed poller worker.
+
+Runs the poller cogs without a gateway connection, posting over REST only.
+Start as many of these as you like (`docker compose up --scale poller=3`),
+they split the search groups between them with redis leases.
+
+The bot process skips these cogs when EXTERNAL_POLLERS is set, so each side
+can be restarted and scaled on its own.
+"""
+
+import os
+import time
+import signal
+import socket
+import asyncio
+import logging
+
+import discord
+from discord.ext import commands
+
+POLLER_COGS = [
+    "cogs.fa_poller",
+    "cogs.e621_poller",
+    "cogs.booru_poller",
+]
+
+# Touched every heartbeat, the container healthcheck looks at its mtime
+POLLER_HEARTBEAT_FILE = os.getenv("POLLER_HEARTBEAT_FILE", "/tmp/poller_heartbeat")
+POLLER_HEARTBEAT_SECONDS = int(os.getenv("POLLER_HEARTBEAT_SECONDS", "30"))
+
+
+def external_pollers() -> bool:
+    """True if the pollers run in their own process instead of inside the bot"""
+    return str(os.environ.get("EXTERNAL_POLLERS", "0")).lower() in (
+        "true",
+        "1",
+        "t",
+        "yes",
+    )
+
+
+async def heartbeat(bot: commands.Bot):
+    from utilities.redis_client import redis_client
+
+    name = f"poller:{socket.gethostname()}"
+    started = time.time()
+    while True:
+        health = {
+            "cogs": sorted(bot.cogs),
+            "uptime": int(time.time() - started),
+            "version": getattr(bot, "version", None),
+        }
+        await asyncio.to_thread(
+            redis_client.set_service_health,
+            name,
+            health,
+            POLLER_HEARTBEAT_SECONDS * 3,
+        )
+        with open(POLLER_HEARTBEAT_FILE, "w") as f:
+            f.write(str(int(time.time())))
+        await asyncio.sleep(POLLER_HEARTBEAT_SECONDS)
+
+
+async def run_pollers():
+    # No intents, we never connect to the gateway. login() is just enough to
+    # get an HTTP session with our token for fetch_channel/send and friends.
+    bot = commands.Bot(
+        command_prefix=commands.when_mentioned, intents=discord.Intents.none()
+    )
+    setattr(bot, "version", str(os.environ.get("GIT_COMMIT")))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await bot.login(str(os.environ.get("BOT_TOKEN")))
+    beat = None
+    try:
+        for cog in POLLER_COGS:
+            await bot.load_extension(cog)
+        logging.info(f"Poller worker running {', '.join(POLLER_COGS)}")
+
+        beat = asyncio.create_task(heartbeat(bot))
+        await stop.wait()
+        logging.info("Poller worker shutting down")
+    finally:
+        if beat:
+            beat.cancel()
+
+        from cogs.subscribe_resources.base_poller import drain_pollers
+
+        # Let cycles that are mid-delivery finish and checkpoint
+        await drain_pollers(bot)
+        # Unloads the cogs (cancelling their poll loops) and closes the session
+        await bot.close()
+
+        from utilities.influx_metrics import close_client
+
+        close_client()
+
+
+def main():
+    debug_env = str(os.environ.get("DEBUG", "0")).lower() in ("true", "1", "t", "yes")
+    logging.basicConfig(
+        level=logging.DEBUG if debug_env else logging.INFO,
+        format="[%(asctime)s] %(levelname)s:%(name)s: %(message)s",
+    )
+    logging.getLogger("discord").setLevel(logging.WARNING)
+
+    asyncio.run(run_pollers())
+
+
+if __name__ == "__main__":
+    main()
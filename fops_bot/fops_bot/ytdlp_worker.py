@@ -0,0 +1,70 @@
+# FOSNHU
+# 2021, Fops Bot
+# MIT License
+
+"""
+yt-dlp RQ worker.
+
+Same as `rq worker ytdlp-high ytdlp ytdlp-low`, except yt-dlp and all its
+extractors get imported before RQ starts forking work horses, so each job
+starts warm instead of paying for a whole yt-dlp startup.
+"""
+
+import os
+import logging
+
+from redis import Redis
+from rq import Queue, Worker
+from rq.worker_pool import WorkerPool
+
+# More than 1 runs a pool of workers sharing the hosts CPU budget
+YTDLP_WORKERS = int(os.getenv("YTDLP_WORKERS", "1"))
+
+
+def warm_up():
+    from utilities import ytdlp_engine
+
+    # Pull in the job code too so the fork inherits it
+    import utilities.yt_dlp_logic  # noqa: F401
+
+    if ytdlp_engine.enabled():
+        try:
+            ytdlp_engine.warm_up()
+        except Exception as e:
+            logging.warning(f"yt-dlp warm up failed, jobs will start cold: {e}")
+
+
+def main():
+    debug_env = str(os.environ.get("DEBUG", "0")).lower() in ("true", "1", "t", "yes")
+    logging.basicConfig(
+        level=logging.DEBUG if debug_env else logging.INFO,
+        format="[%(asctime)s] %(levelname)s:%(name)s: %(message)s",
+    )
+
+    from utilities.ytdlp_events import get_pool
+    from utilities.ytdlp_health import start_heartbeat
+    from utilities.ytdlp_janitor import start_janitor
+    from utilities.ytdlp_queues import YTDLP_QUEUES
+
+    warm_up()
+    # Tells the bot we're here (and how busy we are)
+    start_heartbeat()
+    # Sweeps leftovers off the shared volume
+    start_janitor()
+
+    connection = Redis(connection_pool=get_pool())
+    # Listed high to low, RQ always takes from the first non-empty queue
+    queues = [Queue(name, connection=connection) for name in YTDLP_QUEUES]
+
+    if YTDLP_WORKERS > 1:
+        # Pool members are forked from us, so they start warm too. Encodes
+        # split the CPU between them through ytdlp_cpu.
+        logging.info(f"Starting a pool of {YTDLP_WORKERS} yt-dlp workers")
+        pool = WorkerPool(queues, connection=connection, num_workers=YTDLP_WORKERS)
+        pool.start()
+    else:
+        Worker(queues, connection=connection).work(with_scheduler=True)
+
+
+if __name__ == "__main__":
+    main()
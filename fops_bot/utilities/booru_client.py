@@ -0,0 +1,76 @@
+import os
+import asyncio
+import logging
+from typing import Dict, Mapping, Optional, Tuple
+
+import aiohttp
+
+"""
+Async client for the (Danbooru style) BixiBooru API.
+
+One aiohttp session per client so connections get reused between polls,
+every request has a timeout, and paging is by id cursor (`page=a<id>`), so
+the cursor doesnt eat into the tag limit like `id:>` does.
+"""
+
+logger = logging.getLogger(__name__)
+
+BOORU_TIMEOUT = float(os.getenv("BOORU_TIMEOUT", "20"))
+BOORU_USER_AGENT = os.getenv("BOORU_USER_AGENT", "FopsBot/1.0 (by snowsune)")
+
+
+class BooruClient:
+    def __init__(
+        self,
+        base_url: str,
+        username: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: float = BOORU_TIMEOUT,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.auth = (
+            aiohttp.BasicAuth(username, api_key) if username and api_key else None
+        )
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                auth=self.auth,
+                headers={"User-Agent": BOORU_USER_AGENT},
+            )
+            self._loop = loop
+        return self._session
+
+    async def fetch_posts(
+        self,
+        tags: str,
+        limit: int = 5,
+        since_id: Optional[int] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, bytes, Mapping[str, str]]:
+        """
+        GET /posts.json, returns (status, raw body, response headers).
+
+        With since_id, only posts newer than it (the `limit` right after it).
+        Parsing is left to the caller so it can happen off the event loop.
+        """
+        params = {"tags": tags, "limit": str(limit)}
+        if since_id is not None:
+            params["page"] = f"a{since_id}"
+
+        async with self._get_session().get(
+            f"{self.base_url}/posts.json", params=params, headers=headers or {}
+        ) as response:
+            body = await response.read()
+            # Case insensitive copy, servers disagree on ETag vs Etag
+            return response.status, body, response.headers.copy()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,4 +1,6 @@
+import atexit
 import logging
+import threading
 
 from datetime import datetime, timedelta, time
 
@@ -21,3 +23,46 @@ def seconds_until(_hour, _minute):
         f"seconds_until: Seconds to wait.. {(future_exec - now).total_seconds()}"
     )
     return (future_exec - now).total_seconds()
+
+
+class BackgroundFlusher:
+    """
+    Runs `flush` every `interval` seconds on a daemon thread.
+
+    Used for write-behind buffers so the hot path only ever touches memory,
+    anything still buffered is flushed one last time at exit.
+    """
+
+    def __init__(self, name: str, flush, interval: float):
+        self.name = name
+        self.interval = interval
+        self._flush = flush
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.flush_now)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush_now()
+
+    def flush_now(self) -> None:
+        try:
+            self._flush()
+        except Exception as e:
+            logging.warning(f"{self.name} flush failed: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.flush_now()
@@ -1,28 +1,128 @@
-from sqlalchemy import text
+import os
+import time
+import threading
+from typing import Optional
 
-from fops_bot.models import KeyValueStore, get_session
+from sqlalchemy import BigInteger, Text, cast, select, text
 
+from fops_bot.models import KeyValueStore, dialect_insert, get_session
+from utilities.common import BackgroundFlusher
 
-def store_key(key: str, value) -> None:
-    """Store a key-value pair as a string."""
+"""
+Little key/value layer on top of the key_value_store table.
+
+Reads are cached in-process for KV_CACHE_TTL seconds (other processes like
+the dashboard can write keys too, so we dont cache forever). Writes go straight
+to the DB unless defer=True, in which case they are batched up and flushed
+every KV_FLUSH_SECONDS. Counters use increment_number, which is a single
+atomic upsert so concurrent boops dont lose counts.
+"""
+
+KV_CACHE_TTL = float(os.getenv("KV_CACHE_TTL", "60"))
+KV_FLUSH_SECONDS = float(os.getenv("KV_FLUSH_SECONDS", "10"))
+
+_cache: dict[str, tuple[str, float]] = {}
+_dirty: dict[str, str] = {}
+_dirty_lock = threading.Lock()
+
+
+def _remember(key: str, value: str) -> None:
+    _cache[key] = (value, time.monotonic() + KV_CACHE_TTL)
+
+
+def _upsert(values: dict[str, str]) -> None:
     with get_session() as session:
-        kv = session.get(KeyValueStore, key)
-        if kv:
-            kv.value = str(value)
-        else:
-            kv = KeyValueStore(key=key, value=str(value))
-            session.add(kv)
+        stmt = dialect_insert(session, KeyValueStore).values(
+            [{"key": k, "value": v} for k, v in values.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KeyValueStore.key], set_={"value": stmt.excluded.value}
+        )
+        session.execute(stmt)
         session.commit()
 
 
+def flush_deferred() -> None:
+    """Write out any store_key(..., defer=True) values that are still pending."""
+    with _dirty_lock:
+        pending = dict(_dirty)
+        _dirty.clear()
+    if pending:
+        _upsert(pending)
+
+
+_flusher = BackgroundFlusher("kv-flusher", flush_deferred, KV_FLUSH_SECONDS)
+
+
+def store_key(key: str, value, defer: bool = False) -> None:
+    """
+    Store a key-value pair as a string.
+
+    With defer=True the write is batched and flushed in the background, good
+    for values that change a lot and arent a big deal to lose on a crash.
+    """
+    value = str(value)
+    _remember(key, value)
+    with _dirty_lock:
+        if defer:
+            _dirty[key] = value
+        else:
+            # Dont let an older deferred value land on top of this one
+            _dirty.pop(key, None)
+    if defer:
+        _flusher.start()
+        return
+    _upsert({key: value})
+
+
 def retrieve_key(key: str, default: str) -> str:
     """Retrieve a value by key as a string. Always returns a string."""
+    cached = _cache.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    pending = _dirty.get(key)
+    if pending is not None:
+        return pending
+
     with get_session() as session:
         kv = session.get(KeyValueStore, key)
-        if not kv or kv.value is None:
-            store_key(key, default)
-            return str(default)
-        return str(kv.value)
+        if kv and kv.value is not None:
+            value = str(kv.value)
+        else:
+            # Store the default, unless someone beat us to it
+            session.execute(
+                dialect_insert(session, KeyValueStore)
+                .values(key=key, value=str(default))
+                .on_conflict_do_nothing(index_elements=[KeyValueStore.key])
+            )
+            value = session.scalar(
+                select(KeyValueStore.value).where(KeyValueStore.key == key)
+            )
+            value = str(default) if value is None else str(value)
+            session.commit()
+
+    _remember(key, value)
+    return value
+
+
+def peek_key(key: str) -> Optional[str]:
+    """Like retrieve_key, but None if its not there (and nothing gets written)"""
+    cached = _cache.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    pending = _dirty.get(key)
+    if pending is not None:
+        return pending
+
+    with get_session() as session:
+        value = session.scalar(
+            select(KeyValueStore.value).where(KeyValueStore.key == key)
+        )
+    if value is None:
+        return None
+    value = str(value)
+    _remember(key, value)
+    return value
 
 
 def store_key_number(key: str, value: int) -> None:
@@ -48,6 +148,30 @@ def retrieve_number(key: str, default: int = 0) -> int:
     return int(value) if value is not None else default
 
 
+def increment_number(key: str, amount: int = 1, default: int = 0) -> int:
+    """
+    Atomically add `amount` to a numeric key and return the new value.
+
+    One round trip (INSERT ... ON CONFLICT DO UPDATE ... RETURNING), a missing
+    key starts from `default`.
+    """
+    with get_session() as session:
+        stmt = dialect_insert(session, KeyValueStore).values(
+            key=key, value=str(default + amount)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KeyValueStore.key],
+            set_={"value": cast(cast(KeyValueStore.value, BigInteger) + amount, Text)},
+        ).returning(KeyValueStore.value)
+        value = int(session.execute(stmt).scalar_one())
+        session.commit()
+
+    with _dirty_lock:
+        _dirty.pop(key, None)
+    _remember(key, str(value))
+    return value
+
+
 def get_db_info() -> str:
     """Return the database version string."""
     with get_session() as session:
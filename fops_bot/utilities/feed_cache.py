@@ -0,0 +1,97 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+"""
+Little LRU of what the feed APIs last told us, per (service, query).
+
+Keeps the ETag / Last-Modified validators so fetchers can send conditional
+requests, and a hash of the payload so when a listing comes back byte for
+byte the same (most polls of an artist gallery) we hand back the Posts we
+already built instead of parsing it all again.
+"""
+
+FEED_CACHE_SIZE = int(os.getenv("FEED_CACHE_SIZE", "2048"))
+
+
+@dataclass
+class FeedCacheEntry:
+    digest: str
+    posts: Any = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = 0.0
+
+
+def content_hash(data) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+class FeedCache:
+    def __init__(self, size: int = FEED_CACHE_SIZE):
+        self.size = size
+        self._entries: "OrderedDict[tuple, FeedCacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, service: str, query: str) -> Optional[FeedCacheEntry]:
+        with self._lock:
+            entry = self._entries.get((service, query))
+            if entry is not None:
+                self._entries.move_to_end((service, query))
+            return entry
+
+    def conditional_headers(self, service: str, query: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for the last response we saw"""
+        entry = self.get(service, query)
+        headers = {}
+        if entry is not None and entry.posts is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def unchanged(self, service: str, query: str, digest: str):
+        """The cached posts if the payload hash matches, otherwise None"""
+        entry = self.get(service, query)
+        if entry is not None and entry.digest == digest and entry.posts is not None:
+            self.hits += 1
+            return entry.posts
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        service: str,
+        query: str,
+        digest: str,
+        posts,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._entries[(service, query)] = FeedCacheEntry(
+                digest=digest,
+                posts=posts,
+                etag=etag,
+                last_modified=last_modified,
+                stored_at=time.time(),
+            )
+            self._entries.move_to_end((service, query))
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+feed_cache = FeedCache()
@@ -0,0 +1,185 @@
+"""
+In-process cache of guild settings.
+
+`get_guild` is on the hot path (every message in the yt-dlp listener, every
+subscription in the pollers, every command error) so rather than a SELECT per
+call we keep immutable snapshots of each guild row in a dict.
+
+Entries expire after GUILD_CACHE_TTL seconds as a fallback, but the dashboard
+is expected to publish the guild_id (or "*" for everything) on the
+GUILD_SETTINGS_CHANNEL redis channel whenever it edits a guild, which drops
+the entry right away.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fops_bot.models import (
+    REPLICA_MAX_LAG_SECONDS,
+    Guild,
+    get_read_session,
+    get_session,
+)
+
+logger = logging.getLogger(__name__)
+
+GUILD_CACHE_TTL = int(os.getenv("GUILD_CACHE_TTL", "300"))
+GUILD_SETTINGS_CHANNEL = os.getenv("GUILD_SETTINGS_CHANNEL", "fops:guild_settings")
+
+
+@dataclass(frozen=True)
+class GuildSettings:
+    """Read-only snapshot of a `Guild` row (same helpers as the model)"""
+
+    guild_id: int
+    name: Optional[str]
+    frozen: bool
+    allow_nsfw: bool
+    enable_dlp: bool
+    twitter_obfuscate: bool
+    twitter_wrapper: str
+    admin_channel_id: Optional[int]
+    ignored_channels: Tuple[int, ...]
+
+    @classmethod
+    def from_model(cls, guild: Guild) -> "GuildSettings":
+        return cls(
+            guild_id=guild.guild_id,
+            name=guild.name,
+            frozen=bool(guild.frozen),
+            allow_nsfw=bool(guild.allow_nsfw),
+            enable_dlp=bool(guild.enable_dlp),
+            twitter_obfuscate=bool(guild.twitter_obfuscate),
+            twitter_wrapper=guild.twitter_wrapper or "fxtwitter.com",
+            admin_channel_id=guild.admin_channel_id,
+            ignored_channels=tuple(guild.ignored_channels or []),
+        )
+
+    def is_frozen(self) -> bool:
+        """Check if the guild is frozen."""
+        return self.frozen
+
+    def nsfw(self) -> bool:
+        """Check if NSFW content is allowed."""
+        return self.allow_nsfw
+
+    def dlp(self) -> bool:
+        """Check if DLP (download) functionality is enabled."""
+        return self.enable_dlp
+
+    def obfuscate_twitter(self) -> bool:
+        """Check if Twitter links should be obfuscated (fxtwitter, etc)."""
+        return self.twitter_obfuscate
+
+    def twitter_wrapper_domain(self) -> str:
+        """Return the preferred Twitter wrapper domain."""
+        return self.twitter_wrapper
+
+    def admin_channel(self) -> int | None:
+        """Get the admin channel ID."""
+        return self.admin_channel_id
+
+    def is_channel_ignored(self, ctx) -> bool:
+        """
+        Check if a channel is in the ignored list.
+        """
+
+        channel_id = ctx.channel.id if hasattr(ctx, "channel") else ctx
+        return channel_id in self.ignored_channels
+
+    def get_ignored_channels(self) -> list[int]:
+        """Get list of ignored channel IDs."""
+        return list(self.ignored_channels)
+
+
+class GuildSettingsCache:
+    """
+    guild_id -> (GuildSettings or None, expires_at)
+
+    Misses are cached too (as None) so unknown guilds dont hit the DB every message.
+    """
+
+    def __init__(self, ttl: int = GUILD_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[Optional[GuildSettings], float]] = {}
+        self._lock = threading.Lock()
+        self._listener = None
+        # Guilds we know just changed -> until when to read them from the
+        # primary, so a lagging replica cant hand us the old row (None = all)
+        self._changed: Dict[Optional[int], float] = {}
+
+    def get(self, guild_id: int) -> Optional[GuildSettings]:
+        entry = self._entries.get(guild_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return self.refresh(guild_id)
+
+    def refresh(self, guild_id: int) -> Optional[GuildSettings]:
+        """Reload a single guild from the DB and store the snapshot."""
+        now = time.monotonic()
+        changed = any(self._changed.get(key, 0) > now for key in (guild_id, None))
+        open_session = get_session if changed else get_read_session
+        with open_session() as session:
+            guild = session.get(Guild, guild_id)
+            settings = GuildSettings.from_model(guild) if guild else None
+        self.put(guild_id, settings)
+        return settings
+
+    def put(self, guild_id: int, settings: Optional[GuildSettings]) -> None:
+        """Write-through hook for code that just changed a guild row."""
+        with self._lock:
+            self._entries[guild_id] = (settings, time.monotonic() + self.ttl)
+
+    def invalidate(self, guild_id: Optional[int] = None) -> None:
+        """Drop one guild (or everything if guild_id is None)."""
+        with self._lock:
+            if guild_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(guild_id, None)
+            self._changed[guild_id] = time.monotonic() + REPLICA_MAX_LAG_SECONDS
+
+    def _on_message(self, message) -> None:
+        data = str(message.get("data", "")).strip()
+        if data in ("", "*"):
+            logger.info("Dashboard invalidated all guild settings")
+            self.invalidate()
+            return
+        try:
+            self.invalidate(int(data))
+            logger.debug(f"Dashboard invalidated guild settings for {data}")
+        except ValueError:
+            logger.warning(f"Ignoring bad guild settings invalidation: {data!r}")
+
+    def start_listener(self) -> None:
+        """Subscribe to dashboard invalidations (safe to call more than once)."""
+        if self._listener is not None:
+            return
+
+        from utilities.redis_client import redis_client
+
+        try:
+            self._listener = redis_client.subscribe(
+                GUILD_SETTINGS_CHANNEL, self._on_message
+            )
+            logger.info(f"Listening for guild updates on {GUILD_SETTINGS_CHANNEL}")
+        except Exception as e:
+            # Not fatal, we just lean on the TTL instead
+            logger.warning(
+                f"Could not subscribe to {GUILD_SETTINGS_CHANNEL} ({e}), "
+                f"guild settings will refresh every {self.ttl}s"
+            )
+
+    def stop_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+guild_cache = GuildSettingsCache()
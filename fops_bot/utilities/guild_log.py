@@ -1,25 +1,77 @@
 from __future__ import annotations
 
+import os
 import logging
-from typing import Callable
+from collections import deque
+from datetime import datetime, timezone
 
-from fops_bot.models import Guild, get_session
+from sqlalchemy import delete, func, insert, select
+
+from fops_bot.models import GuildLog, get_session
+from utilities.common import BackgroundFlusher
 
 """
 Dunno where else to put this lol~
 hooks python's logging system to use my little custom guild_log bit!
+
+Entries are only appended to an in-memory buffer here, a background thread
+bulk inserts them into guild_logs every GUILD_LOG_FLUSH_SECONDS and trims
+each guild back down to GUILD_LOG_LIMIT rows. Logging never blocks the caller.
 """
 
+GUILD_LOG_LIMIT = int(os.getenv("GUILD_LOG_LIMIT", "10"))
+GUILD_LOG_FLUSH_SECONDS = float(os.getenv("GUILD_LOG_FLUSH_SECONDS", "5"))
 
-def _with_guild(guild_id: int | None, fn: Callable[[Guild], None]) -> None:
-    if guild_id is None:
-        return
-    with get_session() as session:
-        guild = session.get(Guild, guild_id)
-        if not guild:
-            return
-        fn(guild)
-        session.commit()
+# Bounded so a dead DB cant eat all our memory, oldest entries fall off first
+_buffer: deque = deque(maxlen=int(os.getenv("GUILD_LOG_BUFFER", "10000")))
+
+
+def flush() -> int:
+    """Write everything buffered so far, returns how many entries were written."""
+    entries = []
+    while True:
+        try:
+            entries.append(_buffer.popleft())
+        except IndexError:
+            break
+    if not entries:
+        return 0
+
+    # Only the newest GUILD_LOG_LIMIT per guild would survive the trim anyway
+    per_guild: dict[int, list[dict]] = {}
+    for entry in entries:
+        per_guild.setdefault(entry["guild_id"], []).append(entry)
+    rows = [row for group in per_guild.values() for row in group[-GUILD_LOG_LIMIT:]]
+
+    try:
+        with get_session() as session:
+            session.execute(insert(GuildLog), rows)
+            for guild_id in per_guild:
+                keep = (
+                    select(GuildLog.id)
+                    .where(GuildLog.guild_id == guild_id)
+                    .order_by(GuildLog.id.desc())
+                    .limit(GUILD_LOG_LIMIT)
+                    .subquery()
+                )
+                session.execute(
+                    delete(GuildLog).where(
+                        GuildLog.guild_id == guild_id,
+                        GuildLog.id < select(func.min(keep.c.id)).scalar_subquery(),
+                    )
+                )
+            session.commit()
+    except Exception:
+        # Put them back in front for the next try, but never push out
+        # anything logged since (the buffer stays bounded)
+        room = _buffer.maxlen - len(_buffer)
+        if room > 0:
+            _buffer.extendleft(reversed(rows[-room:]))
+        raise
+    return len(rows)
+
+
+_flusher = BackgroundFlusher("guild-log-flusher", flush, GUILD_LOG_FLUSH_SECONDS)
 
 
 def _log(
@@ -27,10 +79,17 @@ def _log(
 ) -> None:
     getattr(logger, level)(message)
 
-    def updater(guild: Guild) -> None:
-        guild.append_log_entry(level.upper(), message)
-
-    _with_guild(guild_id, updater)
+    if guild_id is None:
+        return
+    _buffer.append(
+        {
+            "guild_id": guild_id,
+            "ts": datetime.now(timezone.utc),
+            "level": level.upper(),
+            "message": message,
+        }
+    )
+    _flusher.start()
 
 
 def info(logger: logging.Logger, guild_id: int | None, message: str) -> None:
@@ -20,6 +20,15 @@ class Post:
     file_url: Optional[str] = None  # The post's file URL
     preview_url: Optional[str] = None  # The post's preview URL
 
+    @property
+    def numeric_id(self) -> int:
+        """
+        The post's ID as a number.
+
+        e6, FA and booru ids only ever go up, so this is what we order by.
+        """
+        return int(self.id)
+
     def get_display_url(self, use_nsfw_site: bool = False) -> str:
         """
         Get the appropriate URL for display based on NSFW preference.
@@ -54,14 +63,14 @@ class Posts:
         """Get the ID of the newest post"""
         return self.ids[0] if self.ids else None
 
-    def get_posts_newer_than(self, last_reported_id: str) -> List[Post]:
-        """Get all posts newer than the last reported ID"""
-        try:
-            last_reported_idx = self.ids.index(last_reported_id)
-            return self.posts[:last_reported_idx]
-        except ValueError:
-            # Last reported ID not found
-            return []
+    def get_posts_newer_than(self, last_reported_id: int) -> List[Post]:
+        """
+        Get all posts with an ID greater than the last reported ID (newest first)
+
+        Works even if the last reported post was deleted or fell out of the window.
+        """
+        newer = [post for post in self.posts if post.numeric_id > last_reported_id]
+        return sorted(newer, key=lambda post: post.numeric_id, reverse=True)
 
     def contains_id(self, post_id: str) -> bool:
         """Check if a post ID exists in this collection"""
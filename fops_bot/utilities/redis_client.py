@@ -3,10 +3,25 @@ import json
 import logging
 import os
 import time
-from typing import Optional, Dict, Any
+import uuid
+from typing import Any, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Only touch the lease if we still own it (compare token, then act)
+_RENEW_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 
 class RedisClient:
     """Redis client with automatic reconnection on disconnect."""
@@ -110,5 +125,53 @@ class RedisClient:
             logger.error(f"Failed to get health: {e}")
             return None
 
+    def acquire_lease(self, name: str, ttl: float) -> Optional[str]:
+        """
+        Try to take the lease `name` for `ttl` seconds.
+
+        Returns a token if we got it (hang on to it for renew/release), None if
+        someone else holds it. Redis errors are raised, callers decide.
+        """
+        token = uuid.uuid4().hex
+        ok = self._call(
+            lambda c: c.set(f"lease:{name}", token, nx=True, px=int(ttl * 1000))
+        )
+        return token if ok else None
+
+    def renew_lease(self, name: str, token: str, ttl: float) -> bool:
+        """Push the lease expiry out again, False if we lost it."""
+        return bool(
+            self._call(
+                lambda c: c.eval(
+                    _RENEW_LEASE, 1, f"lease:{name}", token, int(ttl * 1000)
+                )
+            )
+        )
+
+    def release_lease(self, name: str, token: str) -> bool:
+        """Give the lease back (no-op if it expired and someone else took it)."""
+        return bool(
+            self._call(lambda c: c.eval(_RELEASE_LEASE, 1, f"lease:{name}", token))
+        )
+
+    def subscribe(self, channel: str, handler: Callable[[Dict[str, Any]], None]):
+        """
+        Run `handler` for every message published on `channel`.
+
+        Messages are handled on a background thread, returns that thread
+        (call .stop() on it to unsubscribe).
+        """
+
+        def on_error(e, pubsub, thread):
+            # Keep the thread alive, pubsub resubscribes once redis is back
+            logger.warning(f"Redis subscription to {channel} errored: {e}")
+            time.sleep(5)
+
+        pubsub = self._call(lambda c: c.pubsub(ignore_subscribe_messages=True))
+        pubsub.subscribe(**{channel: handler})
+        return pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=on_error
+        )
+
 
 redis_client = RedisClient()
@@ -0,0 +1,488 @@
+"""
+One queue for the things we send to Discord over REST.
+
+discord.py already respects the rate limits, but it does it first come first
+served, so a big poll cycle or a changelog blast can sit in front of a
+slash command followup for ages. Sends go through here instead, in lanes:
+
+    INTERACTION > HOLES > FEEDS > BULK
+
+Only REST_CONCURRENCY sends are in flight at once, the most important queued
+one goes next. Each route (a channel, a DM, a webhook) also gets its own
+little token bucket so one busy channel doesnt hog the workers while
+discord.py sleeps on its bucket, and a 429 parks just that route.
+
+The bot and the external poller service (EXTERNAL_POLLERS) share one bot
+token, so the route buckets, a global bucket and 429 blocks live in redis
+where every process sees them. FEEDS and BULK never take the last
+REST_GLOBAL_RESERVE global tokens, those are kept for interactions and holes
+no matter which process wants them. Each process also shares its queue depth
+so `congested()` (pollers back off on it) counts what the bot has queued.
+Without redis every process falls back to its own local buckets.
+"""
+
+import os
+import time
+import socket
+import asyncio
+import logging
+import itertools
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Tuple
+
+import discord
+import redis.asyncio as aioredis
+
+from utilities.influx_metrics import send_metric
+
+logger = logging.getLogger(__name__)
+
+REST_CONCURRENCY = int(os.getenv("REST_CONCURRENCY", "4"))
+# Per route budget, Discord gives about 5 messages per 5s per channel
+REST_ROUTE_RATE = int(os.getenv("REST_ROUTE_RATE", "5"))
+REST_ROUTE_PER = float(os.getenv("REST_ROUTE_PER", "5"))
+# Queued sends (at feed priority or better) before pollers are told to back off
+REST_BACKPRESSURE_DEPTH = int(os.getenv("REST_BACKPRESSURE_DEPTH", "50"))
+# Discord allows 50 requests/s per bot token, across all our processes
+REST_GLOBAL_RATE = int(os.getenv("REST_GLOBAL_RATE", "45"))
+REST_GLOBAL_RESERVE = int(os.getenv("REST_GLOBAL_RESERVE", "10"))
+REST_MAX_RETRIES = 3
+REST_METRICS_SECONDS = 60
+# How often queue depths are swapped with the other processes
+REST_SHARE_SECONDS = 2
+# After a redis error, stick to local buckets this long before trying again
+REST_SHARED_BACKOFF = 30
+
+
+class Lane(IntEnum):
+    INTERACTION = 0
+    HOLES = 1
+    FEEDS = 2
+    BULK = 3
+
+
+class RouteBucket:
+    """Token bucket for one route, plus a hard block after a 429"""
+
+    def __init__(self, rate: int = REST_ROUTE_RATE, per: float = REST_ROUTE_PER):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.rate, self.tokens + (now - self.updated) * self.rate / self.per
+        )
+        self.updated = now
+
+    def ready_at(self, now: float) -> float:
+        """When the next send on this route is allowed"""
+        self._refill(now)
+        if self.blocked_until > now:
+            return self.blocked_until
+        if self.tokens >= 1:
+            return now
+        return now + (1 - self.tokens) * self.per / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.rate and self.blocked_until <= now
+
+
+@dataclass(order=True)
+class _Job:
+    lane: int
+    seq: int
+    route: str = field(compare=False)
+    func: Callable = field(compare=False)
+    args: tuple = field(compare=False)
+    kwargs: dict = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    queued_at: float = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+    # Shared budget said wait, skip it until then
+    not_before: float = field(default=0.0, compare=False)
+
+
+# KEYS: route bucket, global bucket, route block, global block
+# ARGV: route rate, route per, global rate/s, reserve (0 for important lanes)
+# Returns 0 if the send can go now (tokens taken), else ms to wait
+_ACQUIRE = """
+local blocked = math.max(redis.call('pttl', KEYS[3]), redis.call('pttl', KEYS[4]))
+if blocked > 0 then
+    return blocked
+end
+local t = redis.call('time')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local function level(key, capacity, per_second)
+    local bucket = redis.call('hmget', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    return math.min(capacity, tokens + math.max(0, now - ts) * per_second)
+end
+
+local route_rate = tonumber(ARGV[1])
+local route_speed = route_rate / tonumber(ARGV[2])
+local global_rate, reserve = tonumber(ARGV[3]), tonumber(ARGV[4])
+local route_tokens = level(KEYS[1], route_rate, route_speed)
+if route_tokens < 1 then
+    return math.ceil((1 - route_tokens) / route_speed * 1000)
+end
+local global_tokens = level(KEYS[2], global_rate, global_rate)
+if global_tokens < 1 + reserve then
+    return math.ceil((1 + reserve - global_tokens) / global_rate * 1000)
+end
+redis.call('hset', KEYS[1], 'tokens', route_tokens - 1, 'ts', now)
+redis.call('pexpire', KEYS[1], math.ceil(tonumber(ARGV[2]) * 1000) + 1000)
+redis.call('hset', KEYS[2], 'tokens', global_tokens - 1, 'ts', now)
+redis.call('pexpire', KEYS[2], 2000)
+return 0
+"""
+
+_GLOBAL_ROUTE = "global"
+
+
+def route_for(destination) -> str:
+    """Bucket key for something we can .send() to"""
+    if isinstance(destination, discord.Message):
+        destination = destination.channel
+    if isinstance(destination, discord.Webhook):
+        return f"webhook:{destination.id}"
+    if isinstance(destination, discord.abc.User):
+        return f"user:{destination.id}"
+    return f"channel:{getattr(destination, 'id', destination)}"
+
+
+def _reopen_files(kwargs: dict) -> Optional[dict]:
+    """
+    discord.py closes a File once a send is done with it (even a failed
+    one), so a retry needs new ones. Returns kwargs with fresh Files, or None
+    if one cant be opened again.
+    """
+
+    def reopen(f: discord.File) -> Optional[discord.File]:
+        # _owner is discord.py's "we opened this path ourselves" flag
+        if f._owner:
+            # We opened it from a path, open it again
+            path = getattr(f.fp, "name", None)
+            if not isinstance(path, str) or not os.path.exists(path):
+                return None
+            return discord.File(path, filename=f.filename, description=f.description)
+        if f.fp.closed:
+            return None
+        f.reset()
+        return discord.File(f.fp, filename=f.filename, description=f.description)
+
+    kwargs = dict(kwargs)
+    if kwargs.get("file") is not None:
+        kwargs["file"] = reopen(kwargs["file"])
+        if kwargs["file"] is None:
+            return None
+    if kwargs.get("files"):
+        files = [reopen(f) for f in kwargs["files"]]
+        if None in files:
+            return None
+        kwargs["files"] = files
+    return kwargs
+
+
+def _is_global(e: Exception) -> bool:
+    """A 429 on the whole token rather than one route"""
+    if getattr(e, "is_global", False):
+        return True
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    return headers.get("X-RateLimit-Global") == "true" or (
+        headers.get("X-RateLimit-Scope") == "global"
+    )
+
+
+def _retry_after(e: Exception) -> float:
+    retry_after = getattr(e, "retry_after", None)
+    if retry_after is None:
+        response = getattr(e, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        retry_after = headers.get("Retry-After", 1)
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class RestScheduler:
+    def __init__(self, concurrency: int = REST_CONCURRENCY):
+        self.concurrency = concurrency
+        self._queue: List[_Job] = []
+        self._buckets: Dict[str, RouteBucket] = {}
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        # Since the last metrics report
+        self._ratelimited = 0
+        self._max_wait: Dict[Lane, float] = {}
+        # Shared budget
+        self._redis: Optional[aioredis.Redis] = None
+        self._shared_down_until = 0.0
+        self._instance = f"{socket.gethostname()}:{os.getpid()}"
+        self._remote_depth: Dict[int, int] = {}
+
+    async def submit(self, lane: Lane, route: str, func: Callable, *args, **kwargs):
+        """Await func(*args, **kwargs) once its lane and route allow it"""
+        self._ensure_started()
+        job = _Job(
+            lane=int(lane),
+            seq=next(self._seq),
+            route=route,
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            future=self._loop.create_future(),
+            queued_at=time.monotonic(),
+        )
+        self._queue.append(job)
+        self._wakeup.set()
+        return await job.future
+
+    async def send(self, lane: Lane, destination, *args, **kwargs):
+        """destination.send(...) through the queue (channels, users, followups)"""
+        return await self.submit(
+            lane, route_for(destination), destination.send, *args, **kwargs
+        )
+
+    async def reply(self, lane: Lane, message: discord.Message, *args, **kwargs):
+        return await self.submit(
+            lane, route_for(message), message.reply, *args, **kwargs
+        )
+
+    def depth(self, lane: Optional[Lane] = None) -> int:
+        if lane is None:
+            return len(self._queue)
+        return sum(1 for job in self._queue if job.lane == lane)
+
+    def congested(self, lane: Lane = Lane.FEEDS) -> bool:
+        """
+        True if enough is queued at `lane` or better (in any of our
+        processes) that more would just wait
+        """
+        ahead = sum(1 for job in self._queue if job.lane <= lane)
+        ahead += sum(n for l, n in self._remote_depth.items() if l <= lane)
+        return ahead >= REST_BACKPRESSURE_DEPTH
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._redis = aioredis.Redis(
+            host=os.environ.get("REDIS_HOST", "redis"),
+            port=int(os.environ.get("REDIS_PORT", "6379")),
+            db=int(os.environ.get("REDIS_DB", "0")),
+            decode_responses=True,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+        self._tasks = [
+            loop.create_task(self._worker(), name=f"rest_scheduler_{i}")
+            for i in range(self.concurrency)
+        ]
+        self._tasks.append(loop.create_task(self._report(), name="rest_metrics"))
+        self._tasks.append(loop.create_task(self._share(), name="rest_share"))
+
+    def _shared(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._shared_down_until
+
+    def _shared_failed(self, e: Exception) -> None:
+        if self._shared():
+            logger.warning(
+                f"Shared REST budget unavailable, using local buckets for "
+                f"{REST_SHARED_BACKOFF}s: {e}"
+            )
+        self._shared_down_until = time.monotonic() + REST_SHARED_BACKOFF
+        self._remote_depth = {}
+
+    def _next_job(self) -> Tuple[Optional[_Job], Optional[float]]:
+        """Most important job whose route is free, or how long until one might be"""
+        now = time.monotonic()
+        wait = None
+        shared = self._shared()
+        for job in sorted(self._queue):
+            if job.not_before > now:
+                ready = job.not_before
+            elif shared:
+                # Tokens come out of redis once the worker has it
+                self._queue.remove(job)
+                return job, None
+            else:
+                bucket = self._buckets.get(job.route)
+                if bucket is None:
+                    bucket = self._buckets[job.route] = RouteBucket()
+                ready = max(bucket.ready_at(now), self._global_block(now))
+                if ready <= now:
+                    self._queue.remove(job)
+                    bucket.take(now)
+                    return job, None
+            wait = ready - now if wait is None else min(wait, ready - now)
+        return None, wait
+
+    def _global_block(self, now: float) -> float:
+        bucket = self._buckets.get(_GLOBAL_ROUTE)
+        return bucket.blocked_until if bucket else now
+
+    async def _shared_delay(self, job: _Job) -> float:
+        """Take tokens from the shared budget, 0 if we can send, else seconds to wait"""
+        reserve = REST_GLOBAL_RESERVE if job.lane >= Lane.FEEDS else 0
+        try:
+            wait_ms = await self._redis.eval(
+                _ACQUIRE,
+                4,
+                f"rest:bucket:{job.route}",
+                f"rest:bucket:{_GLOBAL_ROUTE}",
+                f"rest:block:{job.route}",
+                f"rest:block:{_GLOBAL_ROUTE}",
+                REST_ROUTE_RATE,
+                REST_ROUTE_PER,
+                REST_GLOBAL_RATE,
+                reserve,
+            )
+        except Exception as e:
+            # Let it go, discord.py still won't break the limits on its own
+            self._shared_failed(e)
+            return 0.0
+        return int(wait_ms) / 1000
+
+    async def _worker(self) -> None:
+        while True:
+            job, wait = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if self._shared():
+                delay = await self._shared_delay(job)
+                if delay > 0:
+                    job.not_before = time.monotonic() + delay
+                    self._queue.append(job)
+                    continue
+            await self._run(job)
+
+    async def _park(self, route: str, retry_after: float) -> None:
+        """Block a route (or everything, for a global 429) here and in redis"""
+        bucket = self._buckets.setdefault(route, RouteBucket())
+        bucket.blocked_until = time.monotonic() + retry_after
+        if self._shared():
+            try:
+                await self._redis.set(
+                    f"rest:block:{route}", self._instance, px=int(retry_after * 1000)
+                )
+            except Exception as e:
+                self._shared_failed(e)
+
+    async def _run(self, job: _Job) -> None:
+        if job.future.done():
+            # Caller went away (cancelled), dont bother sending
+            return
+
+        lane = Lane(job.lane)
+        waited = time.monotonic() - job.queued_at
+        self._max_wait[lane] = max(self._max_wait.get(lane, 0.0), waited)
+
+        try:
+            result = await job.func(*job.args, **job.kwargs)
+        except (discord.RateLimited, discord.HTTPException) as e:
+            kwargs = None
+            if getattr(e, "status", 429) == 429 and job.attempts < REST_MAX_RETRIES:
+                kwargs = _reopen_files(job.kwargs)
+            if kwargs is not None:
+                retry_after = _retry_after(e)
+                route = _GLOBAL_ROUTE if _is_global(e) else job.route
+                logger.warning(
+                    f"429 on {route} ({lane.name}), parking it for {retry_after:.1f}s"
+                )
+                self._ratelimited += 1
+                await self._park(route, retry_after)
+                job.kwargs = kwargs
+                job.attempts += 1
+                job.not_before = time.monotonic() + retry_after
+                self._queue.append(job)
+                self._wakeup.set()
+                return
+            if not job.future.done():
+                job.future.set_exception(e)
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+
+    async def _share(self) -> None:
+        """Swap queue depths with the other processes sending as this bot"""
+        while True:
+            await asyncio.sleep(REST_SHARE_SECONDS)
+            if not self._shared():
+                continue
+            now = time.time()
+            mine = ",".join(str(self.depth(lane)) for lane in Lane)
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    pipe.hset(
+                        "rest:depth",
+                        self._instance,
+                        f"{mine}|{now + REST_SHARE_SECONDS * 5}",
+                    )
+                    pipe.expire("rest:depth", REST_SHARE_SECONDS * 5)
+                    pipe.hgetall("rest:depth")
+                    _, _, everyone = await pipe.execute()
+            except Exception as e:
+                self._shared_failed(e)
+                continue
+
+            remote: Dict[int, int] = {}
+            for instance, value in everyone.items():
+                depths, _, expires = value.partition("|")
+                if instance == self._instance or float(expires or 0) < now:
+                    continue
+                for lane, count in zip(Lane, depths.split(",")):
+                    remote[int(lane)] = remote.get(int(lane), 0) + int(count)
+            self._remote_depth = remote
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(REST_METRICS_SECONDS)
+            try:
+                for lane in Lane:
+                    name = lane.name.lower()
+                    send_metric("rest_queue_depth", 0, self.depth(lane), lane=name)
+                    send_metric(
+                        "rest_queue_wait_ms",
+                        0,
+                        int(self._max_wait.get(lane, 0.0) * 1000),
+                        lane=name,
+                    )
+                send_metric("rest_ratelimited", 0, self._ratelimited)
+            except Exception as e:
+                logger.warning(f"Could not report REST queue metrics: {e}")
+            self._ratelimited = 0
+            self._max_wait.clear()
+
+            # Forget routes we havent used in a while
+            now = time.monotonic()
+            queued = {job.route for job in self._queue}
+            for route, bucket in list(self._buckets.items()):
+                if route not in queued and bucket.idle(now):
+                    del self._buckets[route]
+
+
+rest_scheduler = RestScheduler()
@@ -1,16 +1,70 @@
 import os
+import json
 import shutil
 import subprocess
 import logging
 import time
+from datetime import timezone
 from urllib.parse import urlparse, urlunparse
 from typing import Optional, Dict, Any
 from rq import get_current_job
 
+from utilities.ytdlp_events import publish_job_event
+from utilities.ytdlp_cache import cache_key, release_inflight, result_cache
+from utilities import ytdlp_engine
+from utilities.ytdlp_engine import YTDLP_FRAGMENTS, YTDLP_STATE_DIR
+from utilities.ytdlp_cpu import cpu_slot, preset_for
+from utilities.ytdlp_health import record_timing
+from utilities.ytdlp_queues import release, touch
+from utilities.influx_metrics import send_metric
+
 DISCORD_FILE_SIZE_LIMIT = 8 * 1024 * 1024  # 8MB
-MAX_JOB_SECONDS = 600
+MAX_JOB_SECONDS = 600  # The bot enqueues with this as job_timeout
+# What's left of it once we stop working, for caching the result and telling
+# the bot. RQ kills the work horse at MAX_JOB_SECONDS and nothing gets said.
+JOB_WRAPUP_SECONDS = 30
+# A probe is one page load (or a few), it doesnt get to eat the download's time
+PROBE_TIMEOUT = 30
 shared_output_root = "/tmp/yt_dlp_output"
 
+# What we grab when we know nothing about the formats
+DEFAULT_FORMAT = "mp4/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best"
+# Muxing overhead, dont pick a rendition that only *just* fits
+SIZE_HEADROOM = 0.95
+# Below this (video+audio) a clip is mush, reject instead of encoding it
+YTDLP_MIN_KBPS = int(os.getenv("YTDLP_MIN_KBPS", "150"))
+# Source height we download when we have to compress anyway
+YTDLP_COMPRESS_SOURCE_HEIGHT = int(os.getenv("YTDLP_COMPRESS_SOURCE_HEIGHT", "720"))
+
+
+# x264 settings for when we do have to encode
+# Empty picks one per job from the clip length and the CPU we got
+ENCODE_PRESET = os.getenv("YTDLP_X264_PRESET", "")
+ENCODE_TWO_PASS = str(os.getenv("YTDLP_TWO_PASS", "0")).lower() in (
+    "true",
+    "1",
+    "t",
+    "yes",
+)
+# First try + one corrective retry
+ENCODE_ATTEMPTS = 2
+# Bits per pixel per frame below which we'd rather drop resolution
+ENCODE_MIN_BPP = 0.05
+ENCODE_HEIGHTS = [1080, 720, 576, 480, 360, 240]
+# Pipe yt-dlp into ffmpeg when we know up front we'll have to compress
+YTDLP_STREAMING = str(os.getenv("YTDLP_STREAMING", "1")).lower() in (
+    "true",
+    "1",
+    "t",
+    "yes",
+)
+# No second try when streaming, so aim a little lower
+STREAM_HEADROOM = 0.9
+
+
+class VideoWontFit(Exception):
+    """Known up front that no encode can get this under the size limit"""
+
 
 def extract_url_from_text(text: str):
     """Extract the first URL from a string."""
@@ -30,8 +84,169 @@ def convert_twitter_link_to_alt(
     return original_url
 
 
+def probe_video(url: str, timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """yt-dlp -J, the info dict without downloading anything (None on failure)"""
+    if ytdlp_engine.enabled():
+        try:
+            return ytdlp_engine.extract_info(url, timeout)
+        except ytdlp_engine.EngineTimeout as e:
+            logging.warning(f"In-process probe hung ({e}), trying the subprocess")
+        except Exception as e:
+            logging.warning(f"yt-dlp probe failed: {e}")
+            return None
+
+    try:
+        result = subprocess.run(
+            ["yt-dlp", "-J", "--no-playlist", "--cache-dir", YTDLP_STATE_DIR, url],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        logging.warning(f"yt-dlp probe timed out after {timeout} seconds")
+        return None
+    if result.returncode != 0:
+        logging.warning(f"yt-dlp probe failed: {result.stderr.strip()}")
+        return None
+    try:
+        info = json.loads(result.stdout)
+    except ValueError:
+        return None
+    # Multi-video posts, we only ever send the first one
+    if info.get("_type") == "playlist" and info.get("entries"):
+        info = info["entries"][0]
+    return info
+
+
+def estimate_size(fmt: Dict[str, Any], duration: Optional[float]) -> Optional[int]:
+    """Bytes, from what the site tells us or bitrate x duration"""
+    size = fmt.get("filesize") or fmt.get("filesize_approx")
+    if size:
+        return int(size)
+    tbr = fmt.get("tbr") or (fmt.get("vbr") or 0) + (fmt.get("abr") or 0)
+    if tbr and duration:
+        return int(tbr * 1000 / 8 * duration)
+    return None
+
+
+def _has(codec) -> bool:
+    # None is "unknown" in yt-dlp, "none" means the stream isnt there
+    return codec != "none"
+
+
+def pick_format(info: Dict[str, Any], size_limit: int) -> Dict[str, Any]:
+    """
+    Best rendition that already fits under size_limit.
+
+    Returns {"format", "estimated_size", "duration", "fits"}. If nothing
+    fits it hands back something reasonable to compress from (fits=False),
+    and raises VideoWontFit if even ffmpeg couldnt save it.
+    """
+    duration = info.get("duration")
+    if info.get("is_live"):
+        raise VideoWontFit("Live streams can't be downloaded")
+    if duration and size_limit * 8 / 1000 / duration < YTDLP_MIN_KBPS:
+        raise VideoWontFit(
+            f"{int(duration)}s is too long to fit in {size_limit / 1024 / 1024:.0f}MB"
+        )
+
+    formats = info.get("formats") or []
+    candidates = []  # (format spec, estimated size, height, bitrate)
+
+    # Video and audio in one file
+    for f in formats:
+        if f.get("ext") == "mp4" and _has(f.get("vcodec")) and _has(f.get("acodec")):
+            candidates.append(
+                (
+                    f["format_id"],
+                    estimate_size(f, duration),
+                    f.get("height"),
+                    f.get("tbr"),
+                )
+            )
+
+    # Or a video only mp4 + m4a audio, merged by yt-dlp
+    audios = [
+        f
+        for f in formats
+        if f.get("vcodec") == "none"
+        and _has(f.get("acodec"))
+        and f.get("ext") in ("m4a", "mp4")
+    ]
+    if audios:
+        # Smallest decent audio track, the bytes are better spent on video
+        decent = [f for f in audios if (f.get("abr") or 0) >= 64]
+        audio = min(decent or audios, key=lambda f: f.get("abr") or 0)
+        audio_size = estimate_size(audio, duration)
+        for f in formats:
+            if (
+                f.get("ext") == "mp4"
+                and _has(f.get("vcodec"))
+                and f.get("acodec") == "none"
+            ):
+                video_size = estimate_size(f, duration)
+                size = (
+                    video_size + audio_size
+                    if video_size is not None and audio_size is not None
+                    else None
+                )
+                candidates.append(
+                    (
+                        f"{f['format_id']}+{audio['format_id']}",
+                        size,
+                        f.get("height"),
+                        f.get("tbr"),
+                    )
+                )
+
+    def quality(candidate):
+        _, size, height, tbr = candidate
+        return (height or 0, tbr or size or 0)
+
+    budget = size_limit * SIZE_HEADROOM
+    fitting = [c for c in candidates if c[1] is not None and c[1] <= budget]
+    if fitting:
+        best = max(fitting, key=quality)
+        return {
+            "format": best[0],
+            "estimated_size": best[1],
+            "duration": duration,
+            "fits": True,
+        }
+
+    # Nothing fits, get a source that is plenty for the encode and no bigger
+    sources = [
+        c for c in candidates if (c[2] or 0) <= YTDLP_COMPRESS_SOURCE_HEIGHT
+    ] or candidates
+    if sources:
+        best = max(sources, key=quality)
+        if duration:
+            # Twice the bitrate we will end up at is enough detail to work with
+            target_kbps = budget * 8 / 1000 / duration
+            enough = [c for c in sources if (c[3] or 0) >= 2 * target_kbps]
+            if enough:
+                best = min(enough, key=quality)
+        return {
+            "format": best[0],
+            "estimated_size": best[1],
+            "duration": duration,
+            "fits": False,
+        }
+    return {
+        "format": DEFAULT_FORMAT,
+        "estimated_size": None,
+        "duration": duration,
+        "fits": False,
+    }
+
+
 def run_yt_dlp(
-    url: str, output_dir: str, job_id: str, timeout: Optional[int] = None
+    url: str,
+    output_dir: str,
+    job_id: str,
+    timeout: Optional[int] = None,
+    format_spec: str = DEFAULT_FORMAT,
+    info: Optional[Dict[str, Any]] = None,
 ) -> str | None:
     """Run yt-dlp and return the output mp4 file path, or None on failure."""
     if os.path.isdir(output_dir):
@@ -41,6 +256,33 @@ def run_yt_dlp(
             shutil.rmtree(output_dir)
     os.makedirs(output_dir, exist_ok=True)
     out_template = os.path.join(output_dir, f"{job_id}.mp4")
+
+    if ytdlp_engine.enabled():
+        started = time.time()
+        try:
+            ytdlp_engine.download(url, out_template, format_spec, timeout, info)
+            if os.path.isfile(out_template):
+                return out_template
+            logging.error("yt-dlp did not produce an mp4 file")
+            return None
+        except ytdlp_engine.EngineTimeout as e:
+            # Could be a wedged extractor, give a fresh process a go. The stuck
+            # thread may still be writing to out_template (it only dies with the
+            # work horse), so the retry gets a dir of its own and we never look
+            # at whatever lands in the old one.
+            logging.warning(f"In-process download hung ({e}), trying the subprocess")
+            if timeout is not None:
+                # No more than what the job has left, even if that's nothing
+                timeout -= time.time() - started
+                if timeout <= 0:
+                    return None
+            retry_dir = os.path.join(output_dir, "retry")
+            os.makedirs(retry_dir, exist_ok=True)
+            out_template = os.path.join(retry_dir, f"{job_id}.mp4")
+        except Exception as e:
+            logging.error(f"yt-dlp failed: {e}")
+            return None
+
     try:
         result = subprocess.run(
             [
@@ -51,7 +293,11 @@ def run_yt_dlp(
                 "--merge-output-format",
                 "mp4",  # For best compatibilty.
                 "-f",
-                "mp4/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
+                format_spec,
+                "--cache-dir",
+                YTDLP_STATE_DIR,
+                "-N",
+                str(YTDLP_FRAGMENTS),
             ],
             capture_output=True,
             text=True,
@@ -74,12 +320,180 @@ def run_yt_dlp(
         return None
 
 
+def probe_media(file_path: str) -> Optional[Dict[str, Any]]:
+    """ffprobe the bits of a file we need to plan an encode"""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                file_path,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        data = json.loads(result.stdout or "{}")
+    except (subprocess.TimeoutExpired, ValueError) as e:
+        logging.warning(f"ffprobe failed on {file_path}: {e}")
+        return None
+
+    streams = data.get("streams", [])
+    video = next((st for st in streams if st.get("codec_type") == "video"), {})
+    duration = float(data.get("format", {}).get("duration") or 0) or float(
+        video.get("duration") or 0
+    )
+    try:
+        num, den = (video.get("avg_frame_rate") or "0/1").split("/")
+        fps = float(num) / float(den) if float(den) else 0.0
+    except ValueError:
+        fps = 0.0
+    return {
+        "duration": duration or None,
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "fps": fps or 30.0,
+        "has_audio": any(st.get("codec_type") == "audio" for st in streams),
+    }
+
+
+def plan_encode(media: Dict[str, Any], size_limit: int) -> Dict[str, Any]:
+    """
+    Bitrates, height and framerate that spend (just under) size_limit bytes
+    over the clips duration.
+    """
+    total_kbps = size_limit * 8 * SIZE_HEADROOM / 1000 / media["duration"]
+
+    if not media["has_audio"]:
+        audio_kbps = 0
+    elif total_kbps >= 1000:
+        audio_kbps = 128
+    elif total_kbps >= 400:
+        audio_kbps = 96
+    else:
+        audio_kbps = 64
+    video_kbps = max(total_kbps - audio_kbps, 50)
+
+    # Fewer frames before fewer pixels, 24fps looks fine for clips
+    fps = min(media["fps"], 30.0)
+    if video_kbps < 400:
+        fps = min(fps, 24.0)
+    if video_kbps < 150:
+        fps = min(fps, 15.0)
+
+    # Tallest height that still gets ENCODE_MIN_BPP bits per pixel
+    src_w, src_h = media["width"] or 1280, media["height"] or 720
+    height = ENCODE_HEIGHTS[-1]
+    for candidate in ENCODE_HEIGHTS:
+        if candidate > src_h:
+            continue
+        width = src_w * candidate / src_h
+        if video_kbps * 1000 / (width * candidate * fps) >= ENCODE_MIN_BPP:
+            height = candidate
+            break
+    height = min(height, src_h)
+
+    return {
+        "video_kbps": int(video_kbps),
+        "audio_kbps": audio_kbps,
+        "height": height,
+        "fps": round(fps, 3),
+    }
+
+
+def _encode(
+    file_path: str,
+    out_path: str,
+    plan: Dict[str, Any],
+    timeout: Optional[int],
+    two_pass: bool,
+    stdin=None,
+) -> bool:
+    vf = f"scale=-2:{plan['height'] // 2 * 2}"
+    video_bitrate = f"{plan['video_kbps']}k"
+    base = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "warning",
+        "-i",
+        file_path,
+        "-vf",
+        vf,
+        "-r",
+        str(plan["fps"]),
+        "-c:v",
+        "libx264",
+        "-pix_fmt",
+        "yuv420p",
+        "-preset",
+        plan.get("preset") or "fast",
+        "-threads",
+        str(plan.get("threads", 0)),
+        "-b:v",
+        video_bitrate,
+        "-maxrate",
+        f"{int(plan['video_kbps'] * 1.5)}k",
+        "-bufsize",
+        f"{plan['video_kbps'] * 2}k",
+    ]
+    if plan["audio_kbps"]:
+        audio = ["-c:a", "aac", "-b:a", f"{plan['audio_kbps']}k"]
+    else:
+        audio = ["-an"]
+    output = ["-movflags", "+faststart", "-y", out_path]
+
+    passes = []
+    if two_pass:
+        log_prefix = f"{os.path.splitext(out_path)[0]}_2pass"
+        passlog = ["-passlogfile", log_prefix]
+        passes.append(
+            base + ["-pass", "1"] + passlog + ["-an", "-f", "mp4", "-y", os.devnull]
+        )
+        passes.append(base + ["-pass", "2"] + passlog + audio + output)
+    else:
+        passes.append(base + audio + output)
+
+    started = time.time()
+    for cmd in passes:
+        remaining = None if timeout is None else timeout - (time.time() - started)
+        try:
+            result = subprocess.run(
+                cmd, stdin=stdin, capture_output=True, text=True, timeout=remaining
+            )
+        except subprocess.TimeoutExpired:
+            logging.error("ffmpeg compression timed out after %s seconds", timeout)
+            return False
+        if result.returncode != 0:
+            detail = (result.stderr or result.stdout or "").strip()
+            logging.error(
+                "ffmpeg failed (%s)%s",
+                result.returncode,
+                f": {detail}" if detail else "",
+            )
+            return False
+    return True
+
+
 def compress_file_if_needed(
     file_path: str,
     size_limit: int = DISCORD_FILE_SIZE_LIMIT,
     timeout: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
 ) -> str | None:
-    """Compress the file using ffmpeg if it's too large. Returns new file path or original if not needed."""
+    """
+    Compress the file using ffmpeg if it's too large. Returns new file path or
+    original if not needed.
+
+    Bitrate comes from the byte budget over the ffprobe duration, and if the
+    first encode still overshoots we redo it once, scaled down by how much we
+    missed by. `stats` (if given) gets target vs achieved size for tuning.
+    """
     original_size = os.path.getsize(file_path)
     if original_size <= size_limit:
         return file_path
@@ -87,99 +501,172 @@ def compress_file_if_needed(
     logging.info(
         f"File size too large ({original_size:,} bytes), compressing {file_path}"
     )
+    media = probe_media(file_path)
+    if not media or not media["duration"]:
+        logging.error(f"Can't plan an encode without a duration for {file_path}")
+        return None
+
     base, ext = os.path.splitext(file_path)
     compressed_file = f"{base}_compressed{ext}"
+    plan = plan_encode(media, size_limit)
+    started = time.time()
 
-    # Calculate compression ratio needed
-    compression_ratio = original_size / size_limit
-    logging.info(
-        f"Need compression ratio of {compression_ratio:.2f}x to fit {size_limit:,} bytes"
+    # Take our share of the CPU for the whole thing, retry included
+    with cpu_slot(media["duration"]) as threads:
+        plan["threads"] = threads
+        plan["preset"] = ENCODE_PRESET or preset_for(media["duration"], threads)
+
+        for attempt in range(1, ENCODE_ATTEMPTS + 1):
+            logging.info(
+                f"Encode attempt {attempt}: {plan['height']}p @ {plan['fps']}fps, "
+                f"{plan['video_kbps']}k video, {plan['audio_kbps']}k audio "
+                f"({media['duration']:.1f}s, {plan['preset']} on {plan['threads']} "
+                f"threads, two_pass={ENCODE_TWO_PASS})"
+            )
+            remaining = None if timeout is None else timeout - (time.time() - started)
+            if remaining is not None and remaining <= 0:
+                logging.error("Out of time before encode attempt %s", attempt)
+                return None
+            if not _encode(
+                file_path, compressed_file, plan, remaining, ENCODE_TWO_PASS
+            ):
+                return None
+
+            compressed_size = os.path.getsize(compressed_file)
+            logging.info(
+                f"Compression result: {original_size:,} → {compressed_size:,} bytes "
+                f"(target {size_limit:,}, {compressed_size / size_limit:.2f}x limit)"
+            )
+            if stats is not None:
+                elapsed = time.time() - started
+                stats.update(
+                    target_size=size_limit,
+                    achieved_size=compressed_size,
+                    encode_attempts=attempt,
+                    encode_seconds=round(elapsed, 2),
+                    encode_speed=round(media["duration"] / max(elapsed, 0.01), 2),
+                    preset=plan["preset"],
+                    threads=plan["threads"],
+                )
+            if compressed_size <= size_limit:
+                return compressed_file
+
+            # Overshot, aim lower by however much we missed by (plus a bit)
+            scale = size_limit * SIZE_HEADROOM / compressed_size
+            plan["video_kbps"] = max(int(plan["video_kbps"] * scale), 50)
+
+    logging.error(
+        f"Compressed file still too large: {compressed_size:,} bytes (limit: {size_limit:,})"
     )
+    return None
 
-    # Calculate optimal settings based on compression ratio
-    if compression_ratio <= 1.5:
-        # Light compression - just reduce bitrate slightly
-        scale_factor = 1.0
-        video_bitrate = "800k"
-        audio_bitrate = "128k"
-        framerate = "30"
-    elif compression_ratio <= 2.0:
-        # Medium compression - reduce resolution slightly
-        scale_factor = 0.8
-        video_bitrate = "600k"
-        audio_bitrate = "128k"
-        framerate = "30"
-    elif compression_ratio <= 3.0:
-        # Moderate compression
-        scale_factor = 0.6
-        video_bitrate = "500k"
-        audio_bitrate = "128k"
-        framerate = "24"
-    elif compression_ratio <= 4.0:
-        # Heavy compression
-        scale_factor = 0.5
-        video_bitrate = "400k"
-        audio_bitrate = "96k"
-        framerate = "24"
-    elif compression_ratio <= 6.0:
-        # Very heavy compression
-        scale_factor = 0.4
-        video_bitrate = "300k"
-        audio_bitrate = "96k"
-        framerate = "20"
-    elif compression_ratio <= 8.0:
-        # Extreme compression
-        scale_factor = 0.3
-        video_bitrate = "250k"
-        audio_bitrate = "64k"
-        framerate = "18"
-    else:
-        # Maximum compression for very large files
-        scale_factor = 0.25
-        video_bitrate = "200k"
-        audio_bitrate = "64k"
-        framerate = "15"
-
-    # Even dimensions required for libx264 + yuv420p (trunc works for scale_factor 1.0 too)
-    vf = f"scale=trunc(iw*{scale_factor}/2)*2:trunc(ih*{scale_factor}/2)*2"
-    logging.info(
-        f"Using compression: {vf} @ {video_bitrate} video, {audio_bitrate} audio, {framerate}fps"
+
+def media_from_info(info: Dict[str, Any], format_id: str) -> Dict[str, Any]:
+    """The probe_media() dict, but from yt-dlp metadata (no file to ffprobe)"""
+    fmt = next(
+        (f for f in info.get("formats") or [] if f.get("format_id") == format_id),
+        info,
     )
-    buf = f"{int(video_bitrate[:-1]) * 2}k"
-    cmd = [
-        "ffmpeg", "-hide_banner", "-loglevel", "warning", "-i", file_path,
-        "-vf", vf, "-c:v", "libx264", "-pix_fmt", "yuv420p", "-preset", "fast",
-        "-b:v", video_bitrate, "-maxrate", video_bitrate, "-bufsize", buf,
-        "-r", framerate, "-c:a", "aac", "-b:a", audio_bitrate,
-        "-movflags", "+faststart", "-y", compressed_file,
-    ]
-    try:
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=timeout
+    return {
+        "duration": info.get("duration"),
+        "width": fmt.get("width"),
+        "height": fmt.get("height"),
+        "fps": fmt.get("fps") or 30.0,
+        "has_audio": fmt.get("acodec") != "none",
+    }
+
+
+def stream_compress(
+    url: str,
+    format_id: str,
+    media: Dict[str, Any],
+    output_dir: str,
+    job_id: str,
+    size_limit: int = DISCORD_FILE_SIZE_LIMIT,
+    timeout: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> str | None:
+    """
+    yt-dlp straight into ffmpeg, so the download and encode overlap and the
+    original never touches the disk.
+
+    Single pass only (we cant read a pipe twice) and no corrective retry, so
+    None means "do it the slow way", not "give up".
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    out_path = os.path.join(output_dir, f"{job_id}_compressed.mp4")
+    plan = plan_encode(media, int(size_limit * STREAM_HEADROOM))
+
+    started = time.time()
+    # stderr to a file, a pipe nobody reads can fill up and wedge yt-dlp
+    with cpu_slot(media["duration"]) as threads, open(
+        os.path.join(output_dir, "yt-dlp.log"), "w"
+    ) as log:
+        plan["threads"] = threads
+        plan["preset"] = ENCODE_PRESET or preset_for(media["duration"], threads)
+        logging.info(
+            f"Streaming encode: {plan['height']}p @ {plan['fps']}fps, "
+            f"{plan['video_kbps']}k video, {plan['audio_kbps']}k audio, "
+            f"{plan['preset']} on {plan['threads']} threads"
         )
-    except subprocess.TimeoutExpired:
-        logging.error("ffmpeg compression timed out after %s seconds", timeout)
-        return None
-    if result.returncode != 0:
-        detail = (result.stderr or result.stdout or "").strip()
-        logging.error(
-            "ffmpeg failed (%s)%s",
-            result.returncode,
-            f": {detail}" if detail else "",
+        download = subprocess.Popen(
+            [
+                "yt-dlp",
+                "--no-playlist",
+                "--quiet",
+                "--no-progress",
+                "--cache-dir",
+                YTDLP_STATE_DIR,
+                "-N",
+                str(YTDLP_FRAGMENTS),
+                "-f",
+                format_id,
+                "-o",
+                "-",
+                url,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=log,
+        )
+        try:
+            encoded = _encode("pipe:0", out_path, plan, timeout, False, download.stdout)
+        finally:
+            # If ffmpeg bailed, this gives yt-dlp its SIGPIPE
+            download.stdout.close()
+            try:
+                download.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                download.kill()
+                download.wait()
+
+    if not encoded or download.returncode != 0 or not os.path.isfile(out_path):
+        logging.warning(
+            f"Streaming encode failed (yt-dlp exit {download.returncode}), "
+            "falling back to download then encode"
         )
+        cleanup_files(out_path)
         return None
 
-    compressed_size = os.path.getsize(compressed_file)
+    achieved = os.path.getsize(out_path)
     logging.info(
-        f"Compression result: {original_size:,} → {compressed_size:,} bytes ({compressed_size/size_limit:.2f}x limit)"
+        f"Streaming result: {achieved:,} bytes (target {size_limit:,}, "
+        f"{achieved / size_limit:.2f}x limit) in {time.time() - started:.1f}s"
     )
-
-    if compressed_size <= size_limit:
-        return compressed_file
-    logging.error(
-        f"Compressed file still too large: {compressed_size:,} bytes (limit: {size_limit:,})"
-    )
-    return None
+    if stats is not None:
+        elapsed = time.time() - started
+        stats.update(
+            target_size=size_limit,
+            achieved_size=achieved,
+            encode_attempts=1,
+            encode_seconds=round(elapsed, 2),
+            encode_speed=round(media["duration"] / max(elapsed, 0.01), 2),
+            preset=plan["preset"],
+            threads=plan["threads"],
+        )
+    if achieved > size_limit:
+        cleanup_files(out_path)
+        return None
+    return out_path
 
 
 def cleanup_files(*file_paths):
@@ -202,12 +689,33 @@ def process_video(url: str) -> Dict[str, Any]:
     job = get_current_job()
     job_id = job.id if job else str(int(time.time()))
 
-    os.makedirs(shared_output_root, exist_ok=True)
-    job_output_dir = os.path.join(shared_output_root, job_id)
-    os.makedirs(job_output_dir, exist_ok=True)
+    queued_seconds = None
+    if job and job.enqueued_at:
+        enqueued_at = job.enqueued_at
+        if enqueued_at.tzinfo is None:
+            enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+        queued_seconds = round(time.time() - enqueued_at.timestamp(), 2)
 
-    logging.info(f"[RQ Worker] Starting job {job_id} for URL: {url}")
+    # Whose running slot this is, the bot stamps it on at submit
+    meta = job.meta if job else {}
+    owner = (meta.get("guild_id"), meta.get("user_id"))
+    if job:
+        touch(*owner, job_id)
+
+    key = cache_key(url, DISCORD_FILE_SIZE_LIMIT)
+    status_data = _run_job(url, job_id, key)
+    status_data["queue"] = job.origin if job else None
+    status_data["queued_seconds"] = queued_seconds
 
+    # Let the bot know right away instead of it polling for us
+    publish_job_event(job_id, status_data)
+    release_inflight(key, job_id)
+    if job:
+        release(*owner, job_id)
+    return status_data
+
+
+def _run_job(url: str, job_id: str, key: str) -> Dict[str, Any]:
     status_data = {
         "status": "running",
         "started_at": time.time(),
@@ -217,20 +725,115 @@ def process_video(url: str) -> Dict[str, Any]:
         "error": None,
     }
 
+    # Someone else already did the work
+    cached = result_cache.get(key)
+    if cached:
+        logging.info(f"[RQ Worker] Job {job_id} served from cache: {cached}")
+        status_data.update(
+            status="done", result_path=cached, cached=True, finished_at=time.time()
+        )
+        return status_data
+
+    # One budget for the whole job, every stage gets what's left of it
+    deadline = status_data["started_at"] + MAX_JOB_SECONDS - JOB_WRAPUP_SECONDS
+
+    def time_left() -> float:
+        return deadline - time.time()
+
+    os.makedirs(shared_output_root, exist_ok=True)
+    job_output_dir = os.path.join(shared_output_root, job_id)
+    os.makedirs(job_output_dir, exist_ok=True)
+
+    logging.info(f"[RQ Worker] Starting job {job_id} for URL: {url}")
+
     try:
-        file_path = run_yt_dlp(url, job_output_dir, job_id, timeout=MAX_JOB_SECONDS)
-        if not file_path:
-            status_data["status"] = "failed"
-            status_data["error"] = "yt-dlp failed or no file"
-            status_data["finished_at"] = time.time()
-            logging.error(f"[RQ Worker] Job {job_id} failed: yt-dlp failed or no file")
-            shutil.rmtree(job_output_dir, ignore_errors=True)
-            return status_data
+        # Look before we leap, most sites have a rendition that already fits
+        format_spec = DEFAULT_FORMAT
+        plan = None
+        info = probe_video(url, timeout=min(PROBE_TIMEOUT, time_left()))
+        if info:
+            try:
+                plan = pick_format(info, DISCORD_FILE_SIZE_LIMIT)
+            except VideoWontFit as e:
+                status_data["status"] = "failed"
+                status_data["error"] = str(e)
+                status_data["finished_at"] = time.time()
+                logging.info(f"[RQ Worker] Job {job_id} rejected: {e}")
+                shutil.rmtree(job_output_dir, ignore_errors=True)
+                return status_data
+            format_spec = plan["format"]
+            status_data["format"] = format_spec
+            status_data["estimated_size"] = plan["estimated_size"]
+            logging.info(
+                f"[RQ Worker] Job {job_id} picked format {format_spec} "
+                f"(~{plan['estimated_size'] or 0:,} bytes, fits={plan['fits']})"
+            )
+
+        encode_stats = {}
+        result_path = None
+
+        # Known too big and a single file? Encode it as it downloads
+        if (
+            YTDLP_STREAMING
+            and plan
+            and not plan["fits"]
+            and plan["estimated_size"]
+            and plan["duration"]
+            and "+" not in format_spec
+            and time_left() > 0
+        ):
+            result_path = stream_compress(
+                url,
+                format_spec,
+                media_from_info(info, format_spec),
+                job_output_dir,
+                job_id,
+                timeout=time_left(),
+                stats=encode_stats,
+            )
+            status_data["streamed"] = bool(result_path)
+
+        if not result_path:
+            download_started = time.time()
+            file_path = None
+            if time_left() > 0:
+                file_path = run_yt_dlp(
+                    url,
+                    job_output_dir,
+                    job_id,
+                    timeout=time_left(),
+                    format_spec=format_spec,
+                    info=info,
+                )
+            if not file_path:
+                status_data["status"] = "failed"
+                status_data["error"] = "yt-dlp failed or no file"
+                status_data["finished_at"] = time.time()
+                logging.error(
+                    f"[RQ Worker] Job {job_id} failed: yt-dlp failed or no file"
+                )
+                shutil.rmtree(job_output_dir, ignore_errors=True)
+                return status_data
 
-        status_data["original_path"] = file_path
-        logging.info(f"[RQ Worker] Job {job_id} downloaded file: {file_path}")
-        result_path = compress_file_if_needed(file_path, timeout=MAX_JOB_SECONDS)
+            status_data["original_path"] = file_path
+            record_timing("download", time.time() - download_started)
+            logging.info(f"[RQ Worker] Job {job_id} downloaded file: {file_path}")
+            result_path = compress_file_if_needed(
+                file_path, timeout=time_left(), stats=encode_stats
+            )
+        status_data.update(encode_stats)
         status_data["result_path"] = result_path
+        if encode_stats.get("encode_seconds"):
+            record_timing("encode", encode_stats["encode_seconds"])
+        if encode_stats.get("encode_speed"):
+            # Seconds of video per second of encoding
+            send_metric(
+                "ytdlp_encode_speed",
+                0,
+                encode_stats["encode_speed"],
+                preset=encode_stats.get("preset"),
+                threads=encode_stats.get("threads"),
+            )
 
         if result_path:
             status_data["status"] = "done"
@@ -239,6 +842,14 @@ def process_video(url: str) -> Dict[str, Any]:
                 f"[RQ Worker] Job {job_id} completed. Result file: {result_path}"
             )
 
+            # Keep the result for the next person who posts this link
+            try:
+                status_data["result_path"] = result_cache.put(key, result_path)
+                shutil.rmtree(job_output_dir, ignore_errors=True)
+                return status_data
+            except OSError as e:
+                logging.warning(f"[RQ Worker] Job {job_id} could not cache result: {e}")
+
             # Clean up all files in the job directory except the result file
             for f in os.listdir(job_output_dir):
                 fpath = os.path.join(job_output_dir, f)
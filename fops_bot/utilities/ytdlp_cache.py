@@ -0,0 +1,222 @@
+import os
+import shutil
+import hashlib
+import logging
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import redis
+
+from utilities.ytdlp_events import get_pool
+
+"""
+Finished yt-dlp results, shared between the bot and the workers.
+
+The same viral link tends to get posted in five guilds inside ten minutes, so
+results live on the shared volume named after the canonical URL (+ the size
+limit they were squeezed into), and a redis key per URL points at the job
+already working on it so repeat posts just wait on that one.
+"""
+
+logger = logging.getLogger(__name__)
+
+YTDLP_CACHE_DIR = os.getenv("YTDLP_CACHE_DIR", "/tmp/yt_dlp_output/cache")
+YTDLP_CACHE_MAX_BYTES = int(os.getenv("YTDLP_CACHE_MAX_BYTES", str(2 * 1024**3)))
+# Longer than job_timeout so a slow queue doesnt let a second copy start
+YTDLP_INFLIGHT_TTL = int(os.getenv("YTDLP_INFLIGHT_TTL", "900"))
+
+# All the ways people paste a tweet
+TWITTER_HOSTS = {
+    "twitter.com",
+    "x.com",
+    "fxtwitter.com",
+    "vxtwitter.com",
+    "fixupx.com",
+    "fixvx.com",
+    "mobile.twitter.com",
+    "mobile.x.com",
+}
+
+# Share/tracking junk that doesnt change what gets downloaded
+TRACKING_PARAMS = {
+    "s",
+    "t",
+    "si",
+    "igsh",
+    "igshid",
+    "fbclid",
+    "gclid",
+    "ref",
+    "ref_src",
+    "ref_url",
+    "feature",
+    "is_from_webapp",
+    "sender_device",
+    "_r",
+    "_t",
+}
+
+# Claim the in-flight slot, or hand back whoever already has it
+_CLAIM_INFLIGHT = """
+local current = redis.call('get', KEYS[1])
+if current then
+    return current
+end
+redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return false
+"""
+_RELEASE_INFLIGHT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def canonicalize_url(url: str) -> str:
+    """Same video -> same string, so reposts hit the cache"""
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return url
+
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host in TWITTER_HOSTS:
+        host = "twitter.com"
+    elif host == "m.youtube.com":
+        host = "youtube.com"
+
+    # youtu.be/<id> and youtube shorts are just watch?v=<id>
+    path = parsed.path
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    if host == "youtu.be" and path.strip("/"):
+        host, query = "youtube.com", [("v", path.strip("/"))] + query
+        path = "/watch"
+    elif host == "youtube.com" and path.startswith("/shorts/"):
+        video_id = path.split("/")[2]
+        if video_id:
+            host, query = "youtube.com", [("v", video_id)] + query
+            path = "/watch"
+
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    return urlunparse(("https", host, path, "", urlencode(sorted(query)), ""))
+
+
+def cache_key(url: str, size_limit: int) -> str:
+    canonical = canonicalize_url(url)
+    return hashlib.sha256(f"{canonical}\n{size_limit}".encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Files on the shared volume named <key>.mp4, mtime is the LRU clock.
+
+    No index, the directory is the index, so every worker and the bot see
+    the same thing without coordinating.
+    """
+
+    def __init__(self, root: str = YTDLP_CACHE_DIR, max_bytes=YTDLP_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.mp4")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # Bump it in the LRU
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, file_path: str) -> str:
+        """Move a finished result into the cache, returns where it ended up"""
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path_for(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        shutil.move(file_path, tmp)
+        os.replace(tmp, path)  # Readers never see half a file
+        os.utime(path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[str] = None, max_bytes: Optional[int] = None) -> int:
+        """Drop least recently used results until we fit, returns bytes freed"""
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if not entry.name.endswith(".mp4"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    total += stat.st_size
+                    if entry.path != keep:
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            return 0
+
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except FileNotFoundError:
+                pass  # Another worker beat us to it
+        if freed:
+            logger.info(f"yt-dlp cache evicted {freed:,} bytes")
+        return freed
+
+
+result_cache = ResultCache()
+
+
+def _inflight_key(key: str) -> str:
+    return f"ytdlp:inflight:{key}"
+
+
+def claim_inflight(key: str, job_id: str) -> Optional[str]:
+    """
+    Mark job_id as the one fetching `key`.
+
+    Returns None if we got it, or the id of the job already on it.
+    """
+    conn = redis.Redis(connection_pool=get_pool())
+    current = conn.eval(
+        _CLAIM_INFLIGHT, 1, _inflight_key(key), job_id, YTDLP_INFLIGHT_TTL
+    )
+    if current is None:
+        return None
+    return current.decode() if isinstance(current, bytes) else current
+
+
+def replace_inflight(key: str, job_id: str) -> None:
+    """Take the slot over (the job it pointed at is gone)"""
+    conn = redis.Redis(connection_pool=get_pool())
+    conn.set(_inflight_key(key), job_id, ex=YTDLP_INFLIGHT_TTL)
+
+
+def release_inflight(key: str, job_id: str) -> None:
+    """Free the slot, but only if it is still ours"""
+    try:
+        conn = redis.Redis(connection_pool=get_pool())
+        conn.eval(_RELEASE_INFLIGHT, 1, _inflight_key(key), job_id)
+    except Exception as e:
+        # It expires on its own anyways
+        logger.warning(f"Could not release in-flight marker for job {job_id}: {e}")
@@ -0,0 +1,127 @@
+import os
+import time
+import uuid
+import socket
+import logging
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+import redis
+
+from utilities.ytdlp_events import get_pool
+from utilities.influx_metrics import send_metric
+
+"""
+Sharing the hosts cores between concurrent ffmpeg encodes.
+
+Every encode asks for some threads (more for longer clips) out of
+YTDLP_CPU_BUDGET for this host, and gets what is left (never less than one,
+a job has to finish somehow). The reservations live in redis under
+YTDLP_CPU_HOST, so every worker sharing that name sees the same budget, and
+they expire on their own if a work horse gets killed mid encode.
+
+That defaults to the hostname, which is fine for workers on bare metal. In
+compose every container has its own hostname though, so set YTDLP_CPU_HOST to
+the same thing for all the worker containers on one box or each of them
+thinks it has every core.
+"""
+
+logger = logging.getLogger(__name__)
+
+YTDLP_CPU_HOST = os.getenv("YTDLP_CPU_HOST") or socket.gethostname()
+YTDLP_CPU_BUDGET = int(os.getenv("YTDLP_CPU_BUDGET", str(os.cpu_count() or 2)))
+YTDLP_MAX_THREADS = int(os.getenv("YTDLP_MAX_THREADS", "0")) or max(
+    1, YTDLP_CPU_BUDGET // 2
+)
+# Reservations older than this are from a dead encode
+CPU_RESERVATION_TTL = 900
+
+# KEYS: reservations hash; ARGV: token, want, budget, now, ttl
+# Fields are token -> "threads|expires"
+_RESERVE = """
+local now = tonumber(ARGV[4])
+local used = 0
+local entries = redis.call('hgetall', KEYS[1])
+for i = 1, #entries, 2 do
+    local threads, expires = string.match(entries[i + 1], '(%d+)|(%d+)')
+    if tonumber(expires) < now then
+        redis.call('hdel', KEYS[1], entries[i])
+    else
+        used = used + tonumber(threads)
+    end
+end
+local grant = math.max(1, math.min(tonumber(ARGV[2]), tonumber(ARGV[3]) - used))
+redis.call('hset', KEYS[1], ARGV[1], grant .. '|' .. math.floor(now + tonumber(ARGV[5])))
+redis.call('expire', KEYS[1], ARGV[5])
+return {grant, used + grant}
+"""
+
+
+def _key() -> str:
+    return f"ytdlp:cpu:{YTDLP_CPU_HOST}"
+
+
+def threads_for(duration: Optional[float]) -> int:
+    """What an encode of this length would like, a thread per 30s of clip"""
+    if not duration:
+        return YTDLP_MAX_THREADS
+    return max(1, min(YTDLP_MAX_THREADS, int(duration // 30) + 1))
+
+
+def preset_for(duration: Optional[float], threads: int) -> str:
+    """Spend spare CPU on quality, but dont let a long clip on one core drag"""
+    work = (duration or 120) / max(threads, 1)
+    if work <= 20:
+        return "medium"
+    if work <= 60:
+        return "fast"
+    if work <= 180:
+        return "veryfast"
+    return "superfast"
+
+
+def reserve(token: str, want: int) -> Tuple[int, Optional[int]]:
+    """(threads granted, threads now in use on this host)"""
+    try:
+        conn = redis.Redis(connection_pool=get_pool())
+        granted, used = conn.eval(
+            _RESERVE,
+            1,
+            _key(),
+            token,
+            want,
+            YTDLP_CPU_BUDGET,
+            int(time.time()),
+            CPU_RESERVATION_TTL,
+        )
+        return int(granted), int(used)
+    except redis.RedisError as e:
+        logger.warning(f"CPU budget unavailable, encoding unmetered: {e}")
+        return want, None
+
+
+def release(token: str) -> None:
+    try:
+        conn = redis.Redis(connection_pool=get_pool())
+        conn.hdel(_key(), token)
+    except redis.RedisError as e:
+        # Expires with CPU_RESERVATION_TTL anyways
+        logger.warning(f"Could not release CPU reservation: {e}")
+
+
+@contextmanager
+def cpu_slot(duration: Optional[float]):
+    """Hold a share of the CPU budget for one encode, yields the thread count"""
+    token = uuid.uuid4().hex
+    threads, used = reserve(token, threads_for(duration))
+    if used is not None:
+        send_metric(
+            "ytdlp_cpu_utilization",
+            0,
+            used / YTDLP_CPU_BUDGET,
+            host=socket.gethostname(),
+        )
+    try:
+        yield threads
+    finally:
+        release(token)
@@ -0,0 +1,127 @@
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+"""
+yt-dlp through its Python API instead of a fresh `yt-dlp` process per call.
+
+The worker imports this (and the extractors) once before RQ forks, so every
+job starts with yt-dlp already loaded, and the extractor cache (youtube
+player code and friends) lives on the shared volume instead of dying with
+each container.
+
+Extractors do occasionally hang, and a thread cant be killed, so each call
+gets a deadline. Past it we raise EngineTimeout and the caller goes back to
+the subprocess, the stuck thread dies with the job's work horse.
+"""
+
+logger = logging.getLogger(__name__)
+
+YTDLP_ENGINE = os.getenv("YTDLP_ENGINE", "inprocess").lower()
+YTDLP_STATE_DIR = os.getenv("YTDLP_STATE_DIR", "/tmp/yt_dlp_output/.yt-dlp-cache")
+YTDLP_FRAGMENTS = int(os.getenv("YTDLP_FRAGMENTS", "4"))
+YTDLP_SOCKET_TIMEOUT = int(os.getenv("YTDLP_SOCKET_TIMEOUT", "30"))
+
+
+class EngineTimeout(Exception):
+    """The in-process call didnt come back in time"""
+
+
+def enabled() -> bool:
+    return YTDLP_ENGINE == "inprocess"
+
+
+def _options(**extra) -> Dict[str, Any]:
+    options = {
+        "quiet": True,
+        "no_warnings": True,
+        "noprogress": True,
+        "noplaylist": True,
+        "logger": logging.getLogger("yt_dlp"),
+        "cachedir": YTDLP_STATE_DIR,
+        "concurrent_fragment_downloads": YTDLP_FRAGMENTS,
+        "socket_timeout": YTDLP_SOCKET_TIMEOUT,
+    }
+    options.update(extra)
+    return options
+
+
+def _with_deadline(func, timeout: Optional[float]):
+    """Run func in a thread, raise EngineTimeout if it outlives timeout"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name="yt-dlp", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise EngineTimeout(f"yt-dlp still running after {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+def warm_up() -> None:
+    """Import yt-dlp and all of its extractors now, before the worker forks"""
+    import yt_dlp
+    from yt_dlp.extractor import gen_extractor_classes
+
+    os.makedirs(YTDLP_STATE_DIR, exist_ok=True)
+    count = len(list(gen_extractor_classes()))
+    with yt_dlp.YoutubeDL(_options()):
+        pass
+    logger.info(f"yt-dlp {yt_dlp.version.__version__} warm, {count} extractors")
+
+
+def extract_info(url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Like `yt-dlp -J`, raises on extractor errors and EngineTimeout"""
+    import yt_dlp
+
+    def run():
+        with yt_dlp.YoutubeDL(_options()) as ydl:
+            info = ydl.extract_info(url, download=False)
+            return ydl.sanitize_info(info)
+
+    info = _with_deadline(run, timeout)
+    # Multi-video posts, we only ever send the first one
+    if info and info.get("_type") == "playlist" and info.get("entries"):
+        info = info["entries"][0]
+    return info
+
+
+def download(
+    url: str,
+    out_template: str,
+    format_spec: str,
+    timeout: Optional[float] = None,
+    info: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Download to out_template (mp4), raises on failure and EngineTimeout.
+
+    With the info dict from extract_info we skip extracting a second time.
+    """
+    import yt_dlp
+
+    options = _options(
+        outtmpl=out_template, format=format_spec, merge_output_format="mp4"
+    )
+
+    def run():
+        with yt_dlp.YoutubeDL(options) as ydl:
+            if info is not None:
+                try:
+                    ydl.process_ie_result(dict(info), download=True)
+                    return
+                except yt_dlp.utils.DownloadError as e:
+                    # Format urls can go stale, do the whole thing again
+                    logger.info(f"Reusing probe info failed ({e}), re-extracting")
+            ydl.download([url])
+
+    _with_deadline(run, timeout)
@@ -0,0 +1,167 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+"""
+Job completion events for the yt-dlp worker.
+
+The worker publishes the job's status dict on YTDLP_EVENTS_CHANNEL when a job
+ends (and leaves a copy under ytdlp:result:<job id> for a while, in case the
+bot wasnt subscribed yet). The bot runs one listener that resolves an asyncio
+future per waiting job, so no more thread-per-video polling `job.refresh()`.
+"""
+
+logger = logging.getLogger(__name__)
+
+YTDLP_EVENTS_CHANNEL = os.getenv("YTDLP_EVENTS_CHANNEL", "ytdlp:events")
+YTDLP_RESULT_TTL = int(os.getenv("YTDLP_RESULT_TTL", "900"))
+# RQ keeps failed jobs for a year by default, a day is plenty to look at them
+YTDLP_FAILURE_TTL = int(os.getenv("YTDLP_FAILURE_TTL", "86400"))
+
+_pool: Optional[redis.ConnectionPool] = None
+
+
+def _redis_kwargs() -> Dict[str, Any]:
+    return {
+        "host": os.environ.get("REDIS_HOST", "redis"),
+        "port": int(os.environ.get("REDIS_PORT", "6379")),
+        "db": int(os.environ.get("REDIS_DB", "0")),
+    }
+
+
+def get_pool() -> redis.ConnectionPool:
+    """Shared (sync) connection pool for the RQ queue and the worker"""
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool(**_redis_kwargs())
+    return _pool
+
+
+def result_key(job_id: str) -> str:
+    return f"ytdlp:result:{job_id}"
+
+
+def publish_job_event(job_id: str, status_data: Dict[str, Any]) -> None:
+    """Worker side, announce that a job finished (done or failed)"""
+    payload = json.dumps({"job_id": job_id, **status_data}, default=str)
+    try:
+        conn = redis.Redis(connection_pool=get_pool())
+        with conn.pipeline() as pipe:
+            pipe.set(result_key(job_id), payload, ex=YTDLP_RESULT_TTL)
+            pipe.publish(YTDLP_EVENTS_CHANNEL, payload)
+            pipe.execute()
+    except Exception as e:
+        # The bot falls back to checking the job itself on timeout
+        logger.warning(f"Could not publish completion for job {job_id}: {e}")
+
+
+def on_job_failure(job, connection, type, value, traceback):
+    """RQ on_failure callback, covers crashes/timeouts process_video never saw"""
+    from utilities.ytdlp_cache import cache_key, release_inflight
+    from utilities.ytdlp_queues import release
+    from utilities.yt_dlp_logic import DISCORD_FILE_SIZE_LIMIT
+
+    publish_job_event(
+        job.id,
+        {"status": "failed", "error": f"{type.__name__}: {value}", "url": None},
+    )
+    if job.args:
+        release_inflight(cache_key(job.args[0], DISCORD_FILE_SIZE_LIMIT), job.id)
+    release(job.meta.get("guild_id"), job.meta.get("user_id"), job.id)
+
+
+class JobWaiter:
+    """One pubsub listener for the whole bot, job_id -> futures"""
+
+    def __init__(self):
+        self._waiting: Dict[str, List[asyncio.Future]] = {}
+        self._client: Optional[aioredis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    def _ensure_started(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._client = aioredis.Redis(**_redis_kwargs(), decode_responses=True)
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._listen(), name="ytdlp_events")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._client.pubsub(
+                    ignore_subscribe_messages=True
+                ) as pubsub:
+                    await pubsub.subscribe(YTDLP_EVENTS_CHANNEL)
+                    self._ready.set()
+                    # Anything that finished while we were reconnecting
+                    # never reaches us, pick those up from their result keys
+                    await self._catch_up()
+                    async for message in pubsub.listen():
+                        self._resolve(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"yt-dlp event listener dropped ({e}), reconnecting")
+                self._ready.clear()
+                await asyncio.sleep(2)
+
+    async def _catch_up(self) -> None:
+        job_ids = list(self._waiting)
+        if not job_ids:
+            return
+        payloads = await self._client.mget([result_key(job_id) for job_id in job_ids])
+        for payload in payloads:
+            if payload:
+                self._resolve(payload)
+
+    def _resolve(self, payload) -> None:
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            return
+        # Several messages can be waiting on one (coalesced) job
+        for future in self._waiting.pop(data.get("job_id"), []):
+            if not future.done():
+                future.set_result(data)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """The job's status dict once it ends, or None if it didnt in time"""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(job_id, []).append(future)
+        try:
+            # Give the listener a moment to subscribe, then check whether the
+            # job already finished before we were listening
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=2)
+            except asyncio.TimeoutError:
+                pass
+            early = await self._client.get(result_key(job_id))
+            if early:
+                return json.loads(early)
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiting.get(job_id, [])
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                self._waiting.pop(job_id, None)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+job_waiter = JobWaiter()
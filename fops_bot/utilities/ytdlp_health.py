@@ -0,0 +1,137 @@
+import os
+import time
+import socket
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from utilities.ytdlp_events import get_pool
+from utilities.ytdlp_queues import YTDLP_QUEUES
+
+"""
+The yt-dlp workers heartbeat, what `/version` and the status line read.
+
+Every worker host writes the same global picture to service_health:ytdlp
+(running jobs, queue depth, worker count, recent download/encode times), so
+it doesnt matter which one wrote last. If they all go away the key expires
+and the bot knows not to queue anything.
+"""
+
+logger = logging.getLogger(__name__)
+
+YTDLP_HEARTBEAT_SECONDS = int(os.getenv("YTDLP_HEARTBEAT_SECONDS", "15"))
+# Waiting jobs per worker before we call it saturated
+YTDLP_BACKLOG_PER_WORKER = int(os.getenv("YTDLP_BACKLOG_PER_WORKER", "10"))
+# How many recent timings the percentiles are over
+TIMING_SAMPLES = 200
+
+
+def _timings_key(kind: str) -> str:
+    return f"ytdlp:timings:{kind}"
+
+
+def record_timing(kind: str, seconds: float) -> None:
+    """Worker side, remember how long a download/encode took"""
+    try:
+        conn = redis.Redis(connection_pool=get_pool())
+        with conn.pipeline() as pipe:
+            pipe.lpush(_timings_key(kind), round(seconds, 2))
+            pipe.ltrim(_timings_key(kind), 0, TIMING_SAMPLES - 1)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.debug(f"Could not record {kind} timing: {e}")
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def ytdlp_version() -> str:
+    try:
+        import yt_dlp
+
+        return yt_dlp.version.__version__
+    except Exception:
+        return "Unknown"
+
+
+def collect_health() -> Dict[str, Any]:
+    from rq import Queue, Worker
+    from rq.registry import StartedJobRegistry
+
+    conn = redis.Redis(connection_pool=get_pool())
+    queue_depth = {}
+    running = 0
+    for name in YTDLP_QUEUES:
+        queue = Queue(name, connection=conn)
+        queue_depth[name] = queue.count
+        running += StartedJobRegistry(queue=queue).count
+
+    workers = [
+        w
+        for w in Worker.all(connection=conn)
+        if set(w.queue_names()) & set(YTDLP_QUEUES)
+    ]
+
+    health = {
+        "yt-dlp_version": ytdlp_version(),
+        "jobs": running,
+        "workers": len(workers),
+        "queue_depth": queue_depth,
+        "host": socket.gethostname(),
+        "updated": int(time.time()),
+    }
+    for kind in ("download", "encode"):
+        samples = [float(v) for v in conn.lrange(_timings_key(kind), 0, -1)]
+        health[f"{kind}_p50"] = percentile(samples, 50)
+        health[f"{kind}_p95"] = percentile(samples, 95)
+    return health
+
+
+def _heartbeat(stop: threading.Event) -> None:
+    from utilities.redis_client import redis_client
+
+    while not stop.is_set():
+        try:
+            redis_client.set_service_health(
+                "ytdlp", collect_health(), YTDLP_HEARTBEAT_SECONDS * 3
+            )
+        except Exception as e:
+            logger.warning(f"yt-dlp heartbeat failed: {e}")
+        stop.wait(YTDLP_HEARTBEAT_SECONDS)
+
+
+def start_heartbeat() -> threading.Event:
+    """Heartbeat in a background thread, set the returned event to stop it"""
+    stop = threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(stop,), name="ytdlp-heartbeat", daemon=True
+    ).start()
+    return stop
+
+
+class WorkersUnavailable(Exception):
+    """Nobody (or nobody with room) is there to take a yt-dlp job"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def unavailable(health: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Bot side, why we shouldnt queue a job right now (None if we should)"""
+    if not health:
+        return "no_workers"
+    workers = health.get("workers") or 0
+    if workers <= 0:
+        return "no_workers"
+    backlog = sum((health.get("queue_depth") or {}).values())
+    if backlog >= workers * YTDLP_BACKLOG_PER_WORKER:
+        return "workers_saturated"
+    return None
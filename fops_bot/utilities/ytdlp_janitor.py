@@ -0,0 +1,193 @@
+import os
+import time
+import shutil
+import socket
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import redis
+
+from utilities.ytdlp_cache import result_cache
+from utilities.ytdlp_engine import YTDLP_STATE_DIR
+from utilities.ytdlp_events import get_pool
+from utilities.ytdlp_queues import YTDLP_QUEUES
+from utilities.yt_dlp_logic import shared_output_root
+from utilities.influx_metrics import send_metric
+
+"""
+Keeps the shared yt-dlp volume from filling up.
+
+Finished jobs move their result into the cache and clean up after
+themselves, but a work horse killed on job_timeout (or an OOM, or a
+redeploy) leaves its job dir behind forever. Every so often one worker host
+(whoever grabs the lock) sweeps those, drops half written cache files, and
+if the volume is still over YTDLP_DISK_QUOTA_BYTES eats into the result
+cache oldest first.
+"""
+
+logger = logging.getLogger(__name__)
+
+YTDLP_DISK_QUOTA_BYTES = int(os.getenv("YTDLP_DISK_QUOTA_BYTES", str(4 * 1024**3)))
+YTDLP_JANITOR_SECONDS = int(os.getenv("YTDLP_JANITOR_SECONDS", "300"))
+# Job dirs untouched this long are leftovers, comfortably past job_timeout
+YTDLP_ORPHAN_AGE = int(os.getenv("YTDLP_ORPHAN_AGE", "1800"))
+# Under quota pressure anything not running and older than this can go
+YTDLP_ORPHAN_MIN_AGE = 120
+
+_LOCK_KEY = "ytdlp:janitor"
+
+
+def _tree_size(path: str) -> Tuple[int, float]:
+    """(bytes, newest mtime) of everything under path"""
+    size = 0
+    newest = 0.0
+    for dirpath, _, filenames in os.walk(path):
+        try:
+            newest = max(newest, os.stat(dirpath).st_mtime)
+        except FileNotFoundError:
+            continue
+        for name in filenames:
+            try:
+                stat = os.stat(os.path.join(dirpath, name))
+            except FileNotFoundError:
+                continue
+            size += stat.st_size
+            newest = max(newest, stat.st_mtime)
+    return size, newest
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def running_job_ids() -> Set[str]:
+    """Jobs some worker is on right now, their dirs are off limits"""
+    from rq import Queue
+    from rq.registry import StartedJobRegistry
+
+    conn = redis.Redis(connection_pool=get_pool())
+    running = set()
+    for name in YTDLP_QUEUES:
+        registry = StartedJobRegistry(queue=Queue(name, connection=conn))
+        running.update(registry.get_job_ids())
+    return running
+
+
+def job_dirs(root: str, skip: Iterable[str]) -> List[Tuple[float, int, str, str]]:
+    """(newest mtime, bytes, job id, path) for every job dir, oldest first"""
+    skip = {os.path.abspath(path) for path in skip}
+    found = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if os.path.abspath(entry.path) in skip:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    size, newest = _tree_size(entry.path)
+                else:
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    size, newest = stat.st_size, stat.st_mtime
+                found.append((newest, size, entry.name, entry.path))
+    except FileNotFoundError:
+        pass
+    return sorted(found)
+
+
+def sweep(
+    root: str = shared_output_root,
+    quota: int = YTDLP_DISK_QUOTA_BYTES,
+    running: Set[str] = frozenset(),
+    now: Optional[float] = None,
+) -> Dict[str, int]:
+    """One pass over the volume, returns bytes reclaimed by kind"""
+    now = now or time.time()
+    reclaimed = {"orphans": 0, "partials": 0, "cache": 0}
+
+    # Half moved cache entries from a worker that died mid put
+    try:
+        with os.scandir(result_cache.root) as it:
+            for entry in it:
+                if not entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > YTDLP_ORPHAN_AGE:
+                    _remove(entry.path)
+                    reclaimed["partials"] += stat.st_size
+    except FileNotFoundError:
+        pass
+
+    dirs = job_dirs(root, skip=(result_cache.root, YTDLP_STATE_DIR))
+    kept = []
+    for newest, size, name, path in dirs:
+        if name not in running and now - newest > YTDLP_ORPHAN_AGE:
+            _remove(path)
+            reclaimed["orphans"] += size
+        else:
+            kept.append((newest, size, name, path))
+
+    # Still over? Leftovers that arent that old yet go first, then the cache
+    cache_size, _ = _tree_size(result_cache.root)
+    state_size, _ = _tree_size(YTDLP_STATE_DIR)
+    used = cache_size + state_size + sum(size for _, size, _, _ in kept)
+    for newest, size, name, path in kept:
+        if used <= quota:
+            break
+        if name in running or now - newest < YTDLP_ORPHAN_MIN_AGE:
+            continue
+        _remove(path)
+        reclaimed["orphans"] += size
+        used -= size
+
+    if used > quota:
+        reclaimed["cache"] = result_cache.evict(
+            max_bytes=max(0, cache_size - (used - quota))
+        )
+
+    return reclaimed
+
+
+def run_once() -> int:
+    """Sweep if nobody else has this interval, returns bytes reclaimed"""
+    conn = redis.Redis(connection_pool=get_pool())
+    # Every host shares the volume, one sweep per interval is plenty
+    if not conn.set(_LOCK_KEY, socket.gethostname(), nx=True, ex=YTDLP_JANITOR_SECONDS):
+        return 0
+
+    reclaimed = sweep(running=running_job_ids())
+    total = sum(reclaimed.values())
+    for kind, freed in reclaimed.items():
+        if freed:
+            send_metric("ytdlp_reclaimed_bytes", 0, freed, kind=kind)
+    if total:
+        logger.info(f"yt-dlp janitor reclaimed {total:,} bytes {reclaimed}")
+    return total
+
+
+def _janitor(stop: threading.Event) -> None:
+    while not stop.wait(YTDLP_JANITOR_SECONDS):
+        try:
+            run_once()
+        except Exception as e:
+            logger.warning(f"yt-dlp janitor failed: {e}")
+
+
+def start_janitor() -> threading.Event:
+    """Janitor in a background thread, set the returned event to stop it"""
+    stop = threading.Event()
+    threading.Thread(
+        target=_janitor, args=(stop,), name="ytdlp-janitor", daemon=True
+    ).start()
+    return stop
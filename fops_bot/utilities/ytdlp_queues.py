@@ -0,0 +1,199 @@
+import os
+import time
+import logging
+from typing import List, Optional
+from urllib.parse import urlparse
+
+import redis
+
+from utilities.ytdlp_events import get_pool
+
+"""
+Which yt-dlp queue a link goes in, and whether a guild/user gets to add one.
+
+Three queues, workers drain them in order: short social clips (high),
+everything else (normal) and full YouTube videos (low), so one guild pasting
+a playlist worth of videos doesnt hold up every tweet behind it.
+
+At submit time each guild and user also has a cap on jobs running at once
+and a token bucket on how many they can start per minute. Both live in redis
+and get checked in one script so two bot shards cant race past them. The
+worker gives the running slot back when the job is actually over, the bot
+may have stopped waiting on it long before that.
+"""
+
+logger = logging.getLogger(__name__)
+
+YTDLP_QUEUE_HIGH = "ytdlp-high"
+YTDLP_QUEUE = "ytdlp"
+YTDLP_QUEUE_LOW = "ytdlp-low"
+# Workers listen in this order
+YTDLP_QUEUES = [YTDLP_QUEUE_HIGH, YTDLP_QUEUE, YTDLP_QUEUE_LOW]
+
+# Sites where it's (nearly) always a short clip
+SHORT_CLIP_HOSTS = {
+    "twitter.com",
+    "x.com",
+    "fxtwitter.com",
+    "vxtwitter.com",
+    "fixupx.com",
+    "tiktok.com",
+    "instagram.com",
+    "instagramez.com",
+    "bsky.app",
+    "fxbsky.app",
+}
+
+# 0 turns a limit off
+YTDLP_GUILD_CONCURRENCY = int(os.getenv("YTDLP_GUILD_CONCURRENCY", "3"))
+YTDLP_USER_CONCURRENCY = int(os.getenv("YTDLP_USER_CONCURRENCY", "2"))
+YTDLP_GUILD_PER_MINUTE = float(os.getenv("YTDLP_GUILD_PER_MINUTE", "6"))
+YTDLP_GUILD_BURST = int(os.getenv("YTDLP_GUILD_BURST", "6"))
+YTDLP_USER_PER_MINUTE = float(os.getenv("YTDLP_USER_PER_MINUTE", "3"))
+YTDLP_USER_BURST = int(os.getenv("YTDLP_USER_BURST", "3"))
+# Running job entries older than this are assumed dead (worker killed, job
+# lost in the queue), keep it past job_timeout since the worker restamps on start
+YTDLP_SLOT_TTL = int(os.getenv("YTDLP_SLOT_TTL", "900"))
+
+# KEYS: guild running, user running, guild bucket, user bucket
+# ARGV: now, job id, stale before, guild cap, user cap,
+#       guild rate/s, guild burst, user rate/s, user burst
+_ADMIT = """
+local now = tonumber(ARGV[1])
+redis.call('zremrangebyscore', KEYS[1], '-inf', ARGV[3])
+redis.call('zremrangebyscore', KEYS[2], '-inf', ARGV[3])
+local guild_cap, user_cap = tonumber(ARGV[4]), tonumber(ARGV[5])
+if guild_cap > 0 and redis.call('zcard', KEYS[1]) >= guild_cap then
+    return 'guild_busy'
+end
+if user_cap > 0 and redis.call('zcard', KEYS[2]) >= user_cap then
+    return 'user_busy'
+end
+
+local function level(key, rate, burst)
+    if rate <= 0 then
+        return nil
+    end
+    local bucket = redis.call('hmget', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local ts = tonumber(bucket[2]) or now
+    return math.min(burst, tokens + (now - ts) * rate)
+end
+
+local guild_rate, guild_burst = tonumber(ARGV[6]), tonumber(ARGV[7])
+local user_rate, user_burst = tonumber(ARGV[8]), tonumber(ARGV[9])
+local guild_tokens = level(KEYS[3], guild_rate, guild_burst)
+local user_tokens = level(KEYS[4], user_rate, user_burst)
+if guild_tokens and guild_tokens < 1 then
+    return 'guild_rate'
+end
+if user_tokens and user_tokens < 1 then
+    return 'user_rate'
+end
+
+if guild_tokens then
+    redis.call('hset', KEYS[3], 'tokens', guild_tokens - 1, 'ts', now)
+    redis.call('expire', KEYS[3], math.ceil(guild_burst / guild_rate) + 60)
+end
+if user_tokens then
+    redis.call('hset', KEYS[4], 'tokens', user_tokens - 1, 'ts', now)
+    redis.call('expire', KEYS[4], math.ceil(user_burst / user_rate) + 60)
+end
+redis.call('zadd', KEYS[1], now, ARGV[2])
+redis.call('zadd', KEYS[2], now, ARGV[2])
+redis.call('expire', KEYS[1], ARGV[10])
+redis.call('expire', KEYS[2], ARGV[10])
+return 'ok'
+"""
+
+
+class JobThrottled(Exception):
+    """This guild/user is over their yt-dlp allowance right now"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def queue_for(url: str) -> str:
+    """Guess how expensive a link is from where it points"""
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return YTDLP_QUEUE
+    host = (parsed.hostname or "").lower()
+
+    def on(domain):
+        return host == domain or host.endswith(f".{domain}")
+
+    if any(on(domain) for domain in SHORT_CLIP_HOSTS):
+        return YTDLP_QUEUE_HIGH
+    if on("youtube.com") or on("youtu.be"):
+        if parsed.path.startswith("/shorts/"):
+            return YTDLP_QUEUE_HIGH
+        return YTDLP_QUEUE_LOW
+    return YTDLP_QUEUE
+
+
+def _slot_keys(guild_id, user_id) -> List[str]:
+    return [f"ytdlp:running:guild:{guild_id}", f"ytdlp:running:user:{user_id}"]
+
+
+def admit(guild_id: Optional[int], user_id: Optional[int], job_id: str) -> None:
+    """Take a running slot and a token for job_id, raises JobThrottled if not"""
+    now = time.time()
+    conn = redis.Redis(connection_pool=get_pool())
+    try:
+        verdict = conn.eval(
+            _ADMIT,
+            4,
+            *_slot_keys(guild_id, user_id),
+            f"ytdlp:bucket:guild:{guild_id}",
+            f"ytdlp:bucket:user:{user_id}",
+            now,
+            job_id,
+            now - YTDLP_SLOT_TTL,
+            YTDLP_GUILD_CONCURRENCY,
+            YTDLP_USER_CONCURRENCY,
+            YTDLP_GUILD_PER_MINUTE / 60,
+            YTDLP_GUILD_BURST,
+            YTDLP_USER_PER_MINUTE / 60,
+            YTDLP_USER_BURST,
+            YTDLP_SLOT_TTL,
+        )
+    except redis.RedisError as e:
+        # Fail open, if redis is really gone the enqueue will say so
+        logger.warning(f"yt-dlp admission check failed: {e}")
+        return
+    if isinstance(verdict, bytes):
+        verdict = verdict.decode()
+    if verdict != "ok":
+        raise JobThrottled(verdict)
+
+
+def touch(guild_id: Optional[int], user_id: Optional[int], job_id: str) -> None:
+    """Restamp the running slot when a worker picks the job up"""
+    now = time.time()
+    try:
+        conn = redis.Redis(connection_pool=get_pool())
+        with conn.pipeline() as pipe:
+            for key in _slot_keys(guild_id, user_id):
+                # xx, if it already aged out dont bring it back
+                pipe.zadd(key, {job_id: now}, xx=True)
+                pipe.expire(key, YTDLP_SLOT_TTL)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not restamp yt-dlp slot for job {job_id}: {e}")
+
+
+def release(guild_id: Optional[int], user_id: Optional[int], job_id: str) -> None:
+    """Give the running slot back once the job is over"""
+    try:
+        conn = redis.Redis(connection_pool=get_pool())
+        with conn.pipeline() as pipe:
+            for key in _slot_keys(guild_id, user_id):
+                pipe.zrem(key, job_id)
+            pipe.execute()
+    except redis.RedisError as e:
+        # They age out after YTDLP_SLOT_TTL anyways
+        logger.warning(f"Could not release yt-dlp slot for job {job_id}: {e}")
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from cogs.subscribe_resources import base_poller
+from cogs.subscribe_resources.base_poller import BasePollerCog
+from utilities.post_utils import Post, Posts
+
+
+class _Guild(object):
+    def __init__(self, nsfw):
+        self._nsfw = nsfw
+
+    def nsfw(self):
+        return self._nsfw
+
+
+class _Poller(BasePollerCog):
+    def __init__(self, feed):
+        super().__init__(bot=None, service_type="test")
+        self.feed = feed
+        self.fetched = []
+        self.sent = []
+        self.saved = {}
+
+    async def fetch_latest_posts(self, search_criteria, since_id=None, limit=5):
+        self.fetched.append(since_id)
+        newer = [p for p in self.feed if since_id is None or int(p) > since_id]
+        newer = newer[-limit:] if since_id is None else newer[:limit]
+        return Posts(
+            [Post(id=p, title=p, rating="e", tags=[], url=p) for p in reversed(newer)]
+        )
+
+    async def process_single_post(self, sub, post):
+        self.sent.append((sub.id, post.numeric_id))
+        return True
+
+    def _persist_subscription_updates(self, updates):
+        for sub_id, fields in updates:
+            self.saved.setdefault(sub_id, {}).update(fields)
+
+
+def _sub(sub_id, guild_id, last_reported_id):
+    return BasePollerCog.SubscriptionSnapshot(
+        id=sub_id,
+        user_id=1,
+        channel_id=sub_id,
+        guild_id=guild_id,
+        search_criteria="fox",
+        service_type="test",
+        filters=None,
+        last_reported_id=last_reported_id,
+        last_ran=0,
+        is_pm=False,
+    )
+
+
+class TestGroupCursor(object):
+    @pytest.fixture(autouse=True)
+    def guilds(self, monkeypatch):
+        # Guild 1 has NSFW on, guild 2 never turned it on
+        monkeypatch.setattr(
+            base_poller, "get_guild", lambda guild_id: _Guild(guild_id == 1)
+        )
+        # Keep the guild log buffer off the real db
+        for name in ("guild_log_info", "guild_log_warning"):
+            monkeypatch.setattr(base_poller, name, lambda *args: None)
+
+    @pytest.mark.parametrize("blocked_cursor", [None, 100])
+    def test_blocked_sub_doesnt_pin_the_window(self, blocked_cursor):
+        poller = _Poller([str(i) for i in range(100, 121)])
+        live, blocked = _sub(1, 1, 105), _sub(2, 2, blocked_cursor)
+
+        for _ in range(3):
+            group = [
+                _sub(
+                    s.id,
+                    s.guild_id,
+                    poller.saved.get(s.id, {}).get(
+                        "last_reported_id", s.last_reported_id
+                    ),
+                )
+                for s in (live, blocked)
+            ]
+            asyncio.run(poller._poll_group("fox", group, None))
+
+        # The live sub walks forward five at a time, the blocked one keeps up
+        assert poller.fetched == [105, 110, 115]
+        assert [post for _, post in poller.sent] == list(range(106, 121))
+        assert poller.saved[1]["last_reported_id"] == 120
+        assert poller.saved[2]["last_reported_id"] == 120
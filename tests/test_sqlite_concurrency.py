@@ -0,0 +1,94 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import fops_bot.models as models
+from fops_bot.models import GuildLog, Subscription, get_session
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    # Fresh local-mode engine pointed at a throwaway file
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'stress.db'}")
+    monkeypatch.setattr(models, "_engine", None)
+    monkeypatch.setattr(models, "_SessionFactory", None)
+    monkeypatch.setattr(models, "_PrimaryReadSessionFactory", None)
+    engine = models.get_engine()
+    models.Base.metadata.create_all(engine)
+
+    from utilities import database
+
+    database._cache.clear()
+    yield engine
+    engine.dispose()
+
+
+class TestSQLiteLocalMode(object):
+    def test_pragmas(self, sqlite_db):
+        with sqlite_db.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+
+    def test_readers_dont_wait_on_writers(self, sqlite_db):
+        from sqlalchemy import text
+
+        with get_session() as writer:
+            writer.add(GuildLog(guild_id=1, level="INFO", message="pending"))
+            writer.flush()  # Holds the write lock until commit
+            with models.get_read_session() as reader:
+                count = reader.execute(text("SELECT count(*) FROM guild_logs"))
+                assert count.scalar() == 0
+            writer.commit()
+
+    def test_concurrent_writers(self, sqlite_db):
+        from cogs.guild_cog import sync_guilds
+        from utilities import guild_log
+        from utilities.database import increment_number, retrieve_number
+
+        with get_session() as session:
+            session.add_all(
+                Subscription(
+                    service_type="e621",
+                    user_id=1,
+                    guild_id=1,
+                    channel_id=1,
+                    search_criteria=f"tag_{i}",
+                )
+                for i in range(20)
+            )
+            session.commit()
+
+        logger = logging.getLogger("stress")
+        errors = []
+        start = threading.Barrier(16)
+
+        def worker(n):
+            start.wait()
+            try:
+                for i in range(50):
+                    increment_number("stress_counter")
+                    guild_log.info(logger, n % 4, f"worker {n} entry {i}")
+                    if i % 10 == 0:
+                        guild_log.flush()
+                        sync_guilds([(g, f"guild {g} v{i}") for g in range(50)])
+                        # Read-then-write, like the pollers persisting updates
+                        with get_session() as session:
+                            sub = session.get(Subscription, (n % 20) + 1)
+                            sub.last_ran = i
+                            session.commit()
+            except Exception as e:  # Collected so the assert shows all of them
+                errors.append(e)
+
+        with ThreadPoolExecutor(16) as pool:
+            list(pool.map(worker, range(16)))
+        guild_log.flush()
+
+        assert errors == []
+        assert retrieve_number("stress_counter") == 16 * 50
+        with get_session() as session:
+            for g in range(4):
+                count = session.query(GuildLog).filter_by(guild_id=g).count()
+                assert count == guild_log.GUILD_LOG_LIMIT
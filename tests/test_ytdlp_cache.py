@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from utilities.ytdlp_cache import ResultCache, cache_key, canonicalize_url
+
+
+class TestCanonicalizeUrl(object):
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://x.com/fops/status/123?s=20&t=abc",
+            "https://vxtwitter.com/fops/status/123/",
+            "https://www.fxtwitter.com/fops/status/123",
+            "http://fixupx.com/fops/status/123#m",
+        ],
+    )
+    def test_twitter_variants(self, url):
+        assert canonicalize_url(url) == "https://twitter.com/fops/status/123"
+
+    def test_youtube(self):
+        expected = "https://youtube.com/watch?v=abcd"
+        assert canonicalize_url("https://youtu.be/abcd?si=xyz") == expected
+        assert canonicalize_url("https://m.youtube.com/shorts/abcd") == expected
+        assert (
+            canonicalize_url("https://www.youtube.com/watch?feature=share&v=abcd")
+            == expected
+        )
+
+    def test_keeps_real_params(self):
+        assert (
+            canonicalize_url("https://example.com/v?utm_source=a&id=2&igsh=b")
+            == "https://example.com/v?id=2"
+        )
+
+    def test_key_depends_on_size_limit(self):
+        url = "https://x.com/fops/status/123"
+        assert cache_key(url, 8) == cache_key("https://twitter.com/fops/status/123", 8)
+        assert cache_key(url, 8) != cache_key(url, 25)
+
+
+class TestResultCache(object):
+    def _result(self, tmp_path, name, size):
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        return str(path)
+
+    def test_put_get(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+        assert cache.get("a") is None
+
+        path = cache.put("a", self._result(tmp_path, "a.mp4", 10))
+        assert cache.get("a") == path
+        assert os.path.getsize(path) == 10
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"), max_bytes=350)
+        for i, key in enumerate("abc"):
+            cache.put(key, self._result(tmp_path, f"{key}.mp4", 100))
+            # Spread the mtimes out so the order doesnt depend on fs resolution
+            os.utime(cache.path_for(key), (i, i))
+
+        cache.get("a")  # Touching it makes b the oldest
+        cache.put("d", self._result(tmp_path, "d.mp4", 100))
+
+        assert cache.get("b") is None
+        assert cache.get("a") and cache.get("c") and cache.get("d")
+
+    def test_never_evicts_what_it_just_stored(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"), max_bytes=10)
+        path = cache.put("big", self._result(tmp_path, "big.mp4", 100))
+        assert os.path.exists(path)
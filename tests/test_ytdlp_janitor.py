@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from utilities import ytdlp_janitor
+from utilities.ytdlp_cache import ResultCache
+
+
+def _write(path, size, mtime):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    os.utime(os.path.dirname(path), (mtime, mtime))
+
+
+class TestSweep(object):
+    @pytest.fixture
+    def root(self, tmp_path, monkeypatch):
+        cache = ResultCache(root=str(tmp_path / "cache"), max_bytes=10**9)
+        monkeypatch.setattr(ytdlp_janitor, "result_cache", cache)
+        monkeypatch.setattr(
+            ytdlp_janitor, "YTDLP_STATE_DIR", str(tmp_path / ".yt-dlp-cache")
+        )
+        return tmp_path
+
+    def test_removes_old_leftovers_only(self, root):
+        now = 100000
+        _write(str(root / "dead" / "dead.mp4"), 100, now - 4000)
+        _write(str(root / "busy" / "busy.mp4"), 100, now - 4000)
+        _write(str(root / "fresh" / "fresh.mp4"), 100, now - 10)
+        _write(str(root / ".yt-dlp-cache" / "player.json"), 100, now - 4000)
+        _write(str(root / "cache" / "abc.mp4.1.tmp"), 50, now - 4000)
+
+        reclaimed = ytdlp_janitor.sweep(
+            str(root), quota=10**9, running={"busy"}, now=now
+        )
+
+        assert reclaimed == {"orphans": 100, "partials": 50, "cache": 0}
+        assert sorted(os.listdir(root)) == [".yt-dlp-cache", "busy", "cache", "fresh"]
+
+    def test_over_quota_eats_into_cache(self, root):
+        now = 100000
+        _write(str(root / "recent" / "recent.mp4"), 100, now - 600)
+        _write(str(root / "cache" / "old.mp4"), 200, now - 300)
+        _write(str(root / "cache" / "new.mp4"), 200, now - 100)
+
+        reclaimed = ytdlp_janitor.sweep(str(root), quota=250, now=now)
+
+        # The leftover goes before any cached result, then oldest result first
+        assert reclaimed == {"orphans": 100, "partials": 0, "cache": 200}
+        assert os.listdir(root / "cache") == ["new.mp4"]
+        assert not os.path.exists(root / "recent")